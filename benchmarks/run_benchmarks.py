@@ -0,0 +1,416 @@
+"""Benchmarks of the co-simulation hot paths.
+
+Benchmarks use synthetic DonateYourData thermostat data, a synthetic TMY
+weather file, and the in-process `FakeFMUBackend` of the building model so
+that they run without EnergyPlus, GCS credentials, or network access.
+
+Each run appends one json record to the results file together with the
+git commit it was run at, and compares it with the previous record so that
+regressions between commits are visible:
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --quick --fail-on-regression
+"""
+
+import os
+import sys
+import copy
+import json
+import time
+import tempfile
+import argparse
+import platform
+import subprocess
+import statistics
+import logging
+
+logger = logging.getLogger(__name__)
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RESULTS_PATH = os.path.join(
+    BENCHMARKS_DIR, "results", "benchmarks.jsonl"
+)
+IDENTIFIER = "synthetic_dyd_thermostat"
+IDF_PATH = os.path.join(
+    BENCHMARKS_DIR,
+    "..",
+    "test",
+    "idf",
+    "v8-9-0",
+    "AZ_Phoenix_gasfurnace_crawlspace_IECC_2018_cycles.idf",
+)
+
+# metrics where larger values are better, all other metrics are durations
+THROUGHPUT_METRICS = [
+    "simulation_run_steps_per_second",
+    "read_epw_rows_per_second",
+    "parse_epw_rows_per_second",
+    "to_epw_rows_per_second",
+]
+
+
+def setup_environment(work_dir):
+    """Set default data directories before the package is imported because
+    modules read their default directories from the environment."""
+    for k, v in {
+        "OUTPUT_DIR": "output",
+        "IDF_DIR": "idf",
+        "FMU_DIR": "fmu",
+        "WEATHER_DIR": "weather",
+        "ARCHIVE_TMY3_DIR": os.path.join("weather", "archive_tmy3"),
+        "ARCHIVE_TMY3_DATA_DIR": os.path.join(
+            "weather", "archive_tmy3", "tmy3_data"
+        ),
+        "EP_TMY3_CACHE_DIR": os.path.join("weather", "ep_tmy3_cache"),
+        "SIMULATION_EPW_DIR": os.path.join("weather", "simulation_epw"),
+        "LOCAL_CACHE_DIR": "cache",
+    }.items():
+        os.environ.setdefault(k, os.path.join(work_dir, v))
+        os.makedirs(os.environ[k], exist_ok=True)
+
+    os.environ.setdefault("ENERGYPLUS_INSTALL_VERSION", "8-9-0")
+    if not os.environ.get("EPLUS_IDD"):
+        # use IDD shipped with eppy when EnergyPlus is not installed
+        import eppy
+
+        os.environ["EPLUS_IDD"] = os.path.join(
+            os.path.dirname(eppy.__file__),
+            "resources",
+            "iddfiles",
+            "Energy+V{}.idd".format(
+                os.environ["ENERGYPLUS_INSTALL_VERSION"].replace("-", "_")
+            ),
+        )
+
+    sys.path.insert(0, os.path.join(BENCHMARKS_DIR, "..", "src", "python"))
+    sys.path.insert(0, BENCHMARKS_DIR)
+
+
+def timeit(func, repeat):
+    """Median wall time of calls to func in seconds."""
+    timings = []
+    for _ in range(repeat):
+        _t = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - _t)
+    return statistics.median(timings)
+
+
+def make_sim_config(identifiers, start_utc, end_utc):
+    from BuildingControlsSimulator.Simulator.Config import Config
+    from synthetic import SYNTHETIC_LATITUDE, SYNTHETIC_LONGITUDE
+
+    return Config.make_sim_config(
+        identifier=identifiers,
+        latitude=SYNTHETIC_LATITUDE,
+        longitude=SYNTHETIC_LONGITUDE,
+        start_utc=start_utc,
+        end_utc=end_utc,
+        min_sim_period="1D",
+        min_chunk_period="30D",
+        step_size_minutes=5,
+    )
+
+
+def make_data_client():
+    from BuildingControlsSimulator.DataClients.DataClient import DataClient
+    from BuildingControlsSimulator.DataClients.GCSDYDSource import (
+        GCSDYDSource,
+    )
+
+    return DataClient(
+        source=GCSDYDSource(local_cache=os.environ["LOCAL_CACHE_DIR"]),
+        archive_tmy3_dir=os.environ["ARCHIVE_TMY3_DIR"],
+        archive_tmy3_data_dir=os.environ["ARCHIVE_TMY3_DATA_DIR"],
+        ep_tmy3_cache_dir=os.environ["EP_TMY3_CACHE_DIR"],
+        simulation_epw_dir=os.environ["SIMULATION_EPW_DIR"],
+        weather_dir=os.environ["WEATHER_DIR"],
+    )
+
+
+def make_building_model():
+    from BuildingControlsSimulator.BuildingModels.IDFPreprocessor import (
+        IDFPreprocessor,
+    )
+    from BuildingControlsSimulator.BuildingModels.EnergyPlusBuildingModel import (
+        EnergyPlusBuildingModel,
+    )
+    from BuildingControlsSimulator.BuildingModels.FakeFMUBackend import (
+        FakeFMUBackend,
+    )
+
+    return EnergyPlusBuildingModel(
+        idf=IDFPreprocessor(idf_file=IDF_PATH),
+        fmu_backend=FakeFMUBackend(),
+        timesteps_per_hour=12,
+    )
+
+
+def setup_data():
+    import synthetic
+    from BuildingControlsSimulator.DataClients.GCSDYDSource import (
+        GCSDYDSource,
+    )
+
+    epw_path = synthetic.setup_weather_cache(
+        archive_tmy3_dir=os.environ["ARCHIVE_TMY3_DIR"],
+        ep_tmy3_cache_dir=os.environ["EP_TMY3_CACHE_DIR"],
+    )
+    synthetic.setup_dyd_cache(
+        GCSDYDSource(local_cache=os.environ["LOCAL_CACHE_DIR"]), IDENTIFIER
+    )
+    return epw_path
+
+
+def bench_get_data(repeat):
+    """Time to load and prepare one thermostat-year of data including
+    weather file creation."""
+    sim_config = make_sim_config(
+        [IDENTIFIER], "2018-01-01", "2018-12-31 23:55"
+    )
+
+    def _get_data():
+        dc = make_data_client()
+        dc.sim_config = sim_config.iloc[0].to_dict()
+        dc.get_data()
+
+    return {"get_data_seconds_per_thermostat_year": timeit(_get_data, repeat)}
+
+
+def bench_epw(epw_path, repeat):
+    from BuildingControlsSimulator.DataClients.WeatherChannel import (
+        WeatherChannel,
+    )
+
+    weather = WeatherChannel(
+        data=None,
+        spec=None,
+        ep_tmy3_cache_dir=os.environ["EP_TMY3_CACHE_DIR"],
+        simulation_epw_dir=os.environ["SIMULATION_EPW_DIR"],
+    )
+    data, meta, meta_lines = weather.read_epw(epw_path)
+    out_path = os.path.join(
+        os.environ["SIMULATION_EPW_DIR"], "benchmark_to_epw.epw"
+    )
+
+    # read_epw uses the cache of parsed files, parse_epw always parses
+    _read = timeit(lambda: weather.read_epw(epw_path), repeat)
+    _parse = timeit(lambda: weather.parse_epw(epw_path), repeat)
+    _write = timeit(
+        lambda: weather.to_epw(
+            epw_data=data,
+            meta=meta,
+            meta_lines=meta_lines,
+            fpath=out_path,
+        ),
+        repeat,
+    )
+    return {
+        "read_epw_rows_per_second": len(data) / _read,
+        "parse_epw_rows_per_second": len(data) / _parse,
+        "to_epw_rows_per_second": len(data) / _write,
+    }
+
+
+def bench_simulation_run(days, repeat):
+    """Steps per second of `Simulation.run` with the fake FMU backend."""
+    import pandas as pd
+    from BuildingControlsSimulator.Simulator.Simulation import Simulation
+    from BuildingControlsSimulator.ControlModels.Deadband import Deadband
+
+    start_utc = pd.Timestamp("2018-06-01", tz="utc")
+    sim_config = make_sim_config(
+        [IDENTIFIER],
+        start_utc,
+        start_utc + pd.Timedelta(days=days) - pd.Timedelta(minutes=5),
+    )
+    dc = make_data_client()
+    dc.sim_config = sim_config.iloc[0].to_dict()
+    dc.get_data()
+
+    building_model = make_building_model()
+    building_model.create_model_fmu(epw_path=dc.weather.epw_path)
+
+    n_steps = []
+
+    def _run():
+        sim = Simulation(
+            config=sim_config.iloc[0],
+            data_client=dc,
+            building_model=copy.deepcopy(building_model),
+            controller_model=Deadband(deadband=1.0),
+        )
+        sim.run(local=True)
+        n_steps.append(len(sim.output))
+
+    _seconds = timeit(_run, repeat)
+    return {
+        "simulation_run_steps_per_second": n_steps[-1] / _seconds,
+        "simulation_run_seconds": _seconds,
+    }
+
+
+def bench_simulator_construction(n_identifiers, repeat):
+    """Time per simulation to construct a `Simulator` sweep."""
+    from BuildingControlsSimulator.Simulator.Simulator import Simulator
+    from BuildingControlsSimulator.ControlModels.Deadband import Deadband
+
+    sim_config = make_sim_config(
+        [f"{IDENTIFIER}_{i}" for i in range(n_identifiers)],
+        "2018-06-01",
+        "2018-06-30",
+    )
+    data_client = make_data_client()
+    building_models = [make_building_model()]
+    controller_models = [Deadband(deadband=1.0), Deadband(deadband=2.0)]
+
+    _seconds = timeit(
+        lambda: Simulator(
+            data_client=data_client,
+            sim_config=sim_config,
+            building_models=building_models,
+            controller_models=controller_models,
+        ),
+        repeat,
+    )
+    n_simulations = (
+        n_identifiers * len(building_models) * len(controller_models)
+    )
+    return {
+        "simulator_construction_seconds_per_simulation": _seconds
+        / n_simulations
+    }
+
+
+def get_git_commit():
+    try:
+        return (
+            subprocess.check_output(
+                ["git", "rev-parse", "HEAD"],
+                cwd=BENCHMARKS_DIR,
+                stderr=subprocess.DEVNULL,
+            )
+            .decode("utf-8")
+            .strip()
+        )
+    except (subprocess.CalledProcessError, OSError):
+        return None
+
+
+def load_results(results_path):
+    if not os.path.isfile(results_path):
+        return []
+    with open(results_path, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare(previous, current, threshold):
+    """Print change of each metric and return names of regressed metrics."""
+    regressions = []
+    print(f"{'metric':<50} {'previous':>12} {'current':>12} {'change':>8}")
+    for k, v in current["metrics"].items():
+        _prev = previous["metrics"].get(k) if previous else None
+        if not _prev:
+            print(f"{k:<50} {'':>12} {v:>12.5g}")
+            continue
+
+        _change = (v - _prev) / _prev
+        # a regression is lower throughput or longer duration
+        _regressed = (
+            _change < -threshold
+            if k in THROUGHPUT_METRICS
+            else _change > threshold
+        )
+        if _regressed:
+            regressions.append(k)
+        print(
+            f"{k:<50} {_prev:>12.5g} {v:>12.5g} {_change:>+8.1%}"
+            + (" REGRESSION" if _regressed else "")
+        )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--results", default=DEFAULT_RESULTS_PATH)
+    parser.add_argument(
+        "--work-dir",
+        default=None,
+        help="directory for synthetic data, defaults to a temporary dir",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--days", type=int, default=14, help="simulated days per run"
+    )
+    parser.add_argument("--n-identifiers", type=int, default=10)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative change of a metric considered a regression",
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="single repeat of 2 days"
+    )
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument(
+        "--no-save", action="store_true", help="do not append results"
+    )
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.repeat, args.days = 1, 2
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="bcs_benchmarks_")
+    setup_environment(work_dir)
+    logging.basicConfig(level=logging.WARNING)
+
+    import numpy as np
+    import pandas as pd
+
+    epw_path = setup_data()
+    metrics = {}
+    metrics.update(bench_epw(epw_path, args.repeat))
+    metrics.update(bench_get_data(args.repeat))
+    metrics.update(bench_simulation_run(args.days, args.repeat))
+    metrics.update(
+        bench_simulator_construction(args.n_identifiers, args.repeat)
+    )
+
+    result = {
+        "commit": get_git_commit(),
+        "timestamp": pd.Timestamp.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "params": {
+            "repeat": args.repeat,
+            "days": args.days,
+            "n_identifiers": args.n_identifiers,
+        },
+        "metrics": metrics,
+    }
+
+    # compare with the latest result of another commit and the same params
+    previous = [
+        r
+        for r in load_results(args.results)
+        if r.get("params") == result["params"]
+        and r.get("commit") != result["commit"]
+    ]
+    regressions = compare(
+        previous[-1] if previous else None, result, args.threshold
+    )
+
+    if not args.no_save:
+        os.makedirs(os.path.dirname(args.results), exist_ok=True)
+        with open(args.results, "a") as f:
+            f.write(json.dumps(result) + "\n")
+
+    if regressions and args.fail_on_regression:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
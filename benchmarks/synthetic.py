@@ -0,0 +1,174 @@
+"""Synthetic inputs for benchmarks that do not require EnergyPlus, GCS
+credentials, or NREL API keys."""
+
+import os
+
+import pandas as pd
+import numpy as np
+
+from BuildingControlsSimulator.DataClients.DataSpec import (
+    DonateYourDataSpec,
+    EnergyPlusWeather,
+)
+from BuildingControlsSimulator.DataClients.WeatherChannel import (
+    WeatherChannel,
+)
+
+SYNTHETIC_LATITUDE = 33.481136
+SYNTHETIC_LONGITUDE = -112.078232
+SYNTHETIC_EPW_NAME = "USA_AZ_Synthetic.722780_TMY3.epw"
+
+EPW_META_LINES = [
+    "LOCATION,Synthetic,AZ,USA,TMY3,722780,33.45,-111.98,-7.0,337.0\n",
+    "DESIGN CONDITIONS,0\n",
+    "TYPICAL/EXTREME PERIODS,0\n",
+    "GROUND TEMPERATURES,0\n",
+    "HOLIDAYS/DAYLIGHT SAVINGS,No,0,0,0\n",
+    "COMMENTS 1,Synthetic weather for benchmarks\n",
+    "COMMENTS 2,\n",
+    "DATA PERIODS,1,1,Data,Sunday, 1/ 1,12/31\n",
+]
+
+
+def make_dyd_data(start_utc="2018-01-01", end_utc="2018-12-31 23:55", seed=0):
+    """Make a DonateYourData shaped dataframe of 5 minute thermostat data."""
+    rng = np.random.default_rng(seed)
+    spec = DonateYourDataSpec()
+    date_time = pd.date_range(start_utc, end_utc, freq="5T", tz="utc")
+    n = len(date_time)
+
+    hour = date_time.hour.to_numpy()
+    day_of_year = date_time.dayofyear.to_numpy()
+    # outdoor temperature with daily and seasonal cycles in F
+    t_out = (
+        75
+        - 20 * np.cos(2 * np.pi * (day_of_year - 15) / 365)
+        - 10 * np.cos(2 * np.pi * (hour - 4) / 24)
+    )
+    heating_season = t_out < 65
+
+    data = {
+        spec.datetime_column: date_time,
+        "HvacMode": np.where(heating_season, "heat", "cool"),
+        "Event": np.full(n, ""),
+        "Schedule": np.where((hour >= 8) & (hour < 17), "Away", "Home"),
+        "T_ctrl": np.round(72 + rng.normal(0, 1, n)).astype("int16"),
+        "T_stp_cool": np.full(n, 76, dtype="int16"),
+        "T_stp_heat": np.full(n, 68, dtype="int16"),
+        "HumidityExpectedLow": np.full(n, 30.0, dtype="float32"),
+        "HumidityExpectedHigh": np.full(n, 60.0, dtype="float32"),
+        "Thermostat_Temperature": np.round(72 + rng.normal(0, 1, n)).astype(
+            "int16"
+        ),
+        "Humidity": np.round(40 + rng.normal(0, 5, n)).astype("int16"),
+        "Thermostat_Motion": rng.random(n) < 0.2,
+        "T_out": np.round(t_out + rng.normal(0, 2, n)).astype("int16"),
+        "RH_out": np.clip(40 + rng.normal(0, 10, n), 0, 100).astype("float32"),
+    }
+
+    # equipment runtime in seconds of each 5 minute interval
+    runtime = (rng.random(n) * 300).astype("int16")
+    for col in [
+        "auxHeat1",
+        "auxHeat2",
+        "auxHeat3",
+        "compCool1",
+        "compCool2",
+        "compHeat1",
+        "compHeat2",
+        "fan",
+    ]:
+        data[col] = np.zeros(n, dtype="int16")
+    data["auxHeat1"] = np.where(heating_season, runtime, 0)
+    data["compCool1"] = np.where(~heating_season, runtime, 0)
+    data["fan"] = runtime
+
+    _df = pd.DataFrame.from_dict(data)
+    # remote sensors are not used by synthetic thermostats
+    for col in spec.full.columns:
+        if col not in _df.columns:
+            _df[col] = pd.NA
+
+    return _df[spec.full.columns]
+
+
+def make_epw_data(year=2018, seed=0):
+    """Make EnergyPlus weather data with 8760 hourly records."""
+    rng = np.random.default_rng(seed)
+    date_time = pd.date_range(f"{year}-01-01", periods=8760, freq="H", tz=None)
+    hour = date_time.hour.to_numpy()
+    day_of_year = date_time.dayofyear.to_numpy()
+    temp_air = (
+        24
+        - 11 * np.cos(2 * np.pi * (day_of_year - 15) / 365)
+        - 6 * np.cos(2 * np.pi * (hour - 4) / 24)
+    )
+    relative_humidity = np.clip(35 + rng.normal(0, 10, 8760), 5, 100)
+
+    data = pd.DataFrame(
+        0, index=np.arange(8760), columns=EnergyPlusWeather.epw_columns
+    )
+    data["year"] = date_time.year
+    data["month"] = date_time.month
+    data["day"] = date_time.day
+    # EPW format uses hour = [1-24]
+    data["hour"] = hour + 1
+    data["minute"] = 0
+    data["data_source_unct"] = (
+        "?9?9?9?9E0?9?9?9?9?9?9?9?9?9?9?9?9?9?9?9*9*9?9?9?9"
+    )
+    data["temp_air"] = np.round(temp_air, 1)
+    data["relative_humidity"] = np.round(relative_humidity).astype(int)
+    data["temp_dew"] = np.round(temp_air - (100 - relative_humidity) / 5, 1)
+    data["atmospheric_pressure"] = 97000
+    data["ghi"] = np.round(
+        np.clip(900 * np.sin(np.pi * (hour - 6) / 12), 0, None)
+    ).astype(int)
+    data["wind_speed"] = np.round(rng.random(8760) * 5, 1)
+    data["visibility"] = 9999
+    data["ceiling_height"] = 99999
+    data["present_weather_observation"] = 9
+    data["present_weather_codes"] = 999999999
+    data["aerosol_optical_depth"] = 0.1
+    data["days_since_last_snowfall"] = 88
+    data["liquid_precipitation_quantity"] = 1.0
+    return data
+
+
+def write_epw(fpath, year=2018, seed=0):
+    data = make_epw_data(year=year, seed=seed)
+    with open(fpath, "w") as f:
+        for line in EPW_META_LINES:
+            f.write(line)
+        data.to_csv(f, header=False, index=False)
+    return fpath
+
+
+def setup_weather_cache(archive_tmy3_dir, ep_tmy3_cache_dir):
+    """Make the cached TMY station list and TMY file so that weather lookup
+    does not need network access."""
+    os.makedirs(archive_tmy3_dir, exist_ok=True)
+    os.makedirs(ep_tmy3_cache_dir, exist_ok=True)
+    epw_path = write_epw(os.path.join(ep_tmy3_cache_dir, SYNTHETIC_EPW_NAME))
+
+    stations = pd.DataFrame.from_dict(
+        {
+            "properties.epw": [
+                f"<a href=https://example.com/{SYNTHETIC_EPW_NAME}>"
+            ],
+            "lat": [np.radians(SYNTHETIC_LATITUDE)],
+            "lon": [np.radians(SYNTHETIC_LONGITUDE)],
+        }
+    )
+    stations.to_csv(
+        os.path.join(archive_tmy3_dir, WeatherChannel.tmy_station_cache_name),
+        index=False,
+    )
+    return epw_path
+
+
+def setup_dyd_cache(source, identifier, **kwargs):
+    """Put synthetic DYD data into the local cache of a GCSDYDSource."""
+    source.put_cache(
+        make_dyd_data(**kwargs), source.get_local_cache_path(identifier)
+    )
@@ -2,21 +2,23 @@
 
 import os
 import logging
-import subprocess
-import shlex
+import hashlib
 import shutil
+import tempfile
 from enum import IntEnum
 
 import pandas as pd
 import attr
 import numpy as np
-import pyfmi
 
 from BuildingControlsSimulator.DataClients.DataStates import STATES
 from BuildingControlsSimulator.DataClients.DataSpec import Internal
 from BuildingControlsSimulator.BuildingModels.BuildingModel import (
     BuildingModel,
 )
+from BuildingControlsSimulator.BuildingModels.PyFMIBackend import (
+    PyFMIBackend,
+)
 
 
 from BuildingControlsSimulator.ControlModels.ControlModel import ControlModel
@@ -58,11 +60,22 @@ class EnergyPlusBuildingModel(BuildingModel):
     eplustofmu_path = attr.ib(default=os.environ.get("ENERGYPLUSTOFMUSCRIPT"))
     ext_dir = attr.ib(default=os.environ.get("EXT_DIR"))
     fmu_output = attr.ib(factory=dict)
+    # FMU output variables read each step, see `IDFPreprocessor.output_spec`
+    fmu_output_keys = attr.ib(factory=list)
     output = attr.ib(factory=dict)
     step_output = attr.ib(factory=dict)
     init_humidity = attr.ib(default=50.0)
     init_temperature = attr.ib(default=21.0)
     fmu = attr.ib(default=None)
+    # creates and loads the FMU, see `FMUBackend`
+    fmu_backend = attr.ib(factory=PyFMIBackend)
+    # FMU instances are unpacked and run in their own dir in fmu_scratch_dir,
+    # e.g. tmpfs /dev/shm, so that EnergyPlus output files are not on disk
+    fmu_scratch_dir = attr.ib(default=os.environ.get("FMU_SCRATCH_DIR"))
+    # remove run dir of FMU instance on tear down, run dirs of failed
+    # simulations are kept
+    fmu_scratch_cleanup = attr.ib(type=bool, default=True)
+    fmu_run_dir = attr.ib(default=None)
 
     # for reference on how attr defaults wor for mutable types (e.g. list) see:
     # https://www.attrs.org/en/stable/init.html#defaults
@@ -123,9 +136,12 @@ class EnergyPlusBuildingModel(BuildingModel):
 
         # the full fmu name is unique per combination of:
         # 1. IDF file
-        # 2. weather service used
-        # 3. thermostat ID
+        # 2. simulation weather file
         # this is because the simulation weather is compiled into the FMU
+        # simulation weather files are named by content hash so thermostats
+        # with identical weather share the same FMU
+        # with `idf.weather_input` the weather file is the TMY weather of
+        # the nearest station and the FMU is shared by all its thermostats
         fmu_name = (
             self.idf.idf_prep_name
             + "_"
@@ -147,13 +163,48 @@ class EnergyPlusBuildingModel(BuildingModel):
     def fmu_path(self):
         return os.path.join(self.fmu_dir, self.fmu_name)
 
-    def create_model_fmu(self, epw_path=None, preprocess_check=False):
-        """make the fmu
+    def make_fmu_run_dir(self):
+        """Make run dir of FMU instance in fmu_scratch_dir."""
+        os.makedirs(self.fmu_scratch_dir, exist_ok=True)
+        self.fmu_run_dir = tempfile.mkdtemp(
+            prefix=os.path.splitext(self.fmu_name)[0] + "_",
+            dir=self.fmu_scratch_dir,
+        )
+        return self.fmu_run_dir
+
+    def get_params(self, epw_path=None):
+        """Get attributes that define building model behaviour. The IDF and
+        weather files are identified by content so that the params are known
+        before the FMU is created."""
+
+        def _file_hash(fpath):
+            if not fpath or not os.path.isfile(fpath):
+                return None
+            with open(fpath, "rb") as f:
+                return hashlib.sha1(f.read()).hexdigest()
+
+        params = {
+            "idf_hash": _file_hash(self.idf.idf_file),
+            "epw_hash": _file_hash(epw_path or self.epw_path),
+            "fmu_backend": type(self.fmu_backend).__name__,
+            "ep_version": self.idf.ep_version,
+            "fmi_version": self.fmi_version,
+            "timesteps_per_hour": self.timesteps_per_hour,
+            "init_temperature": self.init_temperature,
+            "init_humidity": self.init_humidity,
+            "init_control_type": self.idf.init_control_type,
+            "weather_input": self.idf.weather_input,
+            "zone_output_spec": self.idf.zone_output_spec,
+            "building_output_spec": self.idf.building_output_spec,
+        }
+        if self.idf.output_profile != "full":
+            params["output_profile"] = self.idf.output_profile
+        if self.idf.variant_overrides:
+            params["variant_overrides"] = self.idf.variant_overrides
+        return params
 
-        Calls FMU model generation script from https://github.com/lbl-srg/EnergyPlusToFMU.
-        This script litters temporary files of fixed names which get clobbered
-        if running in parallel. Need to fix scripts to be able to run in parallel.
-        """
+    def create_model_fmu(self, epw_path=None, preprocess_check=False):
+        """make the fmu using the FMU backend, by default EnergyPlusToFMU"""
         if epw_path:
             self.epw_path = epw_path
 
@@ -164,27 +215,10 @@ class EnergyPlusBuildingModel(BuildingModel):
         self.idf.timesteps_per_hour = self.timesteps_per_hour
         self.idf.init_temperature = self.init_temperature
         self.idf.init_humidity = self.init_humidity
-        self.idf.preprocess(preprocess_check=preprocess_check)
-
-        cmd = f"python2.7 {self.eplustofmu_path}"
-        cmd += f" -i {self.idf.idd_path}"
-        cmd += f" -w {self.epw_path}"
-        cmd += f" -a {self.fmi_version}"
-        cmd += f" -d {self.idf.idf_prep_path}"
-
-        proc = subprocess.run(shlex.split(cmd), stdout=subprocess.PIPE)
-        if not proc.stdout:
-            raise ValueError(
-                f"Empty STDOUT. Invalid EnergyPlusToFMU cmd={cmd}"
-            )
-
-        # EnergyPlusToFMU puts fmu in cwd always, move out of cwd
-        shutil.move(
-            os.path.join(os.getcwd(), self.init_fmu_name), self.fmu_path,
+        return self.fmu_backend.create_model_fmu(
+            self, preprocess_check=preprocess_check
         )
 
-        return self.fmu_path
-
     def initialize(self, t_start, t_end, t_step, categories_dict={}):
         """
         """
@@ -192,16 +226,76 @@ class EnergyPlusBuildingModel(BuildingModel):
         self.allocate_output_memory(t_start, t_end, t_step, categories_dict)
         self.init_step_output()
 
-        self.fmu = pyfmi.load_fmu(fmu=self.fmu_path)
+        self.fmu = self.fmu_backend.load_fmu(self)
         # initialize for extra step to keep whole days for final period at 23:55
         self.fmu.initialize(t_start, t_end + t_step)
 
+    @property
+    def supports_fmu_state(self):
+        """FMI 2.0 FMUs can optionally get and serialize their state."""
+        if not hasattr(self.fmu, "get_capability_flags"):
+            return False
+        _flags = self.fmu.get_capability_flags()
+        return bool(
+            _flags.get("canGetAndSetFMUstate")
+            and _flags.get("canSerializeFMUstate")
+        )
+
+    def get_fmu_state(self):
+        """Get serialized FMU state."""
+        if not self.supports_fmu_state:
+            raise ValueError(
+                f"FMU does not support serializing state: {self.fmu_path}"
+            )
+        _state = self.fmu.get_fmu_state()
+        serialized_state = self.fmu.serialize_fmu_state(_state)
+        self.fmu.free_fmu_state(_state)
+        return serialized_state
+
+    def set_fmu_state(self, serialized_state):
+        """Set FMU state from serialized FMU state. The FMU must be
+        initialized first."""
+        if not self.supports_fmu_state:
+            raise ValueError(
+                f"FMU does not support serializing state: {self.fmu_path}"
+            )
+        _state = self.fmu.deserialize_fmu_state(serialized_state)
+        self.fmu.set_fmu_state(_state)
+        self.fmu.free_fmu_state(_state)
+
+    def get_checkpoint(self):
+        """Get all state needed to resume simulation of building model."""
+        return {
+            "fmu_state": self.get_fmu_state(),
+            "output": self.output,
+            "fmu_output": self.fmu_output,
+            "step_output": self.step_output,
+            "current_t_idx": self.current_t_idx,
+        }
+
+    def set_checkpoint(self, checkpoint):
+        """Restore building model from checkpoint. The model must be
+        initialized first, output memory is restored into the allocated
+        output memory so that the simulation period can be extended."""
+        self.set_fmu_state(checkpoint["fmu_state"])
+        # output memory is optional, e.g. for warmup snapshots
+        if "output" in checkpoint:
+            ControlModel.restore_output(self.output, checkpoint["output"])
+        if "fmu_output" in checkpoint:
+            ControlModel.restore_output(
+                self.fmu_output, checkpoint["fmu_output"]
+            )
+        self.step_output = dict(checkpoint["step_output"])
+        self.current_t_idx = checkpoint["current_t_idx"]
+
     def tear_down(self):
         """tear down FMU"""
         # Note: calling fmu.terminate() and fmu.free_instance() should not be needed
         # this causes segfault sometimes
         # energyplus FMU should take care of its own destruction
-        pass
+        if self.fmu_run_dir and self.fmu_scratch_cleanup:
+            shutil.rmtree(self.fmu_run_dir, ignore_errors=True)
+            self.fmu_run_dir = None
 
     def init_step_output(self):
         self.step_output[STATES.THERMOSTAT_TEMPERATURE] = self.init_temperature
@@ -248,12 +342,14 @@ class EnergyPlusBuildingModel(BuildingModel):
             STATES.SIMULATION_TIME
         ]
 
+        # only the outputs of the output profile of the IDF are allocated
         for k, v in self.idf.output_spec.items():
             (
                 np_default_value,
                 np_dtype,
             ) = Conversions.numpy_down_cast_default_value_dtype(v["dtype"])
             self.fmu_output[k] = np.full(n_s, np_default_value, dtype=np_dtype)
+        self.fmu_output_keys = list(self.idf.output_spec.keys())
 
         # set current time
         self.current_time = t_start
@@ -275,6 +371,8 @@ class EnergyPlusBuildingModel(BuildingModel):
         self.current_t_start = t_start
 
         # set input
+        if self.idf.weather_input:
+            self.set_weather_input(step_weather_input)
         self.actuate_HVAC_equipment(step_control_input)
 
         status = self.fmu.do_step(
@@ -290,10 +388,12 @@ class EnergyPlusBuildingModel(BuildingModel):
 
         self.fmu_output[STATES.STEP_STATUS][self.current_t_idx] = status
 
-        # get fmi zone output
-        # breakpoint()
-        for k, v in self.idf.output_spec.items():
-            self.fmu_output[k][self.current_t_idx] = self.fmu.get(k)[0]
+        # get fmi zone output, all outputs are read in one FMI call
+        if self.fmu_output_keys:
+            for k, value in zip(
+                self.fmu_output_keys, self.fmu.get(self.fmu_output_keys)
+            ):
+                self.fmu_output[k][self.current_t_idx] = value
 
         # map fmu output to model output
         self.output[STATES.THERMOSTAT_TEMPERATURE][
@@ -357,6 +457,23 @@ class EnergyPlusBuildingModel(BuildingModel):
             ]
         )
 
+    def set_weather_input(self, step_weather_input):
+        """Set outdoor weather of step in FMU. Missing values are not set
+        so the FMU keeps the last valid value."""
+        for state, fmu_name in [
+            (
+                STATES.OUTDOOR_TEMPERATURE,
+                self.idf.FMU_weather_temperature_name,
+            ),
+            (
+                STATES.OUTDOOR_RELATIVE_HUMIDITY,
+                self.idf.FMU_weather_humidity_name,
+            ),
+        ]:
+            _value = step_weather_input[state]
+            if not pd.isnull(_value):
+                self.fmu.set(fmu_name, float(_value))
+
     def actuate_HVAC_equipment(self, step_control_input):
         """
         passes actuation to building model with minimal validation.
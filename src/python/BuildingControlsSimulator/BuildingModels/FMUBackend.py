@@ -0,0 +1,37 @@
+import logging
+from abc import ABC, abstractmethod
+
+import attr
+
+logger = logging.getLogger(__name__)
+
+
+@attr.s(kw_only=True)
+class FMUBackend(ABC):
+    """Abstract Base Class for FMU backends of `EnergyPlusBuildingModel`.
+
+    A backend creates the FMU of a building model and loads it for
+    simulation. The loaded FMU must implement the subset of the pyfmi FMU
+    interface used by the building model: initialize, do_step, get, set,
+    and get_model_variables.
+    """
+
+    # loaded FMUs can get, set, and serialize their state, see
+    # `EnergyPlusBuildingModel.get_checkpoint`
+    supports_fmu_state = False
+
+    @abstractmethod
+    def create_model_fmu(self, building_model, preprocess_check=False):
+        """Create FMU of building model.
+
+        :return: path of FMU
+        """
+        pass
+
+    @abstractmethod
+    def load_fmu(self, building_model):
+        """Load FMU of building model.
+
+        :return: FMU model object
+        """
+        pass
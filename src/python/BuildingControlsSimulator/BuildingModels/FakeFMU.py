@@ -0,0 +1,145 @@
+import logging
+import pickle
+
+import attr
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@attr.s(kw_only=True)
+class FakeFMU:
+    """Deterministic pure-Python stand-in of an EnergyPlus FMU.
+
+    Implements the subset of the pyfmi FMU interface used by
+    `EnergyPlusBuildingModel`, including FMI 2.0 state serialization. The
+    zone air temperature follows a first order response to outdoor
+    temperature and to heating or cooling at fixed capacity. The outdoor
+    temperature is a daily cycle unless outdoor weather inputs are named,
+    see `IDFPreprocessor.weather_input`. Output
+    variables are resolved by the suffix of the FMU variable names made by
+    `IDFPreprocessor.prep_ext_int_output`.
+    """
+
+    output_names = attr.ib()
+    control_type_name = attr.ib(default="FMU_T_control_type")
+    heating_stp_name = attr.ib(default="FMU_T_heating_stp")
+    cooling_stp_name = attr.ib(default="FMU_T_cooling_stp")
+    outdoor_temperature_name = attr.ib(default=None)
+    outdoor_humidity_name = attr.ib(default=None)
+    init_temperature = attr.ib(default=21.0)
+    # time constant of zone air temperature response in seconds
+    tau = attr.ib(default=4.0 * 3600.0)
+    # change of zone air temperature per hour of heating or cooling
+    heating_rate = attr.ib(default=4.0)
+    cooling_rate = attr.ib(default=3.0)
+    # EPLUS_THERMOSTAT_MODES values of control type input
+    heating_control_type = attr.ib(default=1)
+    cooling_control_type = attr.ib(default=2)
+
+    values = attr.ib(factory=dict)
+    time = attr.ib(default=None)
+    zone_temperature = attr.ib(default=None)
+
+    def initialize(self, start_time, stop_time):
+        self.values = {name: 0.0 for name in self.output_names}
+        self.values[self.control_type_name] = 0
+        self.values[self.heating_stp_name] = -60.0
+        self.values[self.cooling_stp_name] = 99.0
+        if self.outdoor_temperature_name:
+            self.values[
+                self.outdoor_temperature_name
+            ] = FakeFMU.outdoor_temperature(start_time)
+        if self.outdoor_humidity_name:
+            self.values[self.outdoor_humidity_name] = 40.0
+        self.zone_temperature = self.init_temperature
+        self.time = start_time
+        self.update_values()
+
+    def get_model_variables(self):
+        return dict.fromkeys(self.values)
+
+    def get(self, name):
+        if isinstance(name, str):
+            return np.array([self.values[name]])
+        return np.array([self.values[_name] for _name in name])
+
+    def set(self, name, value):
+        self.values[name] = value
+
+    @staticmethod
+    def outdoor_temperature(t):
+        # daily cycle of outdoor temperature
+        return 20.0 - 8.0 * np.cos(2.0 * np.pi * (t % 86400.0) / 86400.0)
+
+    def get_outdoor_temperature(self, t):
+        if self.outdoor_temperature_name:
+            return self.values[self.outdoor_temperature_name]
+        return FakeFMU.outdoor_temperature(t)
+
+    def get_outdoor_humidity(self):
+        if self.outdoor_humidity_name:
+            return self.values[self.outdoor_humidity_name]
+        return 40.0
+
+    def do_step(self, current_t, step_size, new_step=True):
+        _control_type = self.values[self.control_type_name]
+        _hvac_rate = 0.0
+        if _control_type == self.heating_control_type:
+            _hvac_rate = self.heating_rate
+        elif _control_type == self.cooling_control_type:
+            _hvac_rate = -self.cooling_rate
+
+        self.zone_temperature += step_size * (
+            (self.get_outdoor_temperature(current_t) - self.zone_temperature)
+            / self.tau
+            + _hvac_rate / 3600.0
+        )
+        self.time = current_t + step_size
+        self.update_values()
+        return 0
+
+    def update_values(self):
+        _t_out = self.get_outdoor_temperature(self.time)
+        for name in self.output_names:
+            # building output names are made from capitalized EnergyPlus names
+            _name = name.lower()
+            if _name.endswith("_zone_air_temperature"):
+                self.values[name] = self.zone_temperature
+            elif _name.endswith("_zone_mean_air_dewpoint_temperature"):
+                self.values[name] = self.zone_temperature - 10.0
+            elif _name.endswith("_site_outdoor_air_drybulb_temperature"):
+                self.values[name] = _t_out
+            elif _name.endswith("_site_outdoor_air_relative_humidity"):
+                self.values[name] = self.get_outdoor_humidity()
+            elif _name.endswith("_heating_setpoint_temperature"):
+                self.values[name] = self.values[self.heating_stp_name]
+            elif _name.endswith("_cooling_setpoint_temperature"):
+                self.values[name] = self.values[self.cooling_stp_name]
+
+    def get_capability_flags(self):
+        return {
+            "canGetAndSetFMUstate": True,
+            "canSerializeFMUstate": True,
+        }
+
+    def get_fmu_state(self):
+        return {
+            "values": dict(self.values),
+            "time": self.time,
+            "zone_temperature": self.zone_temperature,
+        }
+
+    def set_fmu_state(self, state):
+        self.values = dict(state["values"])
+        self.time = state["time"]
+        self.zone_temperature = state["zone_temperature"]
+
+    def free_fmu_state(self, state):
+        pass
+
+    def serialize_fmu_state(self, state):
+        return pickle.dumps(state)
+
+    def deserialize_fmu_state(self, serialized_state):
+        return pickle.loads(serialized_state)
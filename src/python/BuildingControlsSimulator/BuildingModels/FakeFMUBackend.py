@@ -0,0 +1,47 @@
+import logging
+
+import attr
+
+from BuildingControlsSimulator.BuildingModels.FMUBackend import FMUBackend
+from BuildingControlsSimulator.BuildingModels.FakeFMU import FakeFMU
+
+logger = logging.getLogger(__name__)
+
+
+@attr.s(kw_only=True)
+class FakeFMUBackend(FMUBackend):
+    """In-process backend using `FakeFMU` so that the simulation loop can be
+    tested and profiled without EnergyPlus, EnergyPlusToFMU, or pyfmi.
+
+    No FMU file is created. The IDF is only read to make the output spec,
+    so the FMU variable names and FMI calls per step are the same as for
+    the EnergyPlus FMU.
+    """
+
+    fake_fmu_kwargs = attr.ib(factory=dict)
+
+    supports_fmu_state = True
+
+    def create_model_fmu(self, building_model, preprocess_check=False):
+        idf = building_model.idf
+        idf.get_zone_info()
+        idf.prep_ext_int_output()
+        return building_model.fmu_path
+
+    def load_fmu(self, building_model):
+        idf = building_model.idf
+        weather_input_kwargs = {}
+        if idf.weather_input:
+            weather_input_kwargs = {
+                "outdoor_temperature_name": idf.FMU_weather_temperature_name,
+                "outdoor_humidity_name": idf.FMU_weather_humidity_name,
+            }
+        return FakeFMU(
+            output_names=list(idf.output_spec.keys()),
+            control_type_name=idf.FMU_control_type_name,
+            heating_stp_name=idf.FMU_control_heating_stp_name,
+            cooling_stp_name=idf.FMU_control_cooling_stp_name,
+            init_temperature=building_model.init_temperature,
+            **weather_input_kwargs,
+            **self.fake_fmu_kwargs,
+        )
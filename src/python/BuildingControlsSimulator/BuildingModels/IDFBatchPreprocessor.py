@@ -0,0 +1,204 @@
+import os
+import re
+import json
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import attr
+
+from BuildingControlsSimulator.BuildingModels.IDFPreprocessor import (
+    IDFPreprocessor,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@attr.s(kw_only=True)
+class IDFBatchPreprocessor:
+    """Preprocesses a corpus of IDF files across a process pool and writes a
+    manifest of the results.
+
+    The manifest records the preprocessed IDF path and zone information of
+    each source IDF, so that simulations can create preprocessed
+    `IDFPreprocessor` instances from it without parsing any IDF.
+    """
+
+    # IDF files or directories of IDF files
+    idf_paths = attr.ib()
+    # keyword arguments of each `IDFPreprocessor`
+    preprocessor_kwargs = attr.ib(factory=dict)
+    n_workers = attr.ib(default=None)
+    preprocess_check = attr.ib(type=bool, default=False)
+    manifest_path = attr.ib(default=None)
+
+    manifest_version = 1
+    # debug version transition outputs are written next to source IDFs
+    transition_fname_regex = re.compile(r"_\d+-\d+-\d+\.idf$")
+
+    def __attrs_post_init__(self):
+        if isinstance(self.idf_paths, str):
+            self.idf_paths = [self.idf_paths]
+        if self.manifest_path is None:
+            self.manifest_path = os.path.join(
+                self.preprocessor_kwargs.get(
+                    "idf_dir", os.environ.get("IDF_DIR")
+                ),
+                "preprocessed",
+                "prep_manifest.json",
+            )
+
+    def get_idf_files(self):
+        """Get all source IDF files, directories are not searched
+        recursively."""
+        idf_files = []
+        for path in self.idf_paths:
+            if os.path.isdir(path):
+                idf_files += [
+                    os.path.join(path, fname)
+                    for fname in sorted(os.listdir(path))
+                    if fname.endswith(".idf")
+                    and not self.transition_fname_regex.search(fname)
+                ]
+            else:
+                idf_files.append(path)
+        return idf_files
+
+    def run(self):
+        """Preprocess all IDF files and write manifest.
+
+        :return: manifest
+        """
+        idf_files = self.get_idf_files()
+        logger.info(
+            f"Preprocessing {len(idf_files)} IDF files "
+            + f"with n_workers={self.n_workers}"
+        )
+        with ProcessPoolExecutor(max_workers=self.n_workers) as executor:
+            records = list(
+                executor.map(
+                    preprocess_idf,
+                    idf_files,
+                    [self.preprocessor_kwargs] * len(idf_files),
+                    [self.preprocess_check] * len(idf_files),
+                )
+            )
+
+        manifest = {
+            "manifest_version": IDFBatchPreprocessor.manifest_version,
+            "idfs": {},
+        }
+        for record in records:
+            if "error" in record:
+                logger.error(
+                    f"Failed to preprocess {record['idf_file']}: "
+                    + record["error"]
+                )
+            if record["idf_name"] in manifest["idfs"]:
+                logger.warning(
+                    f"Duplicate IDF name in manifest: {record['idf_name']}"
+                )
+            manifest["idfs"][record["idf_name"]] = record
+
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        # write to temporary file first so readers never see partial files
+        with open(self.manifest_path + ".tmp", "w") as f:
+            json.dump(manifest, f, indent=2, default=str)
+        os.replace(self.manifest_path + ".tmp", self.manifest_path)
+        return manifest
+
+    @staticmethod
+    def load_manifest(manifest_path):
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+        if manifest.get("manifest_version") != (
+            IDFBatchPreprocessor.manifest_version
+        ):
+            raise ValueError(f"Unsupported manifest version: {manifest_path}")
+        return manifest
+
+    @staticmethod
+    def get_idf(manifest, idf_name, **kwargs):
+        """Create `IDFPreprocessor` of manifest record. If kwargs give the
+        same preprocessing parameters as the batch, the preprocessing
+        results are restored without parsing or hashing the IDF.
+
+        :param kwargs: keyword arguments of `IDFPreprocessor`
+        """
+        record = manifest["idfs"][idf_name]
+        if "error" in record:
+            raise ValueError(
+                f"IDF failed preprocessing: {idf_name}: {record['error']}"
+            )
+        idf = IDFPreprocessor(
+            idf_file=record["idf_file"], idf_hash=record["idf_hash"], **kwargs
+        )
+        if idf.get_prep_key() == record["prep_key"] and os.path.isfile(
+            idf.idf_prep_path
+        ):
+            for k in IDFPreprocessor.prep_cache_attrs:
+                setattr(idf, k, record[k])
+        return idf
+
+
+def preprocess_idf(idf_file, preprocessor_kwargs, preprocess_check=False):
+    """Preprocess single IDF file, runs in worker processes.
+
+    :return: manifest record
+    """
+    record = {
+        "idf_file": os.path.abspath(idf_file),
+        "idf_name": os.path.basename(idf_file),
+    }
+    try:
+        idf = IDFPreprocessor(idf_file=idf_file, **preprocessor_kwargs)
+        # key is of source IDF, transitions replace `idf.idf_file`
+        prep_key = idf.get_prep_key()
+        record["idf_hash"] = idf.idf_hash
+        record["idf_prep_path"] = idf.preprocess(
+            preprocess_check=preprocess_check
+        )
+    except Exception as e:
+        record["error"] = repr(e)
+        return record
+
+    record["prep_key"] = prep_key
+    record["ep_version"] = idf.ep_version
+    for k in IDFPreprocessor.prep_cache_attrs:
+        record[k] = getattr(idf, k)
+    return record
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Preprocess IDF files in parallel and write a manifest."
+    )
+    parser.add_argument(
+        "idf_paths", nargs="+", help="IDF files or directories of IDF files"
+    )
+    parser.add_argument("--manifest-path", default=None)
+    parser.add_argument("--n-workers", type=int, default=None)
+    parser.add_argument("--timesteps-per-hour", type=int, default=12)
+    parser.add_argument("--init-temperature", type=float, default=21.0)
+    parser.add_argument("--weather-input", action="store_true")
+    parser.add_argument("--preprocess-check", action="store_true")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    manifest = IDFBatchPreprocessor(
+        idf_paths=args.idf_paths,
+        preprocessor_kwargs={
+            "timesteps_per_hour": args.timesteps_per_hour,
+            "init_temperature": args.init_temperature,
+            "weather_input": args.weather_input,
+        },
+        n_workers=args.n_workers,
+        preprocess_check=args.preprocess_check,
+        manifest_path=args.manifest_path,
+    ).run()
+    n_failed = sum(1 for r in manifest["idfs"].values() if "error" in r)
+    return 1 if n_failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,208 @@
+import os
+import logging
+import platform
+
+import attr
+from eppy.bunchhelpers import scientificnotation
+
+logger = logging.getLogger(__name__)
+
+
+@attr.s(kw_only=True)
+class IDFObjectIndex:
+    """Indexed editing of an eppy IDF model.
+
+    eppy stores the objects of each IDF object type in two lists that must
+    be kept in sync (`Idf_MSequence.list1` of bunches and `list2` of raw
+    objects). Deleting by index from these lists is linear in the object
+    count, so removals are done in bulk by rebuilding both lists in place.
+    Objects are looked up by name with per object type indexes, and the
+    zone information is collected in one pass over the zone objects.
+    The model is written in the same format as `IDF.save` without eppy's
+    per field lookups of field comments.
+    """
+
+    ep_idf = attr.ib()
+    zone_lists = attr.ib(factory=dict)
+    conditioned_zones = attr.ib(factory=list)
+    occupied_zones = attr.ib(factory=list)
+    thermostats = attr.ib(factory=list)
+    _name_indexes = attr.ib(factory=dict)
+    _field_comments = attr.ib(factory=dict)
+
+    # object types defining conditioned zones and their zone field
+    conditioned_zone_fields = {
+        "ZoneHVAC:EquipmentConnections": "Zone_Name",
+        "ZoneVentilation:DesignFlowRate": "Zone_or_ZoneList_Name",
+        "Sizing:Zone": "Zone_or_ZoneList_Name",
+    }
+
+    def remove_all(self, key):
+        """Remove all objects of object type."""
+        if key in self.ep_idf.idfobjects:
+            self.remove_where(key, lambda obj: True)
+
+    def remove_where(self, key, predicate):
+        """Remove all objects of object type for which predicate is true.
+
+        :return: number of removed objects
+        """
+        idf_objs = self.ep_idf.idfobjects[key]
+        keep = [not predicate(obj) for obj in idf_objs.list1]
+        n_removed = keep.count(False)
+        if n_removed:
+            for obj, _keep in zip(idf_objs.list1, keep):
+                if not _keep:
+                    obj.theidf = None
+            # lists are shared with the model and must be modified in place
+            idf_objs.list1[:] = [
+                obj for obj, _keep in zip(idf_objs.list1, keep) if _keep
+            ]
+            idf_objs.list2[:] = [
+                obj for obj, _keep in zip(idf_objs.list2, keep) if _keep
+            ]
+            self._name_indexes.pop(key.upper(), None)
+        return n_removed
+
+    def get_object(self, key, name):
+        """Get object of object type by name, names are case insensitive.
+
+        :return: object or None if not found
+        """
+        idf_objs = self.ep_idf.idfobjects[key]
+        # objects may be added with `IDF.newidfobject` or removed with eppy,
+        # both change the object count or the last object
+        objs_key = (
+            len(idf_objs.list1),
+            id(idf_objs.list1[-1]) if idf_objs.list1 else None,
+        )
+        cached_key, name_index = self._name_indexes.get(
+            key.upper(), (None, None)
+        )
+        if cached_key != objs_key or name_index is None:
+            name_index = {}
+            for obj in idf_objs.list1:
+                name_index.setdefault(str(obj.obj[1]).upper(), obj)
+            self._name_indexes[key.upper()] = (objs_key, name_index)
+        return name_index.get(name.upper())
+
+    def set_fields(self, overrides):
+        """Set fields of objects.
+
+        :param overrides: list of (object type, object name, field name,
+        value), object name "*" sets field of all objects of object type
+        :return: undo list of objects and their previous raw fields, see
+        `restore_fields`
+        """
+        undo = []
+        for key, name, field, value in overrides:
+            if name == "*":
+                objs = list(self.ep_idf.idfobjects[key])
+            else:
+                obj = self.get_object(key, name)
+                if obj is None:
+                    raise ValueError(f"IDF object not found: {key}, {name}")
+                objs = [obj]
+            for obj in objs:
+                undo.append((obj, list(obj.obj)))
+                obj[field] = value
+        return undo
+
+    @staticmethod
+    def restore_fields(undo):
+        """Restore objects changed by `set_fields`."""
+        for obj, fields in reversed(undo):
+            obj.obj[:] = fields
+
+    def expand_zones(self, zone_or_zone_list):
+        """Get zones of zone or zone list name."""
+        return self.zone_lists.get(zone_or_zone_list, [zone_or_zone_list])
+
+    def build_zone_index(self):
+        """Collect zone lists, conditioned zones, occupied zones and
+        thermostats."""
+        idfobjects = self.ep_idf.idfobjects
+        # raw object fields are: object type, name, zones
+        self.zone_lists = {
+            obj.obj[1]: [z for z in obj.obj[2:] if z != ""]
+            for obj in idfobjects["ZoneList"]
+        }
+
+        # dict keeps first seen order of zones
+        conditioned_zones = {}
+        for key, field in IDFObjectIndex.conditioned_zone_fields.items():
+            for obj in idfobjects[key]:
+                for z in self.expand_zones(obj[field]):
+                    conditioned_zones[z] = None
+        self.conditioned_zones = list(conditioned_zones.keys())
+
+        occupied_zones = {}
+        for obj in idfobjects["People"]:
+            for z in self.expand_zones(obj.Zone_or_ZoneList_Name):
+                occupied_zones[z] = None
+        self.occupied_zones = list(occupied_zones.keys())
+
+        self.thermostats = list(idfobjects["ZoneControl:Thermostat"])
+
+    def get_field_comments(self, obj):
+        """Field comments of object type, cached per object type."""
+        objls = obj.objls
+        # fields are added to extensible object types on demand
+        cache_key = (obj.key.upper(), len(objls))
+        comments = self._field_comments.get(cache_key)
+        if comments is None:
+            objidd = obj.objidd
+            first_index = {}
+            for i, fieldname in enumerate(objls):
+                first_index.setdefault(fieldname, i)
+            comments = []
+            for fieldname in objls:
+                comment = fieldname.replace("_", " ")
+                units = objidd[first_index[fieldname]].get("units")
+                comments.append(
+                    f"{comment} {{{units[0]}}}" if units else comment
+                )
+            self._field_comments[cache_key] = comments
+        return comments
+
+    def get_object_str(self, obj):
+        """IDF snippet of object, same as `EpBunch.__repr__`."""
+        lines = []
+        for val in obj.obj:
+            try:
+                value = int(val)
+                if value != val:
+                    value = val
+            except ValueError:
+                value = val
+            lines.append(value)
+        comments = self.get_field_comments(obj)
+        lines[0] = "%s," % (lines[0],)
+        for i, line in enumerate(lines[1:-1]):
+            # E+ cannot read wide numbers, convert to 1e+3
+            line = scientificnotation(line, width=18)
+            lines[i + 1] = "    %s," % (line,)
+        lines[-1] = "    %s;" % (lines[-1],)
+        lines = lines[:1] + [line.ljust(26) for line in lines[1:]]
+        nlines = [
+            "%s    !- %s" % (line, comm)
+            for line, comm in zip(lines[1:], comments[1:])
+        ]
+        nlines.insert(0, lines[0])
+        return "\n%s\n" % ("\n".join(nlines),)
+
+    def idfstr(self):
+        """IDF file content, same as `IDF.idfstr` of output type
+        "standard"."""
+        return "".join(
+            self.get_object_str(obj)
+            for objname in self.ep_idf.model.dtls
+            for obj in self.ep_idf.idfobjects[objname]
+        )
+
+    def save(self, filename):
+        """Write IDF file, same as `IDF.save` with default arguments."""
+        s = "!- {} Line endings \n".format(platform.system()) + self.idfstr()
+        s = os.linesep.join(s.splitlines())
+        with open(filename, "wb") as f:
+            f.write(s.encode("latin-1"))
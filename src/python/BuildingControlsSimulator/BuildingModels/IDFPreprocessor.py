@@ -1,16 +1,28 @@
 # created by Tom Stesco tom.s@ecobee.com
 
 import os
+import gc
+import copy
+import pickle
 import subprocess
-import shlex
 import shutil
+import tempfile
 import logging
+import json
+import hashlib
 
 import pandas as pd
 import attr
 import numpy as np
 
+import eppy
 from eppy.modeleditor import IDF
+from eppy.idfreader import iddversiontuple
+from eppy.EPlusInterfaceFunctions import parse_idd
+
+from BuildingControlsSimulator.BuildingModels.IDFObjectIndex import (
+    IDFObjectIndex,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +40,9 @@ class IDFPreprocessor:
     init_control_type = attr.ib(type=int, default=1)
     debug = attr.ib(type=bool, default=False)
     timesteps_per_hour = attr.ib(type=int, default=12)
+    # outdoor dry-bulb and relative humidity are FMU inputs set every step
+    # so that the FMU does not depend on the weather of a single thermostat
+    weather_input = attr.ib(type=bool, default=False)
     conditioned_zones = attr.ib(factory=list)
     occupied_zones = attr.ib(factory=list)
     thermostat_zones = attr.ib(factory=list)
@@ -36,6 +51,28 @@ class IDFPreprocessor:
     building_outputs = attr.ib(factory=list)
     # the output spec is created during preprocessing of IDF file
     output_spec = attr.ib(factory=dict)
+    # FMU output variables, see `output_profiles`
+    output_profile = attr.ib(
+        default="full",
+        validator=attr.validators.in_(
+            ["minimal", "thermostat", "per_zone", "full"]
+        ),
+    )
+    # "minimal" removes all reporting objects not needed by the FMU so
+    # that EnergyPlus writes as few output files as possible
+    file_output_profile = attr.ib(
+        default="default",
+        validator=attr.validators.in_(["default", "minimal"]),
+    )
+    # field overrides applied to the preprocessed IDF without overrides,
+    # list of (object type, object name, field name, value), see
+    # `IDFObjectIndex.set_fields`
+    variant_overrides = attr.ib(factory=list)
+    # content hash of source IDF file, computed on init if not given
+    idf_hash = attr.ib(default=None)
+    # eppy model of IDF file, parsed on first use, see `ep_idf`
+    _ep_idf = attr.ib(default=None)
+    _idf_index = attr.ib(default=None)
 
     # first, terminate env vars, these will raise exceptions if undefined
     ep_version = attr.ib(default=os.environ.get("ENERGYPLUS_INSTALL_VERSION"))
@@ -102,6 +139,57 @@ class IDFPreprocessor:
             },
         }
 
+    # increment to invalidate preprocessed IDF cache when preprocessing changes
+    prep_cache_version = 1
+    # zone outputs needed for thermostat temperature and humidity
+    essential_zone_outputs = [
+        "zone_air_temperature",
+        "zone_mean_air_dewpoint_temperature",
+    ]
+    # output profile -> (zones, zone outputs, building outputs), zones are
+    # the thermostat zone or all conditioned zones, zone outputs are either
+    # the essential zone outputs or all of zone_output_spec
+    output_profiles = {
+        "minimal": ("thermostat", "essential", False),
+        "thermostat": ("thermostat", "all", True),
+        "per_zone": ("conditioned", "essential", False),
+        "full": ("conditioned", "all", True),
+    }
+    # reporting objects that are removed with file_output_profile="minimal"
+    file_output_objects = [
+        "Output:SQLite",
+        "Output:JSON",
+        "Output:VariableDictionary",
+        "Output:Surfaces:List",
+        "Output:Surfaces:Drawing",
+        "Output:Schedules",
+        "Output:Constructions",
+        "Output:EnergyManagementSystem",
+        "Output:DebuggingData",
+        "Output:Diagnostics",
+        "Output:PreprocessorMessage",
+        "Output:IlluminanceMap",
+        "OutputControl:IlluminanceMap:Style",
+        "Output:Meter",
+        "Output:Meter:MeterFileOnly",
+        "Output:Meter:Cumulative",
+        "Output:Meter:Cumulative:MeterFileOnly",
+        "Output:Table:SummaryReports",
+        "Output:Table:Monthly",
+        "Output:Table:TimeBins",
+        "Output:Table:Annual",
+        "OutputControl:Table:Style",
+        "OutputControl:ReportingTolerances",
+    ]
+    # attributes restored from preprocessed IDF cache
+    prep_cache_attrs = [
+        "output_spec",
+        "zone_lists",
+        "conditioned_zones",
+        "occupied_zones",
+        "thermostat_zone",
+    ]
+
     def __attrs_post_init__(self):
         """Initialize `IDFPreprocessor` with an IDF file and desired actions"""
         # make output dirs
@@ -121,50 +209,170 @@ class IDFPreprocessor:
         # make sure idf is valid IDF file
         if not self.check_valid_idf(self.idf_file):
             raise ValueError(f"""{self.idf_file} is not a valid IDF file.""")
-
-        # logger.info(
-        #     "IDFPreprocessor loading .idf file: {}".format(self.idf_file)
-        # )
-        self.ep_idf = IDF(self.idf_file)
-        # select .idf output type
-        self.ep_idf.outputtype = "standard"
+        if self.idf_hash is None:
+            with open(self.idf_file, "rb") as f:
+                self.idf_hash = hashlib.sha1(f.read()).hexdigest()
 
         # constants
         self.FMU_control_dual_stp_name = "FMU_T_dual_stp"
         self.FMU_control_cooling_stp_name = "FMU_T_cooling_stp"
         self.FMU_control_heating_stp_name = "FMU_T_heating_stp"
         self.FMU_control_type_name = "FMU_T_control_type"
+        self.FMU_weather_temperature_name = "FMU_T_outdoor"
+        self.FMU_weather_humidity_name = "FMU_RH_outdoor"
+
+    @property
+    def ep_idf(self):
+        """eppy model of IDF file. Parsing is deferred until the model is
+        used so that cached preprocessing never parses the IDF."""
+        if self._ep_idf is None:
+            if IDF.idd_info is None:
+                # eppy would otherwise parse the IDD on first model
+                # construction in every process
+                IDF.setidd(*load_idd(self.idd_path, self.idd_cache_dir))
+            # logger.info(
+            #     "IDFPreprocessor loading .idf file: {}".format(self.idf_file)
+            # )
+            self._ep_idf = IDF(self.idf_file)
+            # select .idf output type
+            self._ep_idf.outputtype = "standard"
+        return self._ep_idf
+
+    @ep_idf.setter
+    def ep_idf(self, ep_idf):
+        self._ep_idf = ep_idf
+        self._idf_index = None
+
+    @property
+    def idf_index(self):
+        """Indexed editing of `ep_idf`."""
+        if self._idf_index is None:
+            self._idf_index = IDFObjectIndex(ep_idf=self.ep_idf)
+        return self._idf_index
 
     @property
     def idf_prep_name(self):
-        return self.idf_name.replace(".idf", "_prep.idf")
+        # preprocessed IDFs of different parameters can coexist
+        return self.idf_name.replace(
+            ".idf", f"_prep_{self.get_prep_key()[:12]}.idf"
+        )
 
     @property
     def idf_prep_dir(self):
         return os.path.join(self.idf_dir, "preprocessed")
 
+    @property
+    def idd_cache_dir(self):
+        # parsed IDDs do not depend on any IDF and are kept apart from the
+        # preprocessed IDFs, see `load_idd`
+        return os.path.join(self.idf_dir, "idd_cache")
+
     @property
     def idf_prep_path(self):
         return os.path.join(self.idf_prep_dir, self.idf_prep_name)
 
+    @property
+    def idf_prep_meta_path(self):
+        return os.path.splitext(self.idf_prep_path)[0] + ".json"
+
+    def get_transition_fpath(self, version):
+        """Cached version transition of source IDF."""
+        return os.path.join(
+            self.idf_dir, "transitions", self.idf_hash, f"V{version}.idf"
+        )
+
+    def get_prep_params(self):
+        """All inputs that define the preprocessed IDF."""
+        prep_params = {
+            "prep_cache_version": IDFPreprocessor.prep_cache_version,
+            "idf_hash": self.idf_hash,
+            "ep_version": self.ep_version,
+            "timesteps_per_hour": self.timesteps_per_hour,
+            "init_temperature": self.init_temperature,
+            "init_humidity": self.init_humidity,
+            "init_control_type": self.init_control_type,
+            "weather_input": self.weather_input,
+            "zone_output_spec": self.zone_output_spec,
+            "building_output_spec": self.building_output_spec,
+        }
+        # IDFs with default options keep their keys from before the options
+        if self.output_profile != "full":
+            prep_params["output_profile"] = self.output_profile
+        if self.file_output_profile != "default":
+            prep_params["file_output_profile"] = self.file_output_profile
+        if self.variant_overrides:
+            prep_params["variant_overrides"] = self.variant_overrides
+            prep_params["variant_stage"] = "preprocessed"
+        return prep_params
+
+    def get_prep_key(self):
+        return hashlib.sha1(
+            json.dumps(
+                self.get_prep_params(), sort_keys=True, default=str
+            ).encode("utf-8")
+        ).hexdigest()
+
+    def get_prep_cache(self, preprocess_check=False):
+        """Restore preprocessing results from the sidecar file of the
+        preprocessed IDF without parsing it.
+
+        :return: True if cache hit
+        """
+        if not (
+            os.path.isfile(self.idf_prep_path)
+            and os.path.isfile(self.idf_prep_meta_path)
+        ):
+            return False
+
+        with open(self.idf_prep_meta_path, "r") as f:
+            prep_meta = json.load(f)
+        if prep_meta.get("prep_key") != self.get_prep_key():
+            return False
+        if preprocess_check and not self.check_valid_idf(
+            self.idf_prep_path, target_version=self.ep_version
+        ):
+            return False
+
+        for k in IDFPreprocessor.prep_cache_attrs:
+            setattr(self, k, prep_meta[k])
+        return True
+
+    def put_prep_cache(self):
+        """Write sidecar file of preprocessed IDF, this marks the
+        preprocessed IDF as complete."""
+        prep_meta = {
+            "prep_key": self.get_prep_key(),
+            "prep_params": self.get_prep_params(),
+        }
+        for k in IDFPreprocessor.prep_cache_attrs:
+            prep_meta[k] = getattr(self, k)
+
+        with open(self.idf_prep_meta_path + ".tmp", "w") as f:
+            json.dump(prep_meta, f, default=str)
+        os.replace(self.idf_prep_meta_path + ".tmp", self.idf_prep_meta_path)
+
     def preprocess(
         self, init_temperature=21.0, preprocess_check=False,
     ):
-        """add control signals to IDF before making FMU"""
+        """add control signals to IDF before making FMU
+
+        Preprocessed IDFs are named by a hash of the source IDF and all
+        preprocessing parameters and are reused if they exist.
+
+        :param preprocess_check: also check version of existing preprocessed
+        IDF before reuse
+        """
 
         # check if preprocess idf already exists
-        if preprocess_check and self.check_valid_idf(
-            self.idf_prep_path, target_version=self.ep_version
-        ):
-            self.ep_idf = IDF(self.idf_prep_path)
-            self.get_zone_info()
-            # this sets fmu output keys
-            # TODO: generalize so doesnt wrap editing .idf
-            self.prep_ext_int_output()
+        if self.get_prep_cache(preprocess_check=preprocess_check):
             logger.info(
                 f"Found correct preprocessed IDF: {self.idf_prep_path}"
             )
             logger.info(f"IDF version: {self.ep_version}")
+        elif self.variant_overrides:
+            logger.info(f"Making new variant IDF: {self.idf_prep_path}")
+            self.prep_variant(preprocess_check=preprocess_check)
+            self.put_prep_cache()
         else:
             logger.info(f"Making new preprocessed IDF: {self.idf_prep_path}")
             self.prep_ep_version(self.ep_version)
@@ -181,19 +389,62 @@ class IDFPreprocessor:
                 FMU_control_heating_stp_init=self.init_temperature,
                 FMU_control_cooling_stp_init=self.init_temperature,
             )
+            if self.weather_input:
+                self.prep_weather_input()
             # create per zone outputs depending on HVAC system type
             self.prep_ext_int_output()
+            if self.file_output_profile == "minimal":
+                self.prep_minimal_file_output()
 
-            # finally before saving expand objects
-            self.prep_expand_objects()
-            self.ep_idf.saveas(self.idf_prep_path)
+            self.idf_index.save(self.idf_prep_path)
 
             # fix version line
             fix_idf_version_line(self.idf_prep_path, self.ep_version)
+            self.put_prep_cache()
 
         return self.idf_prep_path
 
+    def get_base_idf(self):
+        """`IDFPreprocessor` of the same IDF and parameters without
+        `variant_overrides`. Mutable attributes are copied so that
+        preprocessing of the base IDF does not change this IDF."""
+        _copies = {
+            # attrs strips leading underscores of init arguments
+            a.name.lstrip("_"): copy.deepcopy(getattr(self, a.name))
+            for a in attr.fields(IDFPreprocessor)
+            if a.init and isinstance(getattr(self, a.name), (list, dict))
+        }
+        return attr.evolve(
+            self,
+            **{
+                **_copies,
+                "variant_overrides": [],
+                "ep_idf": None,
+                "idf_index": None,
+            },
+        )
+
+    def prep_variant(self, preprocess_check=False):
+        """Apply `variant_overrides` to the preprocessed base IDF the same way
+        as `IDFVariantGenerator` so that both write the same variant IDF."""
+        base_idf = self.get_base_idf()
+        base_prep_path = base_idf.preprocess(preprocess_check=preprocess_check)
+        if IDF.idd_info is None:
+            IDF.setidd(*load_idd(self.idd_path, self.idd_cache_dir))
+        ep_idf = IDF(base_prep_path)
+        ep_idf.outputtype = "standard"
+        write_variant_idf(
+            IDFObjectIndex(ep_idf=ep_idf),
+            self.idf_prep_path,
+            self.variant_overrides,
+            self.ep_version,
+        )
+        # variants have the zones and outputs of the base IDF
+        for k in IDFPreprocessor.prep_cache_attrs:
+            setattr(self, k, copy.deepcopy(getattr(base_idf, k)))
+
     def get_zone_info(self):
+        self.idf_index.build_zone_index()
         self.zone_lists = self.get_zone_lists()
         # TODO: check that zone geometry exists
 
@@ -202,15 +453,7 @@ class IDFPreprocessor:
         self.get_tstat_zone()
 
     def get_zone_lists(self):
-        zone_lists = {}
-        for obj in self.ep_idf.idfobjects["ZoneList"]:
-            zone_lists[obj.Name] = [
-                obj[f"Zone_{i}_Name"]
-                for i in range(1, 500)
-                if obj[f"Zone_{i}_Name"] != ""
-            ]
-
-        return zone_lists
+        return self.idf_index.zone_lists
 
     def zone_list_lookup(self, zone_name):
         for k, v in self.zone_lists.items():
@@ -224,7 +467,7 @@ class IDFPreprocessor:
             return zone_list
 
     def get_tstat_zone(self):
-        tstats = self.ep_idf.idfobjects["zonecontrol:thermostat"]
+        tstats = self.idf_index.thermostats
         if len(tstats) > 1:
             raise ValueError(
                 f"Multiple thermostats in IDF file: {self.idf_file}"
@@ -241,34 +484,14 @@ class IDFPreprocessor:
         2. ZoneVentilation:DesignFlowRate
         3. sizing:Zone
         """
-        equip_conn_zones = [
-            self.expand_zones(obj.Zone_Name)
-            for obj in self.ep_idf.idfobjects["ZoneHVAC:EquipmentConnections"]
-        ]
-
-        vent_design_zones = [
-            self.expand_zones(obj.Zone_or_ZoneList_Name)
-            for obj in self.ep_idf.idfobjects["ZoneVentilation:DesignFlowRate"]
-        ]
-
-        sizing_zones = [
-            self.expand_zones(obj.Zone_or_ZoneList_Name)
-            for obj in self.ep_idf.idfobjects["sizing:Zone"]
-        ]
-
-        self.conditioned_zones = list(
-            set(equip_conn_zones) | set(vent_design_zones) | set(sizing_zones)
-        )
+        self.conditioned_zones = self.idf_index.conditioned_zones
 
     def get_occupied_zones(self):
         """ get list of all zones that are condtioned
         conditioned zones are defined in IDF by:
         1. people
         """
-        self.occupied_zones = [
-            self.expand_zones(obj.Zone_or_ZoneList_Name)
-            for obj in self.ep_idf.idfobjects["people"]
-        ]
+        self.occupied_zones = self.idf_index.occupied_zones
 
         if any([z not in self.conditioned_zones for z in self.occupied_zones]):
             info.error(
@@ -337,7 +560,7 @@ class IDFPreprocessor:
             "9-2-0": "Transition-V9-2-0-to-V9-3-0",
         }
 
-        cur_version = self.get_idf_version(self.ep_idf)
+        cur_version = scan_idf_version(self.idf_file)
 
         # check if current version above target
         if int(cur_version.replace("-", "")) > int(
@@ -351,82 +574,48 @@ class IDFPreprocessor:
                 f"Correct .idf version {cur_version}. Using {self.idf_file}"
             )
         else:
-            # first check for previous upgrade
-            transition_fpath = self.idf_file.replace(
-                ".idf", f"_{target_version}.idf"
+            # every version of the transition chain is cached by content
+            # hash of source IDF, upgrades continue from the latest version
+            # already computed
+            versions = [cur_version]
+            while versions[-1] != target_version:
+                versions.append(conversion_dict[versions[-1]][-5:])
+            hop_fpath = self.idf_file
+            start = 0
+            for i in reversed(range(1, len(versions))):
+                if os.path.isfile(self.get_transition_fpath(versions[i])):
+                    hop_fpath = self.get_transition_fpath(versions[i])
+                    start = i
+                    break
+
+            transition_dir = os.path.join(
+                os.environ["EPLUS_DIR"], "PreProcess/IDFVersionUpdater",
             )
-            if not os.path.isfile(transition_fpath):
-                # upgrade .idf file repeatedly
-                first_transition = True
-                for i in range(len(conversion_dict)):
-                    if cur_version != target_version:
-                        transition_dir = os.path.join(
-                            os.environ["EPLUS_DIR"],
-                            "PreProcess/IDFVersionUpdater",
-                        )
-                        transistion_path = os.path.join(
-                            transition_dir, conversion_dict[cur_version]
-                        )
-                        logger.info(
-                            f"Upgrading idf file. cur_version={cur_version}, target_version={target_version}, transistion_path={transistion_path}"
-                        )
-
-                        # must use os.chdir() because a subprocess cannot change another subprocess's wd
-                        # see https://stackoverflow.com/questions/21406887/subprocess-changing-directory/21406995
-                        original_wd = os.getcwd()
-                        os.chdir(transition_dir)
-                        cmd = f"{transistion_path} {self.idf_file}"
-
-                        # make transition call
-                        subprocess.call(
-                            shlex.split(cmd), stdout=subprocess.PIPE
-                        )
-                        os.chdir(original_wd)
-
-                        cur_version = conversion_dict[cur_version][-5:]
-                        if self.debug:
-                            shutil.move(
-                                self.idf_file + "new",
-                                self.idf_file.replace(
-                                    ".idf", f"_{cur_version}.idf"
-                                ),
-                            )
-
-                        if first_transition:
-                            shutil.move(
-                                self.idf_file + "old",
-                                self.idf_file + "original",
-                            )
-                            first_transition = False
-
-                shutil.move(self.idf_file + "original", self.idf_file)
-
-                if not self.debug:
-                    shutil.move(
-                        self.idf_file + "new",
-                        self.idf_file.replace(".idf", f"_{cur_version}.idf"),
+            for cur_version in versions[start:-1]:
+                transition_path = os.path.join(
+                    transition_dir, conversion_dict[cur_version]
+                )
+                logger.info(
+                    f"Upgrading idf file. cur_version={cur_version}, target_version={target_version}, transition_path={transition_path}"
+                )
+                next_version = conversion_dict[cur_version][-5:]
+                next_fpath = self.get_transition_fpath(next_version)
+                os.makedirs(os.path.dirname(next_fpath), exist_ok=True)
+                run_idf_transition(transition_path, hop_fpath, next_fpath)
+                if self.debug:
+                    shutil.copyfile(
+                        next_fpath,
+                        self.idf_file.replace(".idf", f"_{next_version}.idf"),
                     )
-                if os.path.isfile(self.idf_file + "old"):
-                    os.remove(self.idf_file + "old")
+                hop_fpath = next_fpath
+
+            transition_fpath = self.get_transition_fpath(target_version)
             self.idf_file = transition_fpath
-            # after running transition need to reload .idf file
-            self.ep_idf = IDF(self.idf_file)
+            # after running transition need to reload .idf file, the model
+            # is parsed on next use
+            self.ep_idf = None
             logger.info(f"Upgrading complete. Using: {self.idf_file}")
 
-    def prep_expand_objects(self):
-        # must use os.chdir() because a subprocess cannot change another subprocess's wd
-        # see https://stackoverflow.com/questions/21406887/subprocess-changing-directory/21406995
-        logger.info(f"Expanding objects. Using: {self.idf_file}")
-        original_wd = os.getcwd()
-        exp_dir = os.path.join(os.environ["EPLUS_DIR"])
-        os.chdir(exp_dir)
-        exp_path = os.path.join(exp_dir, "ExpandObjects")
-        cmd = f"{exp_path} {self.idf_file}"
-
-        # make transition call
-        subprocess.call(shlex.split(cmd), stdout=subprocess.PIPE)
-        os.chdir(original_wd)
-
     def prep_onoff_setpt_control(
         self,
         FMU_control_type_init,
@@ -483,11 +672,7 @@ class IDFPreprocessor:
             Initial_Value=FMU_control_cooling_stp_init,
         )
         # create a control type schedule limits. See `ControlModels.EPLUS_THERMOSTAT_MODES`
-        if not [
-            s_obj
-            for s_obj in self.ep_idf.idfobjects["ScheduleTypeLimits"]
-            if "Control Type" in s_obj.Name
-        ]:
+        if not self.idf_index.get_object("ScheduleTypeLimits", "Control Type"):
             self.ep_idf.newidfobject(
                 "ScheduleTypeLimits",
                 Name="Control Type",
@@ -533,6 +718,36 @@ class IDFPreprocessor:
 
         # TODO: make equipment always available
 
+    def prep_weather_input(self):
+        """
+        add external interface actuators of outdoor dry-bulb temperature
+        and relative humidity, these override the weather file every step
+        """
+        self.popallidfobjects(
+            "ExternalInterface:FunctionalMockupUnitExport:To:Actuator"
+        )
+        for name, control_type, init_value in [
+            (
+                self.FMU_weather_temperature_name,
+                "Outdoor Dry Bulb",
+                self.init_temperature,
+            ),
+            (
+                self.FMU_weather_humidity_name,
+                "Outdoor Relative Humidity",
+                self.init_humidity,
+            ),
+        ]:
+            self.ep_idf.newidfobject(
+                "ExternalInterface:FunctionalMockupUnitExport:To:Actuator",
+                Name=name + "_actuator",
+                Actuated_Component_Unique_Name="Environment",
+                Actuated_Component_Type="Weather Data",
+                Actuated_Component_Control_Type=control_type,
+                FMU_Variable_Name=name,
+                Initial_Value=init_value,
+            )
+
     def prep_ext_int(self):
         """
         create external interface.
@@ -587,8 +802,14 @@ class IDFPreprocessor:
             "EXTERNALINTERFACE:FUNCTIONALMOCKUPUNITEXPORT:FROM:VARIABLE"
         )
 
+        profile = IDFPreprocessor.output_profiles[self.output_profile]
+        zones, zone_outputs, add_building_outputs = profile
+
         # add building_outputs as flattened dict of variable meta data
-        for ek, ev in self.building_output_spec.items():
+        building_output_spec = self.building_output_spec
+        if not add_building_outputs:
+            building_output_spec = {}
+        for ek, ev in building_output_spec.items():
             for ok, ov in ev.items():
                 if ok != "eplus_name":
                     # set name of variable in FMU and internally
@@ -616,8 +837,29 @@ class IDFPreprocessor:
         # add zone_outputs
         # output IDF obj is broken out because the * key value can be used to select
         # all zones and is standard in E+ .idf files
-        for z in self.conditioned_zones:
-            for ok, ov in self.zone_output_spec.items():
+        output_zones = self.conditioned_zones
+        if zones == "thermostat":
+            output_zones = [
+                z
+                for z in self.conditioned_zones
+                if fmu_variable_name_conversion(z) == self.thermostat_zone
+            ]
+            if not output_zones:
+                raise ValueError(
+                    f"Thermostat zone {self.thermostat_zone} is not "
+                    + f"conditioned in IDF file: {self.idf_file}"
+                )
+
+        zone_output_spec = self.zone_output_spec
+        if zone_outputs == "essential":
+            zone_output_spec = {
+                ok: ov
+                for ok, ov in self.zone_output_spec.items()
+                if ok in IDFPreprocessor.essential_zone_outputs
+            }
+
+        for z in output_zones:
+            for ok, ov in zone_output_spec.items():
 
                 zk = fmu_variable_name_conversion(z)
                 var_k = zk + "_" + ok
@@ -639,6 +881,14 @@ class IDFPreprocessor:
                     FMU_Variable_Name=var_k,
                 )
 
+    def prep_minimal_file_output(self):
+        """
+        remove all reporting objects that only write output files, the
+        output variables of the FMU are kept.
+        """
+        for idf_obj_name in IDFPreprocessor.file_output_objects:
+            self.popallidfobjects(idf_obj_name)
+
     """
     TODO: Changes to eppy:
      - parse .idf comments differently or remove them to reduce file sizes
@@ -653,39 +903,28 @@ class IDFPreprocessor:
         pops all idf objects of any key name if object exists.
         extension of IDF.popidfobjects
         """
-        if idf_obj_name in self.ep_idf.idfobjects:
-            for i in range(len(self.ep_idf.idfobjects[idf_obj_name])):
-                self.ep_idf.popidfobject(idf_obj_name, 0)
+        self.idf_index.remove_all(idf_obj_name)
 
     def popifdobject_by_name(self, idf_objs, name):
         """
+        pops all idf objects of key name idf_objs containing name.
         """
-        for i, s_obj in enumerate(
-            self.ep_idf.idfobjects["ScheduleTypeLimits"]
-        ):
-            if "temperature" in s_obj.Name.lower():
-                self.ep_idf.popidfobject("ScheduleTypeLimits", i)
+        self.idf_index.remove_where(
+            idf_objs, lambda obj: name.lower() in obj.Name.lower()
+        )
 
     def get_idf_version(self, ep_model):
         """Get model in standard format: x-x-x"""
-        version = ep_model.idfobjects["version"].list2[0][1].replace(".", "-")
-        if len(version) <= 3:
-            # if only first two simver digits in .idf add a zero
-            version += "-0"
-        return version
+        return format_idf_version(ep_model.idfobjects["version"].list2[0][1])
 
     def check_valid_idf(self, idf_path, target_version=None):
-        """
+        """IDF is valid if it has a version, the file is only scanned up to
+        the Version object and not parsed into a model.
         """
         is_valid = False
         if os.path.isfile(idf_path):
             # any text file can be read by eppy and produce a garbage model
-            if IDF.getiddname() == None:
-                IDF.setiddname(self.idd_path)
-
-            ep_model = IDF(idf_path)
-            # check version to see if valid .idf, eppy returns empty list if obj not found
-            version = self.get_idf_version(ep_model)
+            version = scan_idf_version(idf_path)
             if target_version and (version == target_version):
                 is_valid = True
             elif not target_version and version:
@@ -699,6 +938,116 @@ def fmu_variable_name_conversion(eplus_name):
     return eplus_name.replace(" ", "_").replace("-", "_")
 
 
+def load_idd(idd_path, cache_dir):
+    """Load parsed IDD in the format of `IDF.setidd`. The parsed IDD is
+    pickled in cache_dir keyed by path, version and mtime of the IDD file.
+
+    :return: idd_info, idd_index, block, idd_version
+    """
+    _stat = os.stat(idd_path)
+    with open(idd_path, "rb") as f:
+        idd_version = iddversiontuple(f)
+    _key = hashlib.sha1(
+        str(
+            (
+                os.path.abspath(idd_path),
+                idd_version,
+                _stat.st_mtime,
+                _stat.st_size,
+                eppy.__version__,
+            )
+        ).encode("utf-8")
+    ).hexdigest()
+    cache_path = os.path.join(
+        cache_dir, f"idd_V{'-'.join(map(str, idd_version))}_{_key}.pkl"
+    )
+    if os.path.isfile(cache_path):
+        with open(cache_path, "rb") as f:
+            # gc is not needed while unpickling many small containers
+            gc.disable()
+            try:
+                return pickle.load(f)
+            finally:
+                gc.enable()
+
+    logger.info(f"Parsing IDD file: {idd_path}")
+    block, _, idd_info, idd_index = parse_idd.extractidddata(idd_path)
+    parsed_idd = (idd_info, idd_index, block, idd_version)
+    os.makedirs(cache_dir, exist_ok=True)
+    # write to temporary file first so readers never see partial files
+    with open(cache_path + f".{os.getpid()}.tmp", "wb") as f:
+        pickle.dump(parsed_idd, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(cache_path + f".{os.getpid()}.tmp", cache_path)
+    return parsed_idd
+
+
+def run_idf_transition(transition_path, in_fpath, out_fpath):
+    """Run EnergyPlus IDF version transition program in a scratch dir.
+
+    Transition programs read the IDDs of both versions and the report
+    variable renames from their working directory and write `<in>new` and
+    `<in>old` next to the input, so the input is copied into a scratch dir
+    that links these files of the transition program dir.
+    """
+    transition_dir = os.path.dirname(transition_path)
+    with tempfile.TemporaryDirectory(
+        dir=os.path.dirname(out_fpath)
+    ) as scratch_dir:
+        for fname in os.listdir(transition_dir):
+            if fname.endswith(".idd") or fname.endswith(".csv"):
+                os.symlink(
+                    os.path.join(transition_dir, fname),
+                    os.path.join(scratch_dir, fname),
+                )
+        shutil.copyfile(in_fpath, os.path.join(scratch_dir, "in.idf"))
+
+        proc = subprocess.run(
+            [transition_path, "in.idf"],
+            cwd=scratch_dir,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        new_fpath = os.path.join(scratch_dir, "in.idfnew")
+        if not os.path.isfile(new_fpath):
+            raise RuntimeError(
+                f"IDF transition failed: {transition_path} {in_fpath}\n"
+                + proc.stdout.decode("utf-8", "replace")
+                + proc.stderr.decode("utf-8", "replace")
+            )
+        os.replace(new_fpath, out_fpath)
+
+
+def format_idf_version(version):
+    """Format IDF version identifier in standard format: x-x-x"""
+    version = version.strip().replace(".", "-")
+    if len(version) <= 3:
+        # if only first two simver digits in .idf add a zero
+        version += "-0"
+    return version
+
+
+def scan_idf_version(idf_path):
+    """Read version of IDF file without parsing it. The file is streamed
+    only until the Version object is found.
+
+    :return: version in standard format: x-x-x, None if not found
+    """
+    obj_parts = []
+    with open(idf_path, "r", errors="replace") as f:
+        for line in f:
+            # remove comments
+            line = line.split("!", 1)[0]
+            # objects end with ";" and may span many lines
+            while ";" in line:
+                obj_end, line = line.split(";", 1)
+                fields = ("".join(obj_parts) + obj_end).split(",")
+                obj_parts = []
+                if fields[0].strip().lower() == "version" and len(fields) > 1:
+                    return format_idf_version(fields[1])
+            obj_parts.append(line)
+    return None
+
+
 def fix_idf_version_line(idf_path, ep_version):
     """
     Fix format of Version Identifier line in IDF file for EnergyPlusToFMU
@@ -720,3 +1069,18 @@ def fix_idf_version_line(idf_path, ep_version):
 
     shutil.move(idf_path + ".patch", idf_path)
 
+
+def write_variant_idf(
+    idf_index, variant_prep_path, variant_overrides, ep_version
+):
+    """Write preprocessed IDF of `idf_index` with `variant_overrides`
+    applied. The overrides are undone after writing so that `idf_index`
+    can be reused for other variants."""
+    undo = idf_index.set_fields(variant_overrides)
+    try:
+        idf_index.save(variant_prep_path + ".tmp")
+    finally:
+        IDFObjectIndex.restore_fields(undo)
+    fix_idf_version_line(variant_prep_path + ".tmp", ep_version)
+    os.replace(variant_prep_path + ".tmp", variant_prep_path)
+    return variant_prep_path
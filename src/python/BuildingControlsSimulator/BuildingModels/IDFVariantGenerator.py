@@ -0,0 +1,127 @@
+import logging
+import copy
+from concurrent.futures import ProcessPoolExecutor
+
+import attr
+from eppy.modeleditor import IDF
+
+from BuildingControlsSimulator.BuildingModels.IDFPreprocessor import (
+    IDFPreprocessor,
+    load_idd,
+    write_variant_idf,
+)
+from BuildingControlsSimulator.BuildingModels.IDFObjectIndex import (
+    IDFObjectIndex,
+)
+
+logger = logging.getLogger(__name__)
+
+# preprocessed base IDF of worker process, see `init_variant_worker`
+_base_idf_index = None
+
+
+@attr.s(kw_only=True)
+class IDFVariantGenerator:
+    """Generates preprocessed IDF variants of one base IDF for parametric
+    sweeps, e.g. of insulation, infiltration or HVAC capacity.
+
+    The base IDF is preprocessed once, and each worker process parses the
+    preprocessed base IDF once. Variants are made by applying field
+    overrides to the parsed base and undoing them after the variant is
+    written. Each variant is an `IDFPreprocessor` with its own prep key, so
+    its preprocessed IDF and FMU are cached separately.
+    """
+
+    idf_file = attr.ib()
+    # variant name -> list of (object type, object name, field name, value)
+    variants = attr.ib(factory=dict)
+    # keyword arguments of each `IDFPreprocessor`
+    preprocessor_kwargs = attr.ib(factory=dict)
+    n_workers = attr.ib(default=None)
+    base_idf = attr.ib(default=None)
+
+    def __attrs_post_init__(self):
+        if self.base_idf is None:
+            self.base_idf = IDFPreprocessor(
+                idf_file=self.idf_file, **self.preprocessor_kwargs
+            )
+
+    def get_variant_idf(self, variant_name):
+        """Create `IDFPreprocessor` of variant, the source IDF is not
+        hashed again."""
+        return IDFPreprocessor(
+            idf_file=self.idf_file,
+            idf_hash=self.base_idf.idf_hash,
+            variant_overrides=self.variants[variant_name],
+            **self.preprocessor_kwargs,
+        )
+
+    def run(self, preprocess_check=False):
+        """Preprocess base IDF and write all variants that are not cached.
+
+        :return: dict of variant name and preprocessed `IDFPreprocessor`
+        """
+        base_prep_path = self.base_idf.preprocess(
+            preprocess_check=preprocess_check
+        )
+        variant_idfs = {
+            variant_name: self.get_variant_idf(variant_name)
+            for variant_name in self.variants.keys()
+        }
+        new_variants = [
+            variant_name
+            for variant_name, variant_idf in variant_idfs.items()
+            if not variant_idf.get_prep_cache(
+                preprocess_check=preprocess_check
+            )
+        ]
+        logger.info(
+            f"Generating {len(new_variants)} of {len(variant_idfs)} "
+            + f"variants of: {base_prep_path}"
+        )
+        if new_variants:
+            with ProcessPoolExecutor(
+                max_workers=self.n_workers,
+                initializer=init_variant_worker,
+                initargs=(
+                    base_prep_path,
+                    self.base_idf.idd_path,
+                    self.base_idf.idd_cache_dir,
+                ),
+            ) as executor:
+                list(
+                    executor.map(
+                        write_variant,
+                        [variant_idfs[v].idf_prep_path for v in new_variants],
+                        [self.variants[v] for v in new_variants],
+                        [self.base_idf.ep_version] * len(new_variants),
+                    )
+                )
+
+            # variants have the zones and outputs of the base IDF
+            for variant_name in new_variants:
+                variant_idf = variant_idfs[variant_name]
+                for k in IDFPreprocessor.prep_cache_attrs:
+                    _v = copy.deepcopy(getattr(self.base_idf, k))
+                    setattr(variant_idf, k, _v)
+                variant_idf.put_prep_cache()
+
+        return variant_idfs
+
+
+def init_variant_worker(base_prep_path, idd_path, idd_cache_dir):
+    """Parse preprocessed base IDF once per worker process."""
+    global _base_idf_index
+    IDF.setiddname(idd_path)
+    if IDF.idd_info is None:
+        IDF.setidd(*load_idd(idd_path, idd_cache_dir))
+    ep_idf = IDF(base_prep_path)
+    ep_idf.outputtype = "standard"
+    _base_idf_index = IDFObjectIndex(ep_idf=ep_idf)
+
+
+def write_variant(variant_prep_path, variant_overrides, ep_version):
+    """Write preprocessed variant IDF of base IDF of worker process."""
+    return write_variant_idf(
+        _base_idf_index, variant_prep_path, variant_overrides, ep_version
+    )
@@ -0,0 +1,103 @@
+import os
+import logging
+import subprocess
+import shlex
+import shutil
+import json
+import hashlib
+import zipfile
+
+import attr
+
+from BuildingControlsSimulator.BuildingModels.FMUBackend import FMUBackend
+
+logger = logging.getLogger(__name__)
+
+
+@attr.s(kw_only=True)
+class PyFMIBackend(FMUBackend):
+    """EnergyPlus FMUs created with EnergyPlusToFMU and loaded with pyfmi.
+
+    EnergyPlusToFMU FMUs cannot get or serialize their state.
+    """
+
+    def create_model_fmu(self, building_model, preprocess_check=False):
+        """make the fmu
+
+        Calls FMU model generation script from https://github.com/lbl-srg/EnergyPlusToFMU.
+        This script litters temporary files of fixed names which get clobbered
+        if running in parallel. Need to fix scripts to be able to run in parallel.
+        """
+        idf = building_model.idf
+        idf.preprocess(preprocess_check=preprocess_check)
+
+        # reuse existing FMU made from the same preprocessed IDF and weather
+        fmu_key = PyFMIBackend.get_fmu_key(building_model)
+        fmu_key_path = PyFMIBackend.get_fmu_key_path(building_model)
+        if os.path.isfile(building_model.fmu_path) and os.path.isfile(
+            fmu_key_path
+        ):
+            with open(fmu_key_path, "r") as f:
+                if json.load(f) == fmu_key:
+                    logger.info(
+                        f"Reusing existing FMU: {building_model.fmu_path}"
+                    )
+                    return building_model.fmu_path
+
+        cmd = f"python2.7 {building_model.eplustofmu_path}"
+        cmd += f" -i {idf.idd_path}"
+        cmd += f" -w {building_model.epw_path}"
+        cmd += f" -a {building_model.fmi_version}"
+        cmd += f" -d {idf.idf_prep_path}"
+
+        proc = subprocess.run(shlex.split(cmd), stdout=subprocess.PIPE)
+        if not proc.stdout:
+            raise ValueError(
+                f"Empty STDOUT. Invalid EnergyPlusToFMU cmd={cmd}"
+            )
+
+        # EnergyPlusToFMU puts fmu in cwd always, move out of cwd
+        shutil.move(
+            os.path.join(os.getcwd(), building_model.init_fmu_name),
+            building_model.fmu_path,
+        )
+        with open(fmu_key_path, "w") as f:
+            json.dump(fmu_key, f)
+
+        return building_model.fmu_path
+
+    @staticmethod
+    def get_fmu_key(building_model):
+        """Identity of FMU by content of its source files."""
+
+        def _file_hash(fpath):
+            with open(fpath, "rb") as f:
+                return hashlib.sha1(f.read()).hexdigest()
+
+        return {
+            "idf_prep_hash": _file_hash(building_model.idf.idf_prep_path),
+            "epw_hash": _file_hash(building_model.epw_path),
+            "fmi_version": building_model.fmi_version,
+        }
+
+    @staticmethod
+    def get_fmu_key_path(building_model):
+        return os.path.splitext(building_model.fmu_path)[0] + ".json"
+
+    def load_fmu(self, building_model):
+        # pyfmi is only required when simulating with this backend
+        import pyfmi
+
+        if not building_model.fmu_scratch_dir:
+            return pyfmi.load_fmu(fmu=building_model.fmu_path)
+
+        # the FMU instance and the EnergyPlus output files it writes are
+        # kept in the run dir of the instance
+        run_dir = building_model.make_fmu_run_dir()
+        with zipfile.ZipFile(building_model.fmu_path) as zf:
+            zf.extractall(run_dir)
+        return pyfmi.load_fmu(
+            fmu=run_dir,
+            allow_unzipped_fmu=True,
+            log_file_name=os.path.join(run_dir, "fmu_log.txt"),
+        )
@@ -0,0 +1,201 @@
+import os
+import logging
+
+import pytest
+import numpy as np
+
+from BuildingControlsSimulator.BuildingModels.IDFPreprocessor import (
+    IDFPreprocessor,
+)
+from BuildingControlsSimulator.BuildingModels.EnergyPlusBuildingModel import (
+    EnergyPlusBuildingModel,
+)
+from BuildingControlsSimulator.BuildingModels.FakeFMUBackend import (
+    FakeFMUBackend,
+)
+from BuildingControlsSimulator.DataClients.DataStates import STATES
+
+
+logger = logging.getLogger(__name__)
+
+
+class TestFakeFMUBackend:
+    @classmethod
+    def setup_class(cls):
+        EnergyPlusBuildingModel.make_directories()
+        cls.idf_name = "AZ_Phoenix_gasfurnace_crawlspace_IECC_2018_cycles.idf"
+        cls.epw_path = os.path.join(
+            os.environ.get("WEATHER_DIR"), "fake_weather.epw"
+        )
+        cls.step_size = 300
+        cls.n_steps = 24
+
+    @classmethod
+    def teardown_class(cls):
+        """ teardown any state that was previously setup with a call to
+        setup_class.
+        """
+        pass
+
+    def get_building_model(self, weather_input=False, output_profile="full"):
+        building_model = EnergyPlusBuildingModel(
+            idf=IDFPreprocessor(
+                idf_file=self.idf_name,
+                weather_input=weather_input,
+                output_profile=output_profile,
+            ),
+            epw_path=self.epw_path,
+            fmu_backend=FakeFMUBackend(),
+        )
+        building_model.create_model_fmu()
+        building_model.initialize(
+            t_start=0,
+            t_end=self.step_size * (self.n_steps - 1),
+            t_step=self.step_size,
+        )
+        return building_model
+
+    def simulate(
+        self, building_model, control_input, n_steps, weather_input={}
+    ):
+        step_sensor_input = {STATES.THERMOSTAT_MOTION: False}
+        for _ in range(n_steps):
+            building_model.do_step(
+                t_start=building_model.current_t_idx * self.step_size,
+                t_step=self.step_size,
+                step_control_input=control_input,
+                step_sensor_input=step_sensor_input,
+                step_weather_input=weather_input,
+            )
+
+    def get_control_input(self, heat=0, cool=0):
+        control_input = {
+            state: 0
+            for state in [
+                STATES.AUXHEAT1,
+                STATES.AUXHEAT2,
+                STATES.AUXHEAT3,
+                STATES.COMPCOOL1,
+                STATES.COMPCOOL2,
+                STATES.COMPHEAT1,
+                STATES.COMPHEAT2,
+            ]
+        }
+        control_input[STATES.AUXHEAT1] = heat
+        control_input[STATES.COMPCOOL1] = cool
+        return control_input
+
+    def test_model_variables(self):
+        building_model = self.get_building_model()
+        assert not os.path.isfile(building_model.fmu_path)
+        model_variables = building_model.fmu.get_model_variables()
+        for k in building_model.idf.output_spec.keys():
+            assert k in model_variables
+        assert building_model.idf.FMU_control_type_name in model_variables
+
+    def test_heating_and_cooling(self):
+        heating_model = self.get_building_model()
+        cooling_model = self.get_building_model()
+        self.simulate(
+            heating_model, self.get_control_input(heat=300), self.n_steps
+        )
+        self.simulate(
+            cooling_model, self.get_control_input(cool=300), self.n_steps
+        )
+        heating_temperature = heating_model.output[
+            STATES.THERMOSTAT_TEMPERATURE
+        ]
+        cooling_temperature = cooling_model.output[
+            STATES.THERMOSTAT_TEMPERATURE
+        ]
+        assert np.all(np.diff(heating_temperature) > 0)
+        assert np.all(np.diff(cooling_temperature) < 0)
+
+    def test_checkpoint_deterministic(self):
+        control_input = self.get_control_input(heat=300)
+        building_model = self.get_building_model()
+        assert building_model.supports_fmu_state
+
+        self.simulate(building_model, control_input, self.n_steps // 2)
+        checkpoint = building_model.get_checkpoint()
+        self.simulate(building_model, control_input, self.n_steps // 2)
+
+        resumed_model = self.get_building_model()
+        resumed_model.set_checkpoint(checkpoint)
+        self.simulate(resumed_model, control_input, self.n_steps // 2)
+
+        np.testing.assert_array_equal(
+            building_model.output[STATES.THERMOSTAT_TEMPERATURE],
+            resumed_model.output[STATES.THERMOSTAT_TEMPERATURE],
+        )
+
+    def test_weather_input(self):
+        building_model = self.get_building_model(weather_input=True)
+        idf = building_model.idf
+        model_variables = building_model.fmu.get_model_variables()
+        assert idf.FMU_weather_temperature_name in model_variables
+        assert idf.FMU_weather_humidity_name in model_variables
+
+        weather_input = {
+            STATES.OUTDOOR_TEMPERATURE: 40.0,
+            STATES.OUTDOOR_RELATIVE_HUMIDITY: 20.0,
+        }
+        self.simulate(
+            building_model, self.get_control_input(), 2, weather_input
+        )
+        # missing weather keeps last valid value
+        weather_input[STATES.OUTDOOR_TEMPERATURE] = np.nan
+        self.simulate(
+            building_model, self.get_control_input(), 2, weather_input
+        )
+
+        outdoor_temperature = building_model.fmu_output[
+            "FMU_Environment_Site_Outdoor_Air_Drybulb_Temperature"
+        ][:4]
+        outdoor_humidity = building_model.fmu_output[
+            "FMU_Environment_Site_Outdoor_Air_Relative_Humidity"
+        ][:4]
+        np.testing.assert_array_equal(outdoor_temperature, 40.0)
+        np.testing.assert_array_equal(outdoor_humidity, 20.0)
+        assert np.all(
+            np.diff(
+                building_model.output[STATES.THERMOSTAT_TEMPERATURE][:4]
+            )
+            > 0
+        )
+
+    def test_output_profiles(self):
+        full_model = self.get_building_model()
+        full_keys = set(full_model.idf.output_spec.keys())
+        control_input = self.get_control_input(heat=300)
+        self.simulate(full_model, control_input, self.n_steps)
+        thermostat_zone = full_model.idf.thermostat_zone
+        for output_profile, n_outputs in [
+            ("minimal", 2),
+            ("thermostat", 10),
+            ("per_zone", 2 * len(full_model.idf.conditioned_zones)),
+        ]:
+            building_model = self.get_building_model(
+                output_profile=output_profile
+            )
+            output_keys = set(building_model.idf.output_spec.keys())
+            assert len(output_keys) == n_outputs
+            assert output_keys <= full_keys
+            assert set(building_model.fmu_output_keys) == output_keys
+            if output_profile != "per_zone":
+                # zone outputs are only of thermostat zone
+                assert all(
+                    k.startswith(thermostat_zone)
+                    for k in output_keys
+                    if not k.startswith("FMU_Environment")
+                )
+
+            self.simulate(building_model, control_input, self.n_steps)
+            np.testing.assert_array_equal(
+                building_model.output[STATES.THERMOSTAT_TEMPERATURE],
+                full_model.output[STATES.THERMOSTAT_TEMPERATURE],
+            )
+            np.testing.assert_array_equal(
+                building_model.output[STATES.THERMOSTAT_HUMIDITY],
+                full_model.output[STATES.THERMOSTAT_HUMIDITY],
+            )
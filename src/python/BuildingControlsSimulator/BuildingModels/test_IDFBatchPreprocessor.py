@@ -0,0 +1,81 @@
+import os
+import shutil
+import logging
+
+import pytest
+
+from BuildingControlsSimulator.BuildingModels.IDFBatchPreprocessor import (
+    IDFBatchPreprocessor,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class TestIDFBatchPreprocessor:
+    @classmethod
+    def setup_class(cls):
+        # basic IDF file found in all EnergyPlus installations
+        cls.dummy_idf_name = "Furnace.idf"
+        cls.test_dir = os.path.join(
+            os.environ.get("IDF_DIR"), "test_idf_batch_preprocessor"
+        )
+        os.makedirs(cls.test_dir, exist_ok=True)
+
+        cls.dummy_idf_path = os.path.join(cls.test_dir, cls.dummy_idf_name)
+        if not os.path.isfile(cls.dummy_idf_path):
+            shutil.copyfile(
+                os.path.join(
+                    os.environ.get("EPLUS_DIR"),
+                    "ExampleFiles",
+                    cls.dummy_idf_name,
+                ),
+                cls.dummy_idf_path,
+            )
+
+        # invalid IDF files are recorded as failed
+        cls.invalid_idf_path = os.path.join(cls.test_dir, "invalid.idf")
+        with open(cls.invalid_idf_path, "w") as f:
+            f.write("not an idf file\n")
+
+        cls.manifest_path = os.path.join(cls.test_dir, "prep_manifest.json")
+        cls.manifest = IDFBatchPreprocessor(
+            idf_paths=[cls.test_dir],
+            preprocessor_kwargs={"timesteps_per_hour": 12},
+            n_workers=2,
+            manifest_path=cls.manifest_path,
+        ).run()
+
+    @classmethod
+    def teardown_class(cls):
+        """ teardown any state that was previously setup with a call to
+        setup_class.
+        """
+        pass
+
+    def test_manifest(self):
+        manifest = IDFBatchPreprocessor.load_manifest(self.manifest_path)
+        assert manifest == self.manifest
+        assert set(manifest["idfs"].keys()) == {
+            self.dummy_idf_name,
+            "invalid.idf",
+        }
+        assert "error" in manifest["idfs"]["invalid.idf"]
+
+        record = manifest["idfs"][self.dummy_idf_name]
+        assert os.path.isfile(record["idf_prep_path"])
+        assert record["thermostat_zone"]
+        assert record["conditioned_zones"]
+
+    def test_get_idf(self):
+        manifest = IDFBatchPreprocessor.load_manifest(self.manifest_path)
+        record = manifest["idfs"][self.dummy_idf_name]
+        idf = IDFBatchPreprocessor.get_idf(
+            manifest, self.dummy_idf_name, timesteps_per_hour=12
+        )
+        assert idf.thermostat_zone == record["thermostat_zone"]
+        assert idf.preprocess() == record["idf_prep_path"]
+        # preprocessing results are restored without parsing the IDF
+        assert idf._ep_idf is None
+
+        with pytest.raises(ValueError):
+            IDFBatchPreprocessor.get_idf(manifest, "invalid.idf")
@@ -0,0 +1,135 @@
+import os
+import io
+import logging
+
+import pytest
+from eppy.modeleditor import IDF
+
+from BuildingControlsSimulator.BuildingModels.IDFObjectIndex import (
+    IDFObjectIndex,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class TestIDFObjectIndex:
+    @classmethod
+    def setup_class(cls):
+        IDF.setiddname(os.environ.get("EPLUS_IDD"))
+        cls.idf_txt = """
+            ScheduleTypeLimits, Temperature, -100, 200, CONTINUOUS;
+            ScheduleTypeLimits, Fraction, 0, 1, CONTINUOUS;
+            ScheduleTypeLimits, Control Type, 0, 4, DISCRETE;
+            ScheduleTypeLimits, Outdoor temperature, -100, 200, CONTINUOUS;
+            ZoneList, upstairs, bedroom_1, bedroom_2;
+            ZoneHVAC:EquipmentConnections, living, living_equip;
+            Sizing:Zone, upstairs;
+            People, living_people, living;
+            People, upstairs_people, upstairs;
+            ZoneControl:Thermostat, living_tstat, living;
+        """
+
+    @classmethod
+    def teardown_class(cls):
+        """ teardown any state that was previously setup with a call to
+        setup_class.
+        """
+        pass
+
+    def get_idf_index(self):
+        return IDFObjectIndex(ep_idf=IDF(io.StringIO(self.idf_txt)))
+
+    def test_build_zone_index(self):
+        idf_index = self.get_idf_index()
+        idf_index.build_zone_index()
+        assert idf_index.zone_lists == {
+            "upstairs": ["bedroom_1", "bedroom_2"]
+        }
+        assert idf_index.conditioned_zones == [
+            "living",
+            "bedroom_1",
+            "bedroom_2",
+        ]
+        assert idf_index.occupied_zones == [
+            "living",
+            "bedroom_1",
+            "bedroom_2",
+        ]
+        assert [t.Name for t in idf_index.thermostats] == ["living_tstat"]
+
+    def test_remove(self):
+        idf_index = self.get_idf_index()
+        ep_idf = idf_index.ep_idf
+        n_removed = idf_index.remove_where(
+            "ScheduleTypeLimits",
+            lambda obj: "temperature" in obj.Name.lower(),
+        )
+        assert n_removed == 2
+        assert [
+            obj.Name for obj in ep_idf.idfobjects["ScheduleTypeLimits"]
+        ] == ["Fraction", "Control Type"]
+        # model of eppy is kept in sync
+        assert len(ep_idf.model.dt["SCHEDULETYPELIMITS"]) == 2
+
+        idf_index.remove_all("People")
+        assert len(ep_idf.idfobjects["People"]) == 0
+        assert "People" not in ep_idf.idfstr()
+
+    def test_get_object(self):
+        idf_index = self.get_idf_index()
+        obj = idf_index.get_object("ScheduleTypeLimits", "control type")
+        assert obj.Name == "Control Type"
+        assert idf_index.get_object("ScheduleTypeLimits", "missing") is None
+
+        # objects added to the model are found
+        idf_index.ep_idf.newidfobject("ScheduleTypeLimits", Name="On/Off")
+        assert idf_index.get_object("ScheduleTypeLimits", "On/Off")
+
+        # index is updated when objects are removed and added
+        idf_index.remove_where(
+            "ScheduleTypeLimits", lambda obj: obj.Name == "Temperature"
+        )
+        idf_index.ep_idf.newidfobject("ScheduleTypeLimits", Name="Other")
+        assert not idf_index.get_object("ScheduleTypeLimits", "Temperature")
+        assert idf_index.get_object("ScheduleTypeLimits", "Other")
+
+        # also when removed with eppy
+        ep_idf = idf_index.ep_idf
+        ep_idf.removeidfobject(
+            idf_index.get_object("ScheduleTypeLimits", "Fraction")
+        )
+        ep_idf.newidfobject("ScheduleTypeLimits", Name="Another")
+        assert idf_index.get_object("ScheduleTypeLimits", "Fraction") is None
+        assert idf_index.get_object("ScheduleTypeLimits", "Another")
+
+    def test_set_fields(self):
+        idf_index = self.get_idf_index()
+        ep_idf = idf_index.ep_idf
+        idf_txt = ep_idf.idfstr()
+        undo = idf_index.set_fields(
+            [
+                ("ScheduleTypeLimits", "Fraction", "Upper_Limit_Value", 2.0),
+                ("People", "*", "Number_of_People_Schedule_Name", "occ"),
+            ]
+        )
+        assert (
+            idf_index.get_object("ScheduleTypeLimits", "Fraction")[
+                "Upper_Limit_Value"
+            ]
+            == 2.0
+        )
+        assert all(
+            obj.Number_of_People_Schedule_Name == "occ"
+            for obj in ep_idf.idfobjects["People"]
+        )
+        IDFObjectIndex.restore_fields(undo)
+        assert ep_idf.idfstr() == idf_txt
+
+        with pytest.raises(ValueError):
+            idf_index.set_fields([("People", "missing", "Name", "x")])
+
+    def test_save(self):
+        idf_index = self.get_idf_index()
+        ep_idf = idf_index.ep_idf
+        ep_idf.outputtype = "standard"
+        assert idf_index.idfstr() == ep_idf.idfstr()
@@ -11,6 +11,8 @@ import pyfmi
 
 from BuildingControlsSimulator.BuildingModels.IDFPreprocessor import (
     IDFPreprocessor,
+    scan_idf_version,
+    load_idd,
 )
 from BuildingControlsSimulator.BuildingModels.EnergyPlusBuildingModel import (
     EnergyPlusBuildingModel,
@@ -74,3 +76,91 @@ class TestIDFPreprocessor:
 
         # test that preprocessing produces valid IDF output file
         assert self.idf.check_valid_idf(prep_idf) is True
+
+    def test_prep_weather_input(self):
+        """
+        test that outdoor weather actuators are added as FMU inputs
+        """
+        idf = IDFPreprocessor(
+            idf_file=self.dummy_idf_path,
+            timesteps_per_hour=12,
+            weather_input=True,
+        )
+        idf.prep_weather_input()
+        actuators = idf.ep_idf.idfobjects[
+            "ExternalInterface:FunctionalMockupUnitExport:To:Actuator"
+        ]
+        assert [a.FMU_Variable_Name for a in actuators] == [
+            idf.FMU_weather_temperature_name,
+            idf.FMU_weather_humidity_name,
+        ]
+        assert all(
+            a.Actuated_Component_Type == "Weather Data" for a in actuators
+        )
+        # preprocessed IDFs with and without weather input do not clobber
+        assert idf.idf_prep_path != self.idf.idf_prep_path
+
+    def test_preprocess_cache(self):
+        """
+        test that preprocessed IDFs are reused only for same parameters
+        """
+        prep_idf = self.idf.preprocess(preprocess_check=False)
+        idf = IDFPreprocessor(
+            idf_file=self.dummy_idf_path, timesteps_per_hour=12
+        )
+        assert idf.get_prep_cache()
+        assert idf.preprocess() == prep_idf
+        # cached preprocessing does not parse the IDF
+        assert idf._ep_idf is None
+        for k in IDFPreprocessor.prep_cache_attrs:
+            assert getattr(idf, k) == getattr(self.idf, k)
+
+        other_idf = IDFPreprocessor(
+            idf_file=self.dummy_idf_path, timesteps_per_hour=6
+        )
+        assert other_idf.idf_prep_path != prep_idf
+        assert not other_idf.get_prep_cache()
+
+    def test_scan_idf_version(self):
+        """
+        test that IDF version is read without parsing the IDF
+        """
+        idf = IDFPreprocessor(
+            idf_file=self.dummy_idf_path, timesteps_per_hour=12
+        )
+        assert idf._ep_idf is None
+        assert scan_idf_version(self.dummy_idf_path) == idf.get_idf_version(
+            idf.ep_idf
+        )
+        # not an IDF file
+        assert scan_idf_version(self.dummy_weather_file) is None
+        assert not idf.check_valid_idf(self.dummy_weather_file)
+
+    def test_load_idd(self):
+        """
+        test that parsed IDD is cached
+        """
+        parsed_idd = load_idd(self.idf.idd_path, self.idf.idd_cache_dir)
+        assert any(
+            fname.startswith("idd_") and fname.endswith(".pkl")
+            for fname in os.listdir(self.idf.idd_cache_dir)
+        )
+        assert load_idd(self.idf.idd_path, self.idf.idd_cache_dir) == (
+            parsed_idd
+        )
+
+    def test_prep_minimal_file_output(self):
+        """
+        test that minimal file output profile removes reporting objects
+        """
+        idf = IDFPreprocessor(
+            idf_file=self.dummy_idf_path,
+            timesteps_per_hour=12,
+            file_output_profile="minimal",
+        )
+        prep_idf = idf.preprocess(preprocess_check=False)
+        assert prep_idf != self.idf.preprocess(preprocess_check=False)
+        for key in ["Output:SQLite", "Output:Table:SummaryReports"]:
+            assert len(idf.ep_idf.idfobjects[key]) == 0
+        # FMU outputs are not changed
+        assert idf.output_spec == self.idf.output_spec
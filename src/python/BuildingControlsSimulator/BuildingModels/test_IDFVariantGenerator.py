@@ -0,0 +1,103 @@
+import os
+import shutil
+import logging
+
+import pytest
+
+from BuildingControlsSimulator.BuildingModels.IDFVariantGenerator import (
+    IDFVariantGenerator,
+)
+from BuildingControlsSimulator.BuildingModels.IDFPreprocessor import (
+    scan_idf_version,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class TestIDFVariantGenerator:
+    @classmethod
+    def setup_class(cls):
+        # basic IDF file found in all EnergyPlus installations
+        cls.dummy_idf_name = "Furnace.idf"
+        cls.dummy_idf_path = os.path.join(
+            os.environ.get("IDF_DIR"), cls.dummy_idf_name
+        )
+        if not os.path.isfile(cls.dummy_idf_path):
+            shutil.copyfile(
+                os.path.join(
+                    os.environ.get("EPLUS_DIR"),
+                    "ExampleFiles",
+                    cls.dummy_idf_name,
+                ),
+                cls.dummy_idf_path,
+            )
+
+        cls.variants = {
+            f"infiltration_{v}": [
+                (
+                    "ZoneInfiltration:DesignFlowRate",
+                    "*",
+                    "Constant_Term_Coefficient",
+                    v,
+                )
+            ]
+            for v in [0.5, 1.0]
+        }
+        cls.generator = IDFVariantGenerator(
+            idf_file=cls.dummy_idf_path,
+            variants=cls.variants,
+            preprocessor_kwargs={"timesteps_per_hour": 12},
+            n_workers=2,
+        )
+        cls.variant_idfs = cls.generator.run()
+
+    @classmethod
+    def teardown_class(cls):
+        """ teardown any state that was previously setup with a call to
+        setup_class.
+        """
+        pass
+
+    def test_variants(self):
+        base_idf = self.generator.base_idf
+        prep_paths = set([base_idf.idf_prep_path])
+        for variant_name, variant_idf in self.variant_idfs.items():
+            assert os.path.isfile(variant_idf.idf_prep_path)
+            assert scan_idf_version(variant_idf.idf_prep_path) == (
+                base_idf.ep_version
+            )
+            assert variant_idf.thermostat_zone == base_idf.thermostat_zone
+            assert variant_idf.output_spec == base_idf.output_spec
+            # variants do not share mutable attributes with the base IDF
+            assert variant_idf.output_spec is not base_idf.output_spec
+            prep_paths.add(variant_idf.idf_prep_path)
+
+        # base and each variant have own preprocessed IDF
+        assert len(prep_paths) == len(self.variants) + 1
+
+    def test_variant_cache(self):
+        for variant_name, variant_idf in self.generator.run().items():
+            assert variant_idf.idf_prep_path == (
+                self.variant_idfs[variant_name].idf_prep_path
+            )
+            # variants are restored from cache without parsing
+            assert variant_idf._ep_idf is None
+
+        idf = self.generator.get_variant_idf("infiltration_0.5")
+        assert idf.preprocess() == (
+            self.variant_idfs["infiltration_0.5"].idf_prep_path
+        )
+
+    def test_variant_preprocess(self):
+        # preprocessing a variant alone writes the same IDF as the generator
+        idf = self.generator.get_variant_idf("infiltration_1.0")
+        with open(idf.idf_prep_path, "r") as f:
+            generated_idf = f.read()
+        os.remove(idf.idf_prep_meta_path)
+        assert idf.preprocess() == (
+            self.variant_idfs["infiltration_1.0"].idf_prep_path
+        )
+        with open(idf.idf_prep_path, "r") as f:
+            assert f.read() == generated_idf
+        assert idf.thermostat_zone == self.generator.base_idf.thermostat_zone
+        assert idf.output_spec is not self.generator.base_idf.output_spec
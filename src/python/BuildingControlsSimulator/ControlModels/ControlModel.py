@@ -18,6 +18,8 @@ class ControlModel(ABC):
 
     output = attr.ib(default={})
     step_output = attr.ib(default={})
+    # forecasts of input data, see `set_forecast`
+    forecast = attr.ib(default=None, kw_only=True)
 
     @abstractmethod
     def initialize(self, t_start, t_end, ts):
@@ -28,3 +30,59 @@ class ControlModel(ABC):
     def do_step(self):
         """Defines sequence of step internals."""
         pass
+
+    def set_forecast(self, forecast):
+        """Give controller access to forecasts of its input data, see
+        `ForecastChannel`. Predictive controllers read the forecast of the
+        current step with `self.forecast.get_forecast(state, t_idx)`."""
+        self.forecast = forecast
+
+    def get_params(self):
+        """Get attributes that define controller behaviour. Runtime state and
+        output memory are excluded."""
+        _runtime_attrs = [
+            "input_states",
+            "output_states",
+            "output",
+            "step_output",
+            "current_t_idx",
+            "step_size_seconds",
+            "forecast",
+        ]
+        return {
+            k: v
+            for k, v in attr.asdict(self, recurse=False).items()
+            if k not in _runtime_attrs
+        }
+
+    def get_checkpoint(self):
+        """Get all attributes needed to resume simulation of controller.
+        Controllers with state outside of their attributes must extend this.
+        The forecast is set again from the data client on initialize."""
+        return {
+            k: v
+            for k, v in attr.asdict(self, recurse=False).items()
+            if k not in ["input_states", "output_states", "forecast"]
+        }
+
+    def set_checkpoint(self, checkpoint):
+        """Restore controller from checkpoint. The controller must be
+        initialized first, output memory is restored into the allocated
+        output memory so that the simulation period can be extended."""
+        for k, v in checkpoint.items():
+            if k == "output":
+                ControlModel.restore_output(self.output, v)
+            else:
+                setattr(self, k, v)
+
+    @staticmethod
+    def restore_output(output, checkpoint_output):
+        """Copy checkpointed output arrays into start of output arrays."""
+        for k, v in checkpoint_output.items():
+            if k not in output:
+                continue
+            n = min(len(output[k]), len(v))
+            if isinstance(output[k], pd.Series):
+                output[k].iloc[:n] = np.asarray(v)[:n]
+            else:
+                output[k][:n] = np.asarray(v)[:n]
@@ -10,6 +10,10 @@ from BuildingControlsSimulator.DataClients.DataSpec import Internal
 from BuildingControlsSimulator.DataClients.SensorsChannel import SensorsChannel
 from BuildingControlsSimulator.DataClients.HVACChannel import HVACChannel
 from BuildingControlsSimulator.DataClients.WeatherChannel import WeatherChannel
+from BuildingControlsSimulator.DataClients.WeatherCohort import WeatherCohort
+from BuildingControlsSimulator.DataClients.ForecastChannel import (
+    ForecastChannel,
+)
 from BuildingControlsSimulator.DataClients.DataSource import DataSource
 
 logger = logging.getLogger(__name__)
@@ -23,6 +27,13 @@ class DataClient:
     sensors = attr.ib(default=None)
     weather = attr.ib(default=None)
     full_data_periods = attr.ib(factory=list)
+    # shared TMY fill data, see `DataClient.resolve_weather_cohorts`
+    weather_cohort = attr.ib(default=None)
+    # forecasts are only made if a horizon is set, see `ForecastChannel`
+    forecast = attr.ib(default=None)
+    forecast_horizon_steps = attr.ib(default=None)
+    forecast_states = attr.ib(default=None)
+    forecast_noise_models = attr.ib(factory=dict)
 
     # input variables
     source = attr.ib(validator=attr.validators.instance_of(DataSource))
@@ -36,6 +47,9 @@ class DataClient:
     ep_tmy3_cache_dir = attr.ib(default=os.environ.get("EP_TMY3_CACHE_DIR"))
     simulation_epw_dir = attr.ib(default=os.environ.get("SIMULATION_EPW_DIR"))
     weather_dir = attr.ib(default=os.environ.get("WEATHER_DIR"))
+    weather_mirror_dir = attr.ib(
+        default=os.environ.get("WEATHER_MIRROR_DIR")
+    )
 
     # state variables
     sim_config = attr.ib(default=None)
@@ -136,22 +150,85 @@ class DataClient:
         )
         self.sensors.drop_unused_room_sensors()
 
-        self.weather = WeatherChannel(
+        self.weather = self.get_weather_channel(
             data=_data[
                 [Internal.datetime_column]
                 + Internal.intersect_columns(
                     _data.columns, Internal.weather.spec
                 )
-            ],
+            ]
+        )
+
+        # post-processing of weather channel for EnergyPlus usage
+        self.weather.make_epw_file(
+            sim_config=self.sim_config, weather_cohort=self.weather_cohort
+        )
+
+        if self.forecast_horizon_steps:
+            self.forecast = ForecastChannel.from_channels(
+                channels=[self.hvac, self.sensors, self.weather],
+                horizon_steps=self.forecast_horizon_steps,
+                states=self.forecast_states,
+                noise_models=self.forecast_noise_models,
+            )
+
+    def get_weather_channel(self, data):
+        return WeatherChannel(
+            data=data,
             spec=Internal.weather,
             archive_tmy3_dir=self.archive_tmy3_dir,
             archive_tmy3_data_dir=self.archive_tmy3_data_dir,
             ep_tmy3_cache_dir=self.ep_tmy3_cache_dir,
             simulation_epw_dir=self.simulation_epw_dir,
+            weather_mirror_dir=self.weather_mirror_dir,
         )
 
-        # post-processing of weather channel for EnergyPlus usage
-        self.weather.make_epw_file(sim_config=self.sim_config)
+    @staticmethod
+    def resolve_weather_cohorts(data_clients):
+        """Group data clients by nearest TMY weather station and read the
+        fill data of each station once. The nearest stations of all data
+        clients are found in one query.
+
+        :return: dict of `WeatherCohort` by station fill file path
+        """
+        if not data_clients:
+            return {}
+
+        fill_epw_paths, fill_epw_fnames = (
+            data_clients[0]
+            .get_weather_channel(data=None)
+            .get_tmy_epws(
+                [dc.sim_config["latitude"] for dc in data_clients],
+                [dc.sim_config["longitude"] for dc in data_clients],
+            )
+        )
+
+        weather_cohorts = {}
+        for dc, fill_epw_path, fill_epw_fname in zip(
+            data_clients, fill_epw_paths, fill_epw_fnames
+        ):
+            if fill_epw_path not in weather_cohorts:
+                (
+                    fill_epw_data,
+                    epw_meta,
+                    meta_lines,
+                ) = dc.get_weather_channel(data=None).read_epw(fill_epw_path)
+                weather_cohorts[fill_epw_path] = WeatherCohort(
+                    fill_epw_path=fill_epw_path,
+                    fill_epw_fname=fill_epw_fname,
+                    fill_epw_data=fill_epw_data,
+                    epw_meta=epw_meta,
+                    meta_lines=meta_lines,
+                )
+
+            dc.weather_cohort = weather_cohorts[fill_epw_path]
+            dc.weather_cohort.identifiers.append(dc.sim_config["identifier"])
+
+        logger.info(
+            f"Resolved weather of {len(data_clients)} data clients "
+            + f"to {len(weather_cohorts)} stations."
+        )
+        return weather_cohorts
 
     def get_metadata(self):
         return pd.read_csv(self.meta_gs_uri).drop_duplicates(
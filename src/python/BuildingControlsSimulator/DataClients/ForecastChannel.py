@@ -0,0 +1,105 @@
+import logging
+
+import attr
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from BuildingControlsSimulator.DataClients.DataStates import STATES
+
+logger = logging.getLogger(__name__)
+
+
+@attr.s(kw_only=True)
+class ForecastChannel:
+    """Perfect foresight forecasts of data channels.
+
+    The forecast of a state at step t_idx is the values of steps
+    t_idx to t_idx + horizon_steps - 1. Forecasts are read-only strided
+    views into one array per state so that no data is copied per step.
+    Steps after the end of the data are NaN. Noise models, see
+    `ForecastNoise`, are only applied when a forecast is requested.
+    """
+
+    horizon_steps = attr.ib()
+    windows = attr.ib(factory=dict)
+    noise_models = attr.ib(factory=dict)
+
+    @staticmethod
+    def get_default_states():
+        return [
+            STATES.OUTDOOR_TEMPERATURE,
+            STATES.OUTDOOR_RELATIVE_HUMIDITY,
+            STATES.TEMPERATURE_STP_COOL,
+            STATES.TEMPERATURE_STP_HEAT,
+        ]
+
+    @staticmethod
+    def from_channels(channels, horizon_steps, states=None, noise_models=None):
+        """Make forecasts of states found in data channels.
+
+        :param channels: list of `DataChannel` with aligned steps
+        :param states: states to forecast, defaults to outdoor weather and
+        setpoints, states not in any channel are skipped
+        :param noise_models: dict of noise model by state
+        """
+        if horizon_steps < 1:
+            raise ValueError(f"Invalid horizon_steps={horizon_steps}")
+
+        windows = {}
+        for state in states or ForecastChannel.get_default_states():
+            for channel in channels:
+                if state in channel.data.columns:
+                    windows[state] = ForecastChannel.make_windows(
+                        channel.data[state].to_numpy(
+                            dtype="float64", na_value=np.nan
+                        ),
+                        horizon_steps,
+                    )
+                    break
+
+        return ForecastChannel(
+            horizon_steps=horizon_steps,
+            windows=windows,
+            noise_models=noise_models or {},
+        )
+
+    @staticmethod
+    def make_windows(values, horizon_steps):
+        """Sliding windows of length horizon_steps at every step of values.
+
+        :return: read-only array view of shape (len(values), horizon_steps)
+        """
+        padded = np.concatenate(
+            [values, np.full(horizon_steps - 1, np.nan, dtype=values.dtype)]
+        )
+        return sliding_window_view(padded, horizon_steps)
+
+    @property
+    def states(self):
+        return list(self.windows.keys())
+
+    def get_forecast(self, state, t_idx):
+        """Forecast of state at step t_idx.
+
+        :return: array of length horizon_steps, a read-only view into the
+        channel data if there is no noise model for the state
+        """
+        window = self.windows[state][t_idx]
+        if state in self.noise_models:
+            return window + self.noise_models[state].sample(
+                t_idx, self.horizon_steps
+            )
+        return window
+
+    def get_step_forecast(self, t_idx):
+        """Forecasts of all states at step t_idx."""
+        return {
+            state: self.get_forecast(state, t_idx) for state in self.windows
+        }
+
+    def get_all_forecasts(self, state):
+        """Perfect foresight forecasts of state at all steps.
+
+        :return: read-only array view of shape (n_steps, horizon_steps)
+        """
+        return self.windows[state]
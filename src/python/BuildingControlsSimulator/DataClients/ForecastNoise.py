@@ -0,0 +1,26 @@
+import logging
+
+import attr
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@attr.s(kw_only=True)
+class ForecastNoise:
+    """Gaussian forecast error that grows with lead time like a random walk.
+
+    The error of lead step k has standard deviation `std * sqrt(k)`, so the
+    current step (k=0) is exact. Noise is seeded by step index so the same
+    forecast is returned every time a step is requested, e.g. after resuming
+    from a checkpoint.
+    """
+
+    std = attr.ib(default=1.0)
+    seed = attr.ib(default=0)
+
+    def sample(self, t_idx, horizon_steps):
+        _rng = np.random.default_rng([self.seed, int(t_idx)])
+        return _rng.standard_normal(horizon_steps) * (
+            self.std * np.sqrt(np.arange(horizon_steps))
+        )
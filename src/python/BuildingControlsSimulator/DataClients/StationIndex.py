@@ -0,0 +1,135 @@
+import os
+import logging
+import pickle
+import hashlib
+from collections import OrderedDict
+
+import attr
+import pandas as pd
+import numpy as np
+import sklearn
+from sklearn.neighbors import BallTree
+
+logger = logging.getLogger(__name__)
+
+
+@attr.s(kw_only=True)
+class StationIndex:
+    """Nearest weather station lookup using a ball tree with haversine
+    distance.
+
+    Station coordinates must be in radians. Indexes made from csv files are
+    pickled next to the csv file keyed by its content hash and the
+    sklearn and pandas versions, and the most recently loaded indexes are
+    kept in memory, so that the station list is only parsed and indexed
+    once.
+    """
+
+    stations = attr.ib()
+    lat_column = attr.ib(default="lat")
+    lon_column = attr.ib(default="lon")
+    tree = attr.ib(default=None)
+
+    # increment to invalidate persisted indexes
+    index_version = 1
+    max_memory_cache = 8
+    _memory_cache = OrderedDict()
+
+    def __attrs_post_init__(self):
+        if self.tree is None:
+            self.tree = BallTree(
+                self.stations[[self.lat_column, self.lon_column]].to_numpy(
+                    dtype="float64"
+                ),
+                metric="haversine",
+            )
+
+    def query(self, lat, lon):
+        """Find nearest station of each query point.
+
+        :param lat: latitude(s) in degrees
+        :param lon: longitude(s) in degrees
+        :return: positional indexes of stations and distances in radians
+        """
+        query_points = np.radians(
+            np.column_stack(
+                [
+                    np.atleast_1d(np.asarray(lat, dtype="float64")),
+                    np.atleast_1d(np.asarray(lon, dtype="float64")),
+                ]
+            )
+        )
+        distances, indexes = self.tree.query(query_points, k=1)
+        return indexes[:, 0], distances[:, 0]
+
+    def get_nearest_stations(self, lat, lon):
+        """Get nearest station record of each query point."""
+        indexes, _ = self.query(lat, lon)
+        return self.stations.iloc[indexes].reset_index(drop=True)
+
+    @staticmethod
+    def from_csv(
+        csv_path,
+        index_dir=None,
+        lat_column="lat",
+        lon_column="lon",
+        usecols=None,
+        degrees=False,
+    ):
+        """Load station index of csv file of stations.
+
+        :param index_dir: directory of persisted index, defaults to
+        directory of csv file
+        :param degrees: station coordinates in csv are in degrees
+        """
+        _stat = os.stat(csv_path)
+        memory_key = (
+            os.path.abspath(csv_path),
+            _stat.st_mtime,
+            _stat.st_size,
+            lat_column,
+            lon_column,
+            tuple(usecols) if usecols else None,
+            degrees,
+        )
+        _cache = StationIndex._memory_cache
+        if memory_key in _cache:
+            _cache.move_to_end(memory_key)
+            return _cache[memory_key]
+
+        with open(csv_path, "rb") as f:
+            _hash = hashlib.sha1(f.read())
+        # pickled indexes can only be loaded by the same library versions
+        _hash.update(
+            str(
+                memory_key[3:] + (sklearn.__version__, pd.__version__)
+            ).encode("utf-8")
+        )
+        index_path = os.path.join(
+            index_dir or os.path.dirname(csv_path),
+            f"station_index_{_hash.hexdigest()}"
+            + f"_v{StationIndex.index_version}.pkl",
+        )
+
+        if os.path.isfile(index_path):
+            with open(index_path, "rb") as f:
+                station_index = pickle.load(f)
+        else:
+            logger.info(f"Building station index of: {csv_path}")
+            stations = pd.read_csv(csv_path, usecols=usecols)
+            if degrees:
+                stations[lat_column] = np.radians(stations[lat_column])
+                stations[lon_column] = np.radians(stations[lon_column])
+            station_index = StationIndex(
+                stations=stations, lat_column=lat_column, lon_column=lon_column
+            )
+            # write to temporary file first so readers never see partial files
+            with open(index_path + ".tmp", "wb") as f:
+                pickle.dump(station_index, f)
+            os.replace(index_path + ".tmp", index_path)
+
+        _cache[memory_key] = station_index
+        _cache.move_to_end(memory_key)
+        while len(_cache) > StationIndex.max_memory_cache:
+            _cache.popitem(last=False)
+        return station_index
@@ -3,15 +3,20 @@
 import os
 import logging
 import re
-from datetime import datetime
+import json
+import hashlib
+from collections import OrderedDict
 
 import pandas as pd
 import numpy as np
 import attr
 import requests
-from sklearn.metrics.pairwise import haversine_distances
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 from BuildingControlsSimulator.DataClients.DataSpec import EnergyPlusWeather
+from BuildingControlsSimulator.DataClients.StationIndex import StationIndex
+from BuildingControlsSimulator.DataClients.WeatherMirror import WeatherMirror
 from BuildingControlsSimulator.DataClients.DataChannel import DataChannel
 from BuildingControlsSimulator.Conversions.Conversions import Conversions
 
@@ -25,8 +30,13 @@ class WeatherChannel(DataChannel):
     """
 
     epw_path = attr.ib(default=None)
+    fill_epw_path = attr.ib(default=None)
+    fill_epw_fname = attr.ib(default=None)
     epw_data = attr.ib(factory=dict)
     epw_meta = attr.ib(factory=dict)
+    # data of each record from the hour of year of the filled EPW data, see
+    # `get_filled_data`
+    filled_data = attr.ib(default=None)
 
     # env variables
     ep_tmy3_cache_dir = attr.ib()
@@ -36,6 +46,10 @@ class WeatherChannel(DataChannel):
     archive_tmy3_dir = attr.ib(default=None)
     archive_tmy3_meta = attr.ib(default=None)
     archive_tmy3_data_dir = attr.ib(default=None)
+    # parsed EPW cache, defaults to `parsed` dir in ep_tmy3_cache_dir
+    epw_cache_dir = attr.ib(default=None)
+    # local weather mirror, stations are resolved without network if set
+    weather_mirror_dir = attr.ib(default=None)
 
     # column names
     datetime_column = attr.ib(default=EnergyPlusWeather.datetime_column)
@@ -43,6 +57,29 @@ class WeatherChannel(DataChannel):
     epw_meta_keys = attr.ib(default=EnergyPlusWeather.epw_meta)
     epw_column_map = attr.ib(default=EnergyPlusWeather.output_rename_dict)
 
+    # increment to invalidate parsed EPW cache when parsing changes
+    epw_cache_version = 1
+    # parsed EPW files in memory are shared by all weather channels so that
+    # thermostats mapped to the same station only read the file once
+    max_parsed_epw_memory_cache = 16
+    _parsed_epw_memory_cache = OrderedDict()
+    # station list of EnergyPlus TMY weather files, see `get_tmy_station_index`
+    tmy_station_cache_name = "eplus_geojson_cache.csv"
+
+    # EPW files have a 365 day year
+    HOURS_PER_YEAR = 8760
+    CUMULATIVE_DAYS = np.cumsum(
+        [0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30], dtype="int64"
+    )
+    # date time columns can be smaller nullable integers
+    EPW_DATETIME_DTYPES = {
+        "year": "int16",
+        "month": "int8",
+        "day": "int8",
+        "hour": "int8",
+        "minute": "int8",
+    }
+
     def get_epw_path(self, identifier, fill_epw_fname):
         os.path.join(
             self.simulation_epw_dir,
@@ -51,38 +88,77 @@ class WeatherChannel(DataChannel):
             + f"_{fill_epw_fname}",
         )
 
-    def make_epw_file(self, sim_config):
-        _epw_path = None
-        # attempt to get .epw data from NREL
-        fill_epw_path, fill_epw_fname = self.get_tmy_epw(
-            sim_config["latitude"], sim_config["longitude"]
-        )
-        (fill_epw_data, epw_meta, meta_lines,) = self.read_epw(fill_epw_path)
+    def make_epw_file(self, sim_config, weather_cohort=None):
+        """Make simulation EPW file from data filled with TMY data.
 
-        if not fill_epw_data.empty:
-            _epw_path = os.path.join(
-                self.simulation_epw_dir,
-                "NREL_EPLUS"
-                + f"_{sim_config['identifier']}"
-                + f"_{fill_epw_fname}",
+        :param weather_cohort: shared TMY fill data of nearest station, if
+        not given the nearest station is found and read for this thermostat
+        """
+        _epw_path = None
+        if weather_cohort:
+            fill_epw_path = weather_cohort.fill_epw_path
+            fill_epw_fname = weather_cohort.fill_epw_fname
+            fill_epw_data = weather_cohort.fill_epw_data
+            meta_lines = weather_cohort.meta_lines
+        else:
+            # attempt to get .epw data from NREL
+            fill_epw_path, fill_epw_fname = self.get_tmy_epw(
+                sim_config["latitude"], sim_config["longitude"]
+            )
+            (fill_epw_data, epw_meta, meta_lines,) = self.read_epw(
+                fill_epw_path
             )
 
+        self.fill_epw_path = fill_epw_path
+        self.fill_epw_fname = fill_epw_fname
+
+        if not fill_epw_data.empty:
             # fill any missing fields in epw
             # need to pass in original dyd datetime column name
             epw_data = self.fill_epw(self.data, fill_epw_data,)
+            self.filled_data = self.get_filled_data(epw_data)
 
-            # save to file
-            self.to_epw(
+            # save to file named by content so that thermostats with
+            # identical weather share the file and the FMU made from it
+            _epw_path = self.to_content_addressed_epw(
                 epw_data=epw_data,
-                meta=epw_meta,
                 meta_lines=meta_lines,
-                fpath=_epw_path,
+                prefix="NREL_EPLUS",
+                fname=fill_epw_fname,
             )
 
             self.epw_path = _epw_path
         else:
             logger.error("failed to retrieve .epw fill data.")
 
+    def make_tmy_epw_file(self, weather_cohort=None):
+        """Make simulation EPW file of the unfilled TMY data of the nearest
+        station in UTC. Used for FMUs with outdoor weather inputs that are
+        shared by all thermostats of the station, see
+        `IDFPreprocessor.weather_input`. Must be called after
+        `make_epw_file`.
+
+        :return: path of EPW file
+        """
+        if weather_cohort and weather_cohort.tmy_epw_path:
+            return weather_cohort.tmy_epw_path
+
+        if weather_cohort:
+            fill_epw_data = weather_cohort.fill_epw_data
+            meta_lines = weather_cohort.meta_lines
+        else:
+            fill_epw_data, _, meta_lines = self.read_epw(self.fill_epw_path)
+
+        tmy_epw_path = self.to_content_addressed_epw(
+            epw_data=fill_epw_data[self.epw_columns],
+            meta_lines=meta_lines,
+            prefix="NREL_EPLUS_TMY",
+            fname=self.fill_epw_fname,
+        )
+        if weather_cohort:
+            weather_cohort.tmy_epw_path = tmy_epw_path
+        return tmy_epw_path
+
     def read_epw(self, fpath):
         """
         Given a file-like buffer with data in Energy Plus Weather (EPW) format,
@@ -111,6 +187,18 @@ class WeatherChannel(DataChannel):
         --------
         pvlib.iotools.read_epw
         """
+        epw_hash = WeatherChannel.get_file_hash(fpath)
+        parsed = self.get_parsed_epw_cache(epw_hash)
+        if parsed is None:
+            parsed = self.parse_epw(fpath)
+            self.put_parsed_epw_cache(epw_hash, *parsed)
+
+        # return copies so that callers can modify them
+        data, meta, meta_epw_lines = parsed
+        return data.copy(deep=True), dict(meta), list(meta_epw_lines)
+
+    def parse_epw(self, fpath):
+        """Parse EPW file, see `read_epw`."""
         # read meta data into list of lines, determine n_meta_line
         # the last meta data line is marked with "DATA PERIODS"
         meta_epw_lines = []
@@ -133,16 +221,6 @@ class WeatherChannel(DataChannel):
             fpath, skiprows=n_meta_line, header=0, names=self.epw_columns
         )
 
-        data = data.astype(
-            {
-                "year": "Int16",
-                "month": "Int8",
-                "day": "Int8",
-                "hour": "Int8",
-                "minute": "Int8",
-            },
-        )
-
         # some EPW files have minutes=60 to represent the end of the hour
         # this doesnt actually mean it is the next hour, it should be 0
         # see: https://discourse.radiance-online.org/t/ \
@@ -154,29 +232,14 @@ class WeatherChannel(DataChannel):
         # EPW format uses hour = [1-24], set to [0-23]
         data["hour"] = data["hour"] - 1
 
-        # create datetime column in UTC
-        dt_cols = (
-            data[["year", "month", "day", "hour", "minute"]]
-            .astype("str")
-            .apply(lambda x: x.str.zfill(2))
-        )
-        # create string column with compact format="%Y%m%d%H%M"
-        dt_str_col = (
-            dt_cols["year"]
-            + dt_cols["month"]
-            + dt_cols["day"]
-            + dt_cols["hour"]
-            + dt_cols["minute"]
-        )
-
-        data[self.datetime_column] = pd.to_datetime(
-            dt_str_col.astype("str"), format="%Y%m%d%H%M"
-        )
-        # localize and convert to UTC
-        data[self.datetime_column] = (
-            data[self.datetime_column]
-            .dt.tz_localize(int(meta["TZ"] * 3600))
-            .dt.tz_convert(tz="UTC")
+        # create datetime column in UTC from integer columns
+        data[self.datetime_column] = WeatherChannel.make_utc_datetime(
+            year=data["year"].to_numpy(),
+            month=data["month"].to_numpy(),
+            day=data["day"].to_numpy(),
+            hour=data["hour"].to_numpy(),
+            minute=data["minute"].to_numpy(),
+            tz_offset_seconds=int(meta["TZ"] * 3600),
         )
         # there will be missing columns at beginning
         # cycle from endtime to give full UTC year
@@ -199,6 +262,94 @@ class WeatherChannel(DataChannel):
 
         return data, meta, meta_epw_lines
 
+    @staticmethod
+    def make_utc_datetime(year, month, day, hour, minute, tz_offset_seconds):
+        """Make UTC datetimes from integer arrays of local standard time."""
+        _dt = (
+            (np.asarray(year, dtype="int64") - 1970).astype("datetime64[Y]")
+            + (np.asarray(month, dtype="int64") - 1).astype("timedelta64[M]")
+        ).astype("datetime64[m]")
+        _dt = (
+            _dt
+            + (np.asarray(day, dtype="int64") - 1).astype("timedelta64[D]")
+            + np.asarray(hour, dtype="int64").astype("timedelta64[h]")
+            + np.asarray(minute, dtype="int64").astype("timedelta64[m]")
+            - np.timedelta64(tz_offset_seconds, "s")
+        )
+        return pd.to_datetime(_dt.astype("datetime64[ns]")).tz_localize(
+            "UTC"
+        )
+
+    @staticmethod
+    def get_file_hash(fpath):
+        _hash = hashlib.sha1()
+        with open(fpath, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                _hash.update(chunk)
+        return _hash.hexdigest()
+
+    def get_parsed_epw_cache_path(self, epw_hash):
+        _dir = self.epw_cache_dir
+        if not _dir and self.ep_tmy3_cache_dir:
+            _dir = os.path.join(self.ep_tmy3_cache_dir, "parsed")
+        if not _dir:
+            return None
+        return os.path.join(
+            _dir, f"{epw_hash}_v{self.epw_cache_version}.parquet"
+        )
+
+    def get_parsed_epw_cache(self, epw_hash):
+        """Get parsed EPW data from memory or disk cache."""
+        _cache = WeatherChannel._parsed_epw_memory_cache
+        if epw_hash in _cache:
+            _cache.move_to_end(epw_hash)
+            return _cache[epw_hash]
+
+        cache_path = self.get_parsed_epw_cache_path(epw_hash)
+        if not cache_path or not os.path.isfile(cache_path):
+            return None
+
+        table = pq.read_table(cache_path)
+        epw_meta = json.loads(table.schema.metadata[b"epw_meta"])
+        parsed = (
+            table.to_pandas(),
+            epw_meta["meta"],
+            epw_meta["meta_epw_lines"],
+        )
+        self.put_parsed_epw_memory_cache(epw_hash, parsed)
+        return parsed
+
+    def put_parsed_epw_cache(self, epw_hash, data, meta, meta_epw_lines):
+        """Put parsed EPW data in memory and disk cache."""
+        parsed = (data, meta, meta_epw_lines)
+        self.put_parsed_epw_memory_cache(epw_hash, parsed)
+
+        cache_path = self.get_parsed_epw_cache_path(epw_hash)
+        if not cache_path:
+            return
+
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        table = pa.Table.from_pandas(data, preserve_index=False)
+        table = table.replace_schema_metadata(
+            {
+                **table.schema.metadata,
+                b"epw_meta": json.dumps(
+                    {"meta": meta, "meta_epw_lines": meta_epw_lines}
+                ),
+            }
+        )
+        # write to temporary file first so readers never see partial files
+        pq.write_table(table, cache_path + ".tmp")
+        os.replace(cache_path + ".tmp", cache_path)
+
+    @staticmethod
+    def put_parsed_epw_memory_cache(epw_hash, parsed):
+        _cache = WeatherChannel._parsed_epw_memory_cache
+        _cache[epw_hash] = parsed
+        _cache.move_to_end(epw_hash)
+        while len(_cache) > WeatherChannel.max_parsed_epw_memory_cache:
+            _cache.popitem(last=False)
+
     def get_cdo(self):
         # TODO:
         # https://www.ncdc.noaa.gov/cdo-web/webservices/v2#gettingStarted
@@ -214,24 +365,24 @@ class WeatherChannel(DataChannel):
         # )
         pass
 
-    def get_tmy_epw(self, lat, lon):
-
+    def get_tmy_station_index(self):
+        """Get index of EnergyPlus TMY weather stations. The station list is
+        downloaded once into `archive_tmy3_dir`, or `ep_tmy3_cache_dir` if it
+        is not set, and its index is persisted next to it. Delete the cached
+        station list to download it again."""
         eplus_github_weather_geojson_url = "https://raw.githubusercontent.com/NREL/EnergyPlus/develop/weather/master.geojson"
 
         # check for cached eplus geojson
-        # cache is updated daily
-        cache_name = (
-            f"eplus_geojson_cache_{datetime.today().strftime('%Y_%m_%d')}.csv"
-        )
-        if self.archive_tmy3_dir:
-            cache_path = os.path.join(self.archive_tmy3_dir, cache_name)
-        if self.archive_tmy3_dir and os.path.exists(cache_path):
+        cache_dir = self.archive_tmy3_dir or self.ep_tmy3_cache_dir
+        cache_path = None
+        if cache_dir:
+            cache_path = os.path.join(
+                cache_dir, WeatherChannel.tmy_station_cache_name
+            )
+        if cache_path and os.path.exists(cache_path):
             logger.info(
                 f"Reading TMY weather geojson from cache: {cache_path}"
             )
-            df = pd.read_csv(cache_path)
-            if df.empty:
-                logging.error("Cached TMY weather geojson is empty.")
         else:
             logger.info(
                 f"Downloading TMY weather geojson from: {eplus_github_weather_geojson_url}"
@@ -249,22 +400,74 @@ class WeatherChannel(DataChannel):
             df["lat"] = np.radians(df["lat"])
             df["lon"] = np.radians(df["lon"])
 
-        if self.archive_tmy3_dir and os.path.isdir(self.archive_tmy3_dir):
-            df.to_csv(cache_path, index=False)
+            if not cache_path:
+                return StationIndex(
+                    stations=df[["properties.epw", "lat", "lon"]]
+                )
+            os.makedirs(cache_dir, exist_ok=True)
+            # write to temporary file first so readers never see partial files
+            df.to_csv(cache_path + ".tmp", index=False)
+            os.replace(cache_path + ".tmp", cache_path)
+
+        station_index = StationIndex.from_csv(
+            cache_path, usecols=["properties.epw", "lat", "lon"]
+        )
+        if station_index.stations.empty:
+            logging.error("Cached TMY weather geojson is empty.")
+        return station_index
+
+    def get_tmy_epw(self, lat, lon):
+        fpaths, fnames = self.get_tmy_epws([lat], [lon])
+        return fpaths[0], fnames[0]
 
-        # convert query point to radians and set dimensionality to (2,1)
-        qp = np.radians(np.atleast_2d(np.array([lat, lon])))
-        dis = haversine_distances(df[["lat", "lon"]].values, qp)
+    def get_tmy_epws(self, lats, lons):
+        """Get TMY weather files of nearest stations for many locations in
+        one query. Each station file is downloaded at most once.
 
+        :return: lists of file paths and file names
+        """
         # TODO: add finding of TMY3 datasets over TMY of same/similar location
         # e.g. for phoenix this method find TMY data while TMY3 data exists but
         # has different coordinates
-        epw_href = df.iloc[np.argmin(dis)]["properties.epw"]
+        if self.weather_mirror_dir:
+            return self.get_mirror_tmy_epws(lats, lons)
+
+        epw_hrefs = (
+            self.get_tmy_station_index()
+            .get_nearest_stations(lats, lons)["properties.epw"]
+            .to_list()
+        )
+        station_epws = {
+            epw_href: self.get_tmy_epw_file(epw_href)
+            for epw_href in set(epw_hrefs)
+        }
+        fpaths = [station_epws[epw_href][0] for epw_href in epw_hrefs]
+        fnames = [station_epws[epw_href][1] for epw_href in epw_hrefs]
+        return fpaths, fnames
+
+    def get_mirror_tmy_epws(self, lats, lons):
+        """Get TMY weather files of nearest stations from local weather
+        mirror, see `get_tmy_epws`."""
+        weather_mirror = WeatherMirror(mirror_dir=self.weather_mirror_dir)
+        fnames = weather_mirror.get_nearest_fnames(
+            lats, lons, kind=WeatherMirror.EPW
+        )
+        station_epws = {
+            fname: weather_mirror.extract(
+                WeatherMirror.EPW, fname, self.ep_tmy3_cache_dir
+            )
+            for fname in set(fnames)
+        }
+        fpaths = [station_epws[fname] for fname in fnames]
+        return fpaths, fnames
 
+    def get_tmy_epw_file(self, epw_href):
+        """Get TMY weather file from cache or download it."""
         # extract download URL from html link
         match = re.search(r'href=[\'"]?([^\'" >]+)', epw_href)
 
         fpath = None
+        fname = None
         if match:
             epw_url = match.group(1)
             fname = epw_url.split("/")[-1]
@@ -296,6 +499,9 @@ class WeatherChannel(DataChannel):
         (~300MB compressed, 1.7 GB uncompressed) is required and
         the hourly data can be deleted after download.
 
+        If `weather_mirror_dir` is set the TMY3 data of the nearest station
+        is read from the local weather mirror instead.
+
         :param lat: latitude
         :type lat: float
         :param lon: longitude
@@ -303,23 +509,28 @@ class WeatherChannel(DataChannel):
         :return: TMY3 data
         :rtype: pd.DataFrame
         """
-        # only need these columns
-        tmy3_meta = pd.read_csv(
-            self.archive_tmy3_meta, usecols=["USAF", "Latitude", "Longitude"]
-        )
-
-        # convert query point and all stations all to radians
-        qp = np.radians(np.atleast_2d(np.array([lat, lon])))
-        tmy3_meta["Latitude"] = np.radians(tmy3_meta["Latitude"])
-        tmy3_meta["Longitude"] = np.radians(tmy3_meta["Longitude"])
-
-        # compute haversine distance from all stations to query point
-        dis = haversine_distances(
-            tmy3_meta[["Latitude", "Longitude"]].values, qp
-        )
+        if self.weather_mirror_dir:
+            weather_mirror = WeatherMirror(mirror_dir=self.weather_mirror_dir)
+            fname = weather_mirror.get_nearest_fnames(
+                [lat], [lon], kind=WeatherMirror.TMY3
+            )[0]
+            return pd.read_csv(
+                weather_mirror.get_stored_path(WeatherMirror.TMY3, fname),
+                skiprows=1,
+            )
 
         # station that minimizes distance from query point should be used
-        usaf_code = tmy3_meta.USAF[np.argmin(dis)]
+        usaf_code = (
+            StationIndex.from_csv(
+                self.archive_tmy3_meta,
+                lat_column="Latitude",
+                lon_column="Longitude",
+                usecols=["USAF", "Latitude", "Longitude"],
+                degrees=True,
+            )
+            .get_nearest_stations(lat, lon)["USAF"]
+            .iloc[0]
+        )
 
         # read tmy3 data from archive using usaf code
         return pd.read_csv(
@@ -371,82 +582,220 @@ class WeatherChannel(DataChannel):
         defaults from Typical Meteorological Year 3 data sets for nearest city.
         All data is internally in UTC.
 
+        Observed data is averaged onto a fixed 8760 hour of year index and
+        overwrites the fill data wherever it is present. Leap days are not
+        part of the EPW year and observations on them are dropped.
+
         :param epw_data: EnergyPlus Weather data in a dataframe of epw_columns
         :type epw_data: pd.DataFrame
 
-        :param datetime_column: datetime column in fill data.
-        "type datetime_column: str
+        :param fill_data: TMY data of nearest station, see `read_epw`.
+        :type fill_data: pd.DataFrame
         """
-        # edit unique copy of input df
-        epw_data = epw_data.copy(deep=True)
-
-        # only need to resample and fill if records not empty
-        if len(epw_data) > 0:
-
-            # resample to hourly data
-            # the minute value has no meaning, it being 60 is not meaningful
-            epw_data = (
-                epw_data.set_index(epw_data[self.spec.datetime_column])
-                .resample("1H")
-                .mean()
-                .reset_index()
-            )
-            epw_data["year"] = epw_data[self.spec.datetime_column].dt.year
-            epw_data["month"] = epw_data[self.spec.datetime_column].dt.month
-            epw_data["day"] = epw_data[self.spec.datetime_column].dt.day
-            epw_data["hour"] = epw_data[self.spec.datetime_column].dt.hour
-            # average minutes is incorrect, should just be 0
-            epw_data["minute"] = 0
-
-            # compare fill_data and real weather data
-            fill_data = fill_data.merge(
-                epw_data[["month", "day", "hour"] + self.spec.columns],
-                how="outer",
-                on=["month", "day", "hour"],
+        # only need to fill if records not empty
+        if len(epw_data) == 0:
+            return fill_data[self.epw_columns]
+
+        observed = WeatherChannel.get_hour_of_year_means(
+            epw_data[self.spec.datetime_column],
+            [
+                epw_data[_col].to_numpy(dtype="float64")
+                for _col in self.spec.columns
+            ],
+        )
+
+        fill_hour_of_year = WeatherChannel.get_hour_of_year(
+            fill_data["month"].to_numpy(dtype="int64"),
+            fill_data["day"].to_numpy(dtype="int64"),
+            fill_data["hour"].to_numpy(dtype="int64"),
+        )
+        # fill records outside of EPW year can never be observed
+        in_year = (fill_hour_of_year >= 0) & (
+            fill_hour_of_year < WeatherChannel.HOURS_PER_YEAR
+        )
+        fill_hour_of_year = np.where(in_year, fill_hour_of_year, 0)
+
+        # build output columns once, fill data is shared and never modified
+        columns = {}
+        for _col in self.epw_columns:
+            if _col in WeatherChannel.EPW_DATETIME_DTYPES:
+                columns[_col] = pd.arrays.IntegerArray(
+                    fill_data[_col].to_numpy(
+                        dtype=WeatherChannel.EPW_DATETIME_DTYPES[_col],
+                        na_value=0,
+                    ),
+                    fill_data[_col].isnull().to_numpy(),
+                )
+            else:
+                columns[_col] = fill_data[_col].to_numpy(copy=True)
+
+        for _col, _observed in zip(self.spec.columns, observed):
+            _observed = _observed[fill_hour_of_year]
+            _mask = in_year & ~np.isnan(_observed)
+            _epw_col = EnergyPlusWeather.output_rename_dict[_col]
+            _values = columns[_epw_col].astype("float64")
+            _values[_mask] = _observed[_mask]
+            columns[_epw_col] = _values
+
+        # compute dewpoint from dry-bulb and relative humidity
+        with np.errstate(divide="ignore", invalid="ignore"):
+            columns["temp_dew"] = Conversions.relative_humidity_to_dewpoint(
+                columns["temp_air"], columns["relative_humidity"]
             )
-            # loop over spec columns and replace missing values
-            for _col in self.spec.columns:
-                fill_data.loc[fill_data[_col].isnull(), _col,] = fill_data[
-                    EnergyPlusWeather.output_rename_dict[_col]
-                ]
 
-                fill_data[
-                    EnergyPlusWeather.output_rename_dict[_col]
-                ] = fill_data[_col]
+        return pd.DataFrame(columns, index=fill_data.index)
 
-                fill_data = fill_data.drop(columns=[_col])
+    @staticmethod
+    def get_hour_of_year(month, day, hour):
+        """Hour of year [0-8759] in a 365 day year of integer arrays."""
+        return (
+            WeatherChannel.CUMULATIVE_DAYS[month - 1] + day - 1
+        ) * 24 + hour
 
-            # compute dewpoint from dry-bulb and relative humidity
-            fill_data["temp_dew"] = Conversions.relative_humidity_to_dewpoint(
-                fill_data["temp_air"], fill_data["relative_humidity"]
-            )
+    @staticmethod
+    def get_datetime_hour_of_year(datetimes):
+        """Hour of year [0-8759] of UTC datetimes in a 365 day year. Later
+        days of leap years are shifted onto the 365 day year and Feb 29 is
+        mapped onto Feb 28.
 
-            # date time columns can be smaller dtypes
-            fill_data = fill_data.astype(
-                {
-                    "year": "Int16",
-                    "month": "Int8",
-                    "day": "Int8",
-                    "hour": "Int8",
-                    "minute": "Int8",
-                },
-            )
+        :param datetimes: UTC datetimes
+        :type datetimes: pd.Series
+        :return: hour of year, NaT mask and Feb 29 mask
+        """
+        _datetimes = datetimes.to_numpy(dtype="datetime64[ns]")
+        _days = _datetimes.astype("datetime64[D]")
+        _years = _days.astype("datetime64[Y]")
+        day_of_year = (_days - _years).astype("int64")
+        hour = (_datetimes - _days).astype("timedelta64[h]").astype("int64")
+
+        _year = _years.astype("int64") + 1970
+        is_leap = (_year % 4 == 0) & ((_year % 100 != 0) | (_year % 400 == 0))
+        is_nat = np.isnat(_datetimes)
+        is_leap_day = ~is_nat & is_leap & (day_of_year == 59)
+        day_of_year = day_of_year - (is_leap & (day_of_year >= 59))
+        hour_of_year = np.where(is_nat, 0, day_of_year * 24 + hour)
+        return hour_of_year, is_nat, is_leap_day
+
+    def get_filled_data(self, epw_data):
+        """Data of each record of the channel taken from the hourly filled
+        EPW data of its hour of year, see `fill_epw`. Used as outdoor
+        weather inputs of the building model, see
+        `IDFPreprocessor.weather_input`.
+
+        :param epw_data: filled EPW data returned by `fill_epw`
+        """
+        epw_hour_of_year = WeatherChannel.get_hour_of_year(
+            epw_data["month"].to_numpy(dtype="int64"),
+            epw_data["day"].to_numpy(dtype="int64"),
+            epw_data["hour"].to_numpy(dtype="int64"),
+        )
+        in_year = (epw_hour_of_year >= 0) & (
+            epw_hour_of_year < WeatherChannel.HOURS_PER_YEAR
+        )
+        # row of EPW data of each hour of year, -1 if missing
+        epw_rows = np.full(WeatherChannel.HOURS_PER_YEAR, -1, dtype="int64")
+        epw_rows[epw_hour_of_year[in_year]] = np.nonzero(in_year)[0]
 
-        # reorder return columns
-        return fill_data[self.epw_columns]
+        hour_of_year, is_nat, _ = WeatherChannel.get_datetime_hour_of_year(
+            self.data[self.spec.datetime_column]
+        )
+        rows = np.where(is_nat, -1, epw_rows[hour_of_year])
+
+        filled_data = {
+            self.spec.datetime_column: self.data[
+                self.spec.datetime_column
+            ].to_numpy()
+        }
+        for _col in self.spec.columns:
+            _epw_col = EnergyPlusWeather.output_rename_dict[_col]
+            _values = epw_data[_epw_col].to_numpy(dtype="float64")
+            filled_data[_col] = np.where(rows >= 0, _values[rows], np.nan)
+        return pd.DataFrame(filled_data, index=self.data.index)
+
+    @staticmethod
+    def get_hour_of_year_means(datetimes, values):
+        """Average values within each hour of year, hours without any
+        non-null value are NaN.
+
+        :param datetimes: UTC datetimes of values
+        :type datetimes: pd.Series
+        :param values: list of float arrays aligned with datetimes
+        :return: list of arrays of length `HOURS_PER_YEAR`
+        """
+        hour_of_year, is_nat, is_leap_day = (
+            WeatherChannel.get_datetime_hour_of_year(datetimes)
+        )
+        # drop Feb 29
+        valid = ~is_nat & ~is_leap_day
+        hour_of_year = np.where(valid, hour_of_year, 0)
+
+        means = []
+        for _values in values:
+            _mask = valid & ~np.isnan(_values)
+            _sums = np.bincount(
+                hour_of_year[_mask],
+                weights=_values[_mask],
+                minlength=WeatherChannel.HOURS_PER_YEAR,
+            )
+            _counts = np.bincount(
+                hour_of_year[_mask], minlength=WeatherChannel.HOURS_PER_YEAR
+            )
+            with np.errstate(divide="ignore", invalid="ignore"):
+                means.append(_sums / _counts)
+        return means
 
     def to_epw(self, epw_data, meta, meta_lines, fpath):
+        with open(fpath, "w") as f:
+            f.write(WeatherChannel.format_epw(epw_data, meta_lines))
 
-        # EPW format uses hour = [1-24], set from [0-23] to [1-24]
-        epw_data["hour"] = epw_data["hour"] + 1
+        return fpath
 
-        # use newline file buffer method to allow for writing lines
-        # before pandas.to_csv writes data
-        with open(fpath, "w") as f:
-            # first add meta_lines
-            for line in meta_lines:
-                f.write(line)
-            # add data after metalines
-            epw_data.to_csv(f, header=False, index=False)
+    def to_content_addressed_epw(self, epw_data, meta_lines, prefix, fname):
+        """Write EPW file named by hash of its content into
+        simulation_epw_dir. Existing files with same content are reused.
+
+        :return: path of EPW file
+        """
+        content = WeatherChannel.format_epw(epw_data, meta_lines)
+        content_hash = hashlib.sha1(content.encode("utf-8")).hexdigest()
+        fpath = os.path.join(
+            self.simulation_epw_dir, f"{prefix}_{content_hash[:16]}_{fname}"
+        )
+        if not os.path.isfile(fpath):
+            # write to temporary file first so readers never see partial files
+            with open(fpath + ".tmp", "w") as f:
+                f.write(content)
+            os.replace(fpath + ".tmp", fpath)
 
         return fpath
+
+    @staticmethod
+    def format_epw(epw_data, meta_lines):
+        """Format EPW file content. Output is the same as `pd.to_csv` but
+        each unique value of a column is formatted only once.
+        """
+        if epw_data.empty:
+            return "".join(meta_lines)
+
+        columns = []
+        for _col in epw_data.columns:
+            _values = epw_data[_col]
+            if _col == "hour":
+                # EPW format uses hour = [1-24], set from [0-23] to [1-24]
+                _values = _values + 1
+
+            # missing values have code -1 and are formatted as empty str
+            codes, uniques = pd.factorize(_values)
+            if _values.dtype.kind == "f":
+                labels = [repr(float(v)) for v in uniques]
+            else:
+                labels = [str(v) for v in uniques]
+            columns.append(
+                np.array(labels + [""], dtype=object)[codes].tolist()
+            )
+
+        return (
+            "".join(meta_lines)
+            + "\n".join(map(",".join, zip(*columns)))
+            + "\n"
+        )
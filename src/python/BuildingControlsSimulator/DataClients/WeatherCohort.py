@@ -0,0 +1,21 @@
+import logging
+
+import attr
+
+logger = logging.getLogger(__name__)
+
+
+@attr.s(kw_only=True)
+class WeatherCohort:
+    """TMY fill data of a weather station shared by all thermostats whose
+    nearest station it is. The fill data is read once per cohort and must
+    not be modified by thermostats."""
+
+    fill_epw_path = attr.ib()
+    fill_epw_fname = attr.ib()
+    fill_epw_data = attr.ib()
+    epw_meta = attr.ib()
+    meta_lines = attr.ib()
+    identifiers = attr.ib(factory=list)
+    # unfilled TMY simulation EPW, see `WeatherChannel.make_tmy_epw_file`
+    tmy_epw_path = attr.ib(default=None)
@@ -0,0 +1,233 @@
+import os
+import io
+import csv
+import gzip
+import logging
+import hashlib
+import tarfile
+import zipfile
+
+import attr
+import pandas as pd
+
+from BuildingControlsSimulator.DataClients.StationIndex import StationIndex
+
+logger = logging.getLogger(__name__)
+
+
+@attr.s(kw_only=True)
+class WeatherMirror:
+    """Local mirror of weather station files that can be used without
+    network access.
+
+    EPW files and NSRDB archive TMY3 files (`<USAF>TYA.CSV`) are bulk
+    imported from directories, zip and tar archives. Each file is stored
+    gzip compressed under `mirror_dir` and its station coordinates are
+    added to a station list per file kind, which is indexed for nearest
+    station lookup with `StationIndex`.
+    """
+
+    mirror_dir = attr.ib()
+
+    EPW = "epw"
+    TMY3 = "tmy3"
+    KINDS = [EPW, TMY3]
+    index_columns = [
+        "fname",
+        "station_id",
+        "name",
+        "lat",
+        "lon",
+        "sha1",
+    ]
+
+    def get_data_dir(self, kind):
+        return os.path.join(self.mirror_dir, kind)
+
+    def get_index_path(self, kind):
+        return os.path.join(self.mirror_dir, f"{kind}_stations.csv")
+
+    def get_stored_path(self, kind, fname):
+        return os.path.join(self.get_data_dir(kind), fname + ".gz")
+
+    def read_index(self, kind):
+        index_path = self.get_index_path(kind)
+        if not os.path.isfile(index_path):
+            return pd.DataFrame(columns=self.index_columns)
+        return pd.read_csv(index_path, dtype={"station_id": str, "name": str})
+
+    def import_paths(self, paths):
+        """Import weather files from files, directories and archives.
+
+        :param paths: list of paths
+        :return: number of imported files
+        """
+        records = {kind: {} for kind in WeatherMirror.KINDS}
+        for path in paths:
+            for fname, content in WeatherMirror.iter_files(path):
+                kind, record = self.add_file(fname, content)
+                if record:
+                    records[kind][fname] = record
+
+        n_imported = 0
+        for kind, kind_records in records.items():
+            if not kind_records:
+                continue
+            index = self.read_index(kind)
+            index = index[~index["fname"].isin(kind_records.keys())]
+            index = pd.concat(
+                [index, pd.DataFrame(list(kind_records.values()))]
+            ).sort_values("fname")
+            # write to temporary file first so readers never see partial files
+            index_path = self.get_index_path(kind)
+            index[self.index_columns].to_csv(index_path + ".tmp", index=False)
+            os.replace(index_path + ".tmp", index_path)
+            n_imported += len(kind_records)
+
+        logger.info(
+            f"Imported {n_imported} weather files to {self.mirror_dir}"
+        )
+        return n_imported
+
+    def add_file(self, fname, content):
+        """Store single weather file.
+
+        :return: kind of file and its index record, record is None if the
+        file is not a weather file
+        """
+        if fname.lower().endswith(".epw"):
+            kind = WeatherMirror.EPW
+            record = WeatherMirror.parse_epw_station(content)
+        elif fname.upper().endswith("TYA.CSV"):
+            kind = WeatherMirror.TMY3
+            record = WeatherMirror.parse_tmy3_station(content)
+        else:
+            return None, None
+
+        if record is None:
+            logger.warning(f"Skipping weather file without location: {fname}")
+            return kind, None
+
+        record["fname"] = fname
+        record["sha1"] = hashlib.sha1(content).hexdigest()
+
+        stored_path = self.get_stored_path(kind, fname)
+        os.makedirs(os.path.dirname(stored_path), exist_ok=True)
+        # mtime=0 gives identical compressed files for identical content
+        with open(stored_path + ".tmp", "wb") as f:
+            with gzip.GzipFile(
+                filename="", mode="wb", fileobj=f, mtime=0
+            ) as gz:
+                gz.write(content)
+        os.replace(stored_path + ".tmp", stored_path)
+        return kind, record
+
+    @staticmethod
+    def iter_files(path):
+        """Yield file name and content of all files in path, including
+        files in zip and tar archives."""
+        if os.path.isdir(path):
+            for root, _, fnames in os.walk(path):
+                for fname in sorted(fnames):
+                    yield from WeatherMirror.iter_files(
+                        os.path.join(root, fname)
+                    )
+        elif tarfile.is_tarfile(path):
+            with tarfile.open(path) as tar:
+                for member in tar:
+                    if member.isfile():
+                        yield from WeatherMirror.iter_content(
+                            os.path.basename(member.name),
+                            tar.extractfile(member).read(),
+                        )
+        else:
+            with open(path, "rb") as f:
+                yield from WeatherMirror.iter_content(
+                    os.path.basename(path), f.read()
+                )
+
+    @staticmethod
+    def iter_content(fname, content):
+        """Yield file name and content, unpacking zip archives such as
+        the station downloads of energyplus.net."""
+        if fname.lower().endswith(".zip"):
+            with zipfile.ZipFile(io.BytesIO(content)) as zf:
+                for info in zf.infolist():
+                    if not info.is_dir():
+                        yield from WeatherMirror.iter_content(
+                            os.path.basename(info.filename),
+                            zf.read(info),
+                        )
+        else:
+            yield fname, content
+
+    @staticmethod
+    def parse_epw_station(content):
+        """Parse station of EPW LOCATION line, see `WeatherChannel`."""
+        location = content.split(b"\n", 1)[0].decode("utf-8", "replace")
+        location = location.rstrip("\r").split(",")
+        if len(location) < 8 or location[0] != "LOCATION":
+            return None
+        try:
+            return {
+                "station_id": location[5],
+                "name": location[1],
+                "lat": float(location[6]),
+                "lon": float(location[7]),
+            }
+        except ValueError:
+            return None
+
+    @staticmethod
+    def parse_tmy3_station(content):
+        """Parse station of TMY3 header line:
+        USAF,name,state,TZ,latitude,longitude,elevation
+        """
+        header = content.split(b"\n", 1)[0].decode("utf-8", "replace")
+        header = next(csv.reader([header.rstrip("\r")]))
+        if len(header) < 6:
+            return None
+        try:
+            return {
+                "station_id": header[0],
+                "name": header[1],
+                "lat": float(header[4]),
+                "lon": float(header[5]),
+            }
+        except ValueError:
+            return None
+
+    def get_station_index(self, kind):
+        index_path = self.get_index_path(kind)
+        if not os.path.isfile(index_path):
+            raise FileNotFoundError(
+                f"Weather mirror has no {kind} stations: {self.mirror_dir}"
+            )
+        return StationIndex.from_csv(
+            index_path,
+            usecols=["fname", "lat", "lon"],
+            degrees=True,
+        )
+
+    def get_nearest_fnames(self, lats, lons, kind):
+        """Get file names of nearest stations of many locations."""
+        return (
+            self.get_station_index(kind)
+            .get_nearest_stations(lats, lons)["fname"]
+            .to_list()
+        )
+
+    def extract(self, kind, fname, out_dir):
+        """Decompress stored file into out_dir if not already there.
+
+        :return: path of decompressed file
+        """
+        fpath = os.path.join(out_dir, fname)
+        if not os.path.exists(fpath):
+            os.makedirs(out_dir, exist_ok=True)
+            with gzip.open(self.get_stored_path(kind, fname), "rb") as gz:
+                content = gz.read()
+            with open(fpath + ".tmp", "wb") as f:
+                f.write(content)
+            os.replace(fpath + ".tmp", fpath)
+        return fpath
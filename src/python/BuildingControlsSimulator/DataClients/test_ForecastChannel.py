@@ -0,0 +1,109 @@
+import logging
+
+import pytest
+import pandas as pd
+import numpy as np
+
+from BuildingControlsSimulator.DataClients.ForecastChannel import (
+    ForecastChannel,
+)
+from BuildingControlsSimulator.DataClients.ForecastNoise import ForecastNoise
+from BuildingControlsSimulator.DataClients.DataChannel import DataChannel
+from BuildingControlsSimulator.DataClients.DataStates import STATES
+
+logger = logging.getLogger(__name__)
+
+
+class TestForecastChannel:
+    @classmethod
+    def setup_class(cls):
+        cls.n_steps = 288
+        cls.horizon_steps = 12
+        cls.weather = DataChannel(
+            data=pd.DataFrame.from_dict(
+                {
+                    STATES.OUTDOOR_TEMPERATURE: np.arange(
+                        cls.n_steps, dtype="float64"
+                    ),
+                    STATES.OUTDOOR_RELATIVE_HUMIDITY: np.full(
+                        cls.n_steps, 50.0
+                    ),
+                }
+            ),
+            spec=[],
+        )
+        cls.hvac = DataChannel(
+            data=pd.DataFrame.from_dict(
+                {
+                    STATES.TEMPERATURE_STP_HEAT: np.full(cls.n_steps, 20.0),
+                    STATES.TEMPERATURE_STP_COOL: np.full(cls.n_steps, 25.0),
+                }
+            ),
+            spec=[],
+        )
+
+    @classmethod
+    def teardown_class(cls):
+        """teardown any state that was previously setup with a call to
+        setup_class.
+        """
+        pass
+
+    def test_perfect_foresight(self):
+        forecast = ForecastChannel.from_channels(
+            channels=[self.hvac, self.weather],
+            horizon_steps=self.horizon_steps,
+        )
+        assert set(forecast.states) == set(
+            ForecastChannel.get_default_states()
+        )
+
+        t_idx = 100
+        step_forecast = forecast.get_step_forecast(t_idx)
+        np.testing.assert_array_equal(
+            step_forecast[STATES.OUTDOOR_TEMPERATURE],
+            np.arange(t_idx, t_idx + self.horizon_steps),
+        )
+        assert (step_forecast[STATES.TEMPERATURE_STP_HEAT] == 20.0).all()
+
+        # forecasts are read-only views that share one array per state
+        all_forecasts = forecast.get_all_forecasts(STATES.OUTDOOR_TEMPERATURE)
+        assert all_forecasts.shape == (self.n_steps, self.horizon_steps)
+        assert np.shares_memory(
+            step_forecast[STATES.OUTDOOR_TEMPERATURE], all_forecasts
+        )
+        assert not all_forecasts.flags.writeable
+
+        # steps after end of data are NaN
+        last_forecast = forecast.get_forecast(
+            STATES.OUTDOOR_TEMPERATURE, self.n_steps - 1
+        )
+        assert last_forecast[0] == self.n_steps - 1
+        assert np.isnan(last_forecast[1:]).all()
+
+    def test_noise(self):
+        forecast = ForecastChannel.from_channels(
+            channels=[self.weather],
+            horizon_steps=self.horizon_steps,
+            states=[STATES.OUTDOOR_TEMPERATURE],
+            noise_models={STATES.OUTDOOR_TEMPERATURE: ForecastNoise(std=1.0)},
+        )
+        t_idx = 10
+        noisy_forecast = forecast.get_forecast(
+            STATES.OUTDOOR_TEMPERATURE, t_idx
+        )
+        perfect_forecast = forecast.get_all_forecasts(
+            STATES.OUTDOOR_TEMPERATURE
+        )[t_idx]
+
+        # current step is exact and noise is the same for repeated requests
+        assert noisy_forecast[0] == perfect_forecast[0]
+        assert not np.array_equal(noisy_forecast, perfect_forecast)
+        np.testing.assert_array_equal(
+            noisy_forecast,
+            forecast.get_forecast(STATES.OUTDOOR_TEMPERATURE, t_idx),
+        )
+        # perfect foresight data is not modified
+        np.testing.assert_array_equal(
+            perfect_forecast, np.arange(t_idx, t_idx + self.horizon_steps)
+        )
@@ -0,0 +1,110 @@
+import os
+import logging
+
+import pytest
+import pandas as pd
+import numpy as np
+from sklearn.metrics.pairwise import haversine_distances
+
+from BuildingControlsSimulator.DataClients.StationIndex import StationIndex
+
+logger = logging.getLogger(__name__)
+
+
+class TestStationIndex:
+    @classmethod
+    def setup_class(cls):
+        rng = np.random.default_rng(0)
+        cls.stations = pd.DataFrame.from_dict(
+            {
+                "USAF": np.arange(500),
+                "Latitude": rng.uniform(25.0, 50.0, 500),
+                "Longitude": rng.uniform(-125.0, -65.0, 500),
+            }
+        )
+        cls.query_lat = rng.uniform(25.0, 50.0, 100)
+        cls.query_lon = rng.uniform(-125.0, -65.0, 100)
+
+        cls.index_dir = os.path.join(
+            os.environ.get("WEATHER_DIR"), "test_station_index"
+        )
+        os.makedirs(cls.index_dir, exist_ok=True)
+        cls.csv_path = os.path.join(cls.index_dir, "stations.csv")
+        cls.stations.to_csv(cls.csv_path, index=False)
+
+    @classmethod
+    def teardown_class(cls):
+        """ teardown any state that was previously setup with a call to
+        setup_class.
+        """
+        pass
+
+    def test_query(self):
+        station_index = StationIndex(
+            stations=pd.DataFrame.from_dict(
+                {
+                    "lat": np.radians(self.stations["Latitude"]),
+                    "lon": np.radians(self.stations["Longitude"]),
+                }
+            )
+        )
+        indexes, distances = station_index.query(
+            self.query_lat, self.query_lon
+        )
+
+        # same as brute force haversine distance to all stations
+        dis = haversine_distances(
+            station_index.stations[["lat", "lon"]].values,
+            np.radians(np.column_stack([self.query_lat, self.query_lon])),
+        )
+        np.testing.assert_array_equal(indexes, np.argmin(dis, axis=0))
+        np.testing.assert_allclose(distances, np.min(dis, axis=0))
+
+        # single query point
+        indexes, _ = station_index.query(
+            self.query_lat[0], self.query_lon[0]
+        )
+        assert indexes[0] == np.argmin(dis[:, 0])
+
+    def test_from_csv(self):
+        for f in os.listdir(self.index_dir):
+            if f.startswith("station_index_"):
+                os.remove(os.path.join(self.index_dir, f))
+        StationIndex._memory_cache.clear()
+
+        kwargs = {
+            "lat_column": "Latitude",
+            "lon_column": "Longitude",
+            "degrees": True,
+        }
+        station_index = StationIndex.from_csv(self.csv_path, **kwargs)
+        assert any(
+            f.startswith("station_index_") for f in os.listdir(self.index_dir)
+        )
+        assert StationIndex.from_csv(self.csv_path, **kwargs) is station_index
+
+        # load persisted index
+        StationIndex._memory_cache.clear()
+        loaded_index = StationIndex.from_csv(self.csv_path, **kwargs)
+        assert loaded_index is not station_index
+        pd.testing.assert_frame_equal(
+            station_index.get_nearest_stations(self.query_lat, self.query_lon),
+            loaded_index.get_nearest_stations(self.query_lat, self.query_lon),
+        )
+
+    def test_memory_cache_bounded(self):
+        StationIndex._memory_cache.clear()
+        for i in range(StationIndex.max_memory_cache + 2):
+            csv_path = os.path.join(self.index_dir, f"stations_{i}.csv")
+            self.stations.iloc[: 10 + i].to_csv(csv_path, index=False)
+            StationIndex.from_csv(
+                csv_path, lat_column="Latitude", lon_column="Longitude"
+            )
+        assert len(StationIndex._memory_cache) == (
+            StationIndex.max_memory_cache
+        )
+        # least recently used indexes are evicted first
+        assert not any(
+            k[0].endswith("stations_0.csv")
+            for k in StationIndex._memory_cache
+        )
@@ -5,7 +5,12 @@ import logging
 import pytest
 import os
 
+import pandas as pd
+import numpy as np
+
 from BuildingControlsSimulator.DataClients.WeatherChannel import WeatherChannel
+from BuildingControlsSimulator.DataClients.DataSpec import Internal
+from BuildingControlsSimulator.DataClients.DataStates import STATES
 
 
 logger = logging.getLogger(__name__)
@@ -27,6 +32,7 @@ class TestWeatherChannel:
             ep_tmy3_cache_dir=os.environ.get("EP_TMY3_CACHE_DIR"),
             simulation_epw_dir=os.environ.get("SIMULATION_EPW_DIR"),
         )
+        os.makedirs(cls.weather.ep_tmy3_cache_dir, exist_ok=True)
 
     @classmethod
     def teardown_class(cls):
@@ -56,6 +62,210 @@ class TestWeatherChannel:
         cols.remove(self.weather.datetime_column)
         assert cols == self.weather.epw_columns
 
+    def test_read_epw_cache(self):
+        """
+        test that parsed EPW files are cached and timestamps are in UTC
+        """
+        test_fpath = os.path.join(
+            self.weather.ep_tmy3_cache_dir, "test_read_epw_cache.epw"
+        )
+        _dt = pd.date_range("2019-01-01", periods=8760, freq="H")
+        epw_data = pd.DataFrame(
+            0, index=np.arange(8760), columns=self.weather.epw_columns
+        )
+        epw_data["year"] = _dt.year
+        epw_data["month"] = _dt.month
+        epw_data["day"] = _dt.day
+        epw_data["hour"] = _dt.hour + 1
+        epw_data["temp_air"] = np.arange(8760) / 10.0
+        epw_data["data_source_unct"] = "?9"
+        with open(test_fpath, "w") as f:
+            f.write("LOCATION,Test,AZ,USA,TMY3,722780,33.4,-112.0,-7.0,337\n")
+            f.write("DATA PERIODS,1,1,Data,Tuesday, 1/ 1,12/31\n")
+            epw_data.to_csv(f, header=False, index=False)
+
+        epw_hash = WeatherChannel.get_file_hash(test_fpath)
+        cache_path = self.weather.get_parsed_epw_cache_path(epw_hash)
+        if os.path.exists(cache_path):
+            os.remove(cache_path)
+        WeatherChannel._parsed_epw_memory_cache.clear()
+
+        data, meta, meta_epw_lines = self.weather.read_epw(test_fpath)
+        assert os.path.exists(cache_path)
+        assert meta["TZ"] == 0
+        # local standard time at UTC-7 is shifted to UTC
+        first_local = data[data["temp_air"] == 0.0]
+        assert first_local[self.weather.datetime_column].iloc[0] == (
+            pd.Timestamp("2019-01-01 07:00", tz="UTC")
+        )
+        assert first_local["hour"].iloc[0] == 7
+
+        # read from disk cache
+        WeatherChannel._parsed_epw_memory_cache.clear()
+        (
+            cached_data,
+            cached_meta,
+            cached_meta_epw_lines,
+        ) = self.weather.read_epw(test_fpath)
+        pd.testing.assert_frame_equal(data, cached_data)
+        assert meta == cached_meta
+        assert meta_epw_lines == cached_meta_epw_lines
+
+        # returned data is a copy of cached data
+        cached_data["hour"] = cached_data["hour"] + 1
+        memory_data, _, _ = self.weather.read_epw(test_fpath)
+        pd.testing.assert_frame_equal(data, memory_data)
+
+    def test_to_content_addressed_epw(self):
+        """
+        test that EPW files with same content share the same file
+        """
+        os.makedirs(self.weather.simulation_epw_dir, exist_ok=True)
+        epw_data = pd.DataFrame(
+            0.0, index=np.arange(48), columns=self.weather.epw_columns
+        )
+        epw_data["hour"] = np.arange(48) % 24
+        epw_data["temp_air"] = np.linspace(-10.0, 10.0, 48)
+        epw_data["data_source_unct"] = "?9"
+        epw_data.loc[3, "temp_dew"] = np.nan
+        epw_data = epw_data.astype({"hour": "Int8"})
+        meta_lines = ["LOCATION,Test\n", "DATA PERIODS,1,1\n"]
+
+        # formatting is the same as pandas csv with EPW hours [1-24]
+        expected_data = epw_data.copy()
+        expected_data["hour"] = expected_data["hour"] + 1
+        assert WeatherChannel.format_epw(
+            epw_data, meta_lines
+        ) == "".join(meta_lines) + expected_data.to_csv(
+            header=False, index=False
+        )
+
+        fpath = self.weather.to_content_addressed_epw(
+            epw_data=epw_data,
+            meta_lines=meta_lines,
+            prefix="TEST",
+            fname="test.epw",
+        )
+        same_fpath = self.weather.to_content_addressed_epw(
+            epw_data=epw_data.copy(),
+            meta_lines=meta_lines,
+            prefix="TEST",
+            fname="test.epw",
+        )
+        epw_data.loc[0, "temp_air"] = 20.0
+        other_fpath = self.weather.to_content_addressed_epw(
+            epw_data=epw_data,
+            meta_lines=meta_lines,
+            prefix="TEST",
+            fname="test.epw",
+        )
+        assert os.path.isfile(fpath)
+        assert fpath == same_fpath
+        assert fpath != other_fpath
+
+    def test_fill_epw(self):
+        """
+        test that observed hourly means overwrite fill data
+        """
+        weather = WeatherChannel(
+            data=[],
+            spec=Internal.weather,
+            ep_tmy3_cache_dir=self.weather.ep_tmy3_cache_dir,
+            simulation_epw_dir=self.weather.simulation_epw_dir,
+        )
+        _dt = pd.date_range("2019-01-01", periods=8760, freq="H", tz="utc")
+        fill_data = pd.DataFrame(
+            0.0, index=np.arange(8760), columns=self.weather.epw_columns
+        )
+        fill_data["year"] = 2019
+        fill_data["month"] = _dt.month
+        fill_data["day"] = _dt.day
+        fill_data["hour"] = _dt.hour
+        fill_data["minute"] = 0
+        fill_data["temp_air"] = 10.0
+        fill_data["relative_humidity"] = 50.0
+        fill_data_copy = fill_data.copy(deep=True)
+
+        # 2020 is a leap year, Feb 29 is not part of the EPW year
+        epw_data = pd.DataFrame.from_dict(
+            {
+                STATES.DATE_TIME: pd.to_datetime(
+                    [
+                        "2020-01-01 00:00",
+                        "2020-01-01 00:30",
+                        "2020-01-01 01:00",
+                        "2020-02-29 12:00",
+                        "2020-03-01 12:00",
+                    ],
+                    utc=True,
+                ),
+                STATES.OUTDOOR_TEMPERATURE: [20.0, 30.0, np.nan, 40.0, 5.0],
+                STATES.OUTDOOR_RELATIVE_HUMIDITY: [40.0] * 5,
+            }
+        )
+        filled = weather.fill_epw(epw_data, fill_data)
+
+        pd.testing.assert_frame_equal(fill_data, fill_data_copy)
+        assert filled.columns.to_list() == self.weather.epw_columns
+        assert len(filled) == 8760
+        assert str(filled["year"].dtype) == "Int16"
+        assert str(filled["hour"].dtype) == "Int8"
+        mar_1 = (59 * 24) + 12
+        assert filled["temp_air"].iloc[0] == 25.0
+        assert filled["temp_air"].iloc[1] == 10.0
+        assert filled["temp_air"].iloc[mar_1] == 5.0
+        assert (filled["temp_air"] == 10.0).sum() == 8760 - 2
+        assert filled["relative_humidity"].iloc[1] == 40.0
+        assert filled["relative_humidity"].iloc[2] == 50.0
+        assert filled["temp_dew"].iloc[0] < filled["temp_air"].iloc[0]
+
+        # each record gets the filled data of its hour of year, missing
+        # observations are filled from TMY data and Feb 29 uses Feb 28
+        weather.data = epw_data
+        filled_data = weather.get_filled_data(filled)
+        np.testing.assert_array_equal(
+            filled_data[STATES.OUTDOOR_TEMPERATURE],
+            [25.0, 25.0, 10.0, 10.0, 5.0],
+        )
+        np.testing.assert_array_equal(
+            filled_data[STATES.OUTDOOR_RELATIVE_HUMIDITY],
+            [40.0, 40.0, 40.0, 50.0, 40.0],
+        )
+
+    def test_tmy_station_index_cache(self):
+        """
+        test that the station list and its index are persisted in
+        ep_tmy3_cache_dir if archive_tmy3_dir is not set
+        """
+        cache_dir = os.path.join(
+            self.weather.ep_tmy3_cache_dir, "test_tmy_station_index_cache"
+        )
+        os.makedirs(cache_dir, exist_ok=True)
+        for fname in os.listdir(cache_dir):
+            os.remove(os.path.join(cache_dir, fname))
+        pd.DataFrame.from_dict(
+            {
+                "properties.epw": ["<a href=https://example.com/TEST.epw>"],
+                "lat": [np.radians(33.45)],
+                "lon": [np.radians(-111.98)],
+            }
+        ).to_csv(
+            os.path.join(cache_dir, WeatherChannel.tmy_station_cache_name),
+            index=False,
+        )
+        weather = WeatherChannel(
+            data=[],
+            spec=[],
+            ep_tmy3_cache_dir=cache_dir,
+            simulation_epw_dir=self.weather.simulation_epw_dir,
+        )
+        station_index = weather.get_tmy_station_index()
+        assert len(station_index.stations) == 1
+        assert any(
+            fname.startswith("station_index_")
+            for fname in os.listdir(cache_dir)
+        )
+
     @pytest.mark.skip()
     def test_get_archive_tmy3(self):
         lat = 33.481136
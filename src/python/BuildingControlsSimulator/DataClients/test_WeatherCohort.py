@@ -0,0 +1,145 @@
+import os
+import logging
+
+import pytest
+import pandas as pd
+import numpy as np
+
+from BuildingControlsSimulator.DataClients.DataClient import DataClient
+from BuildingControlsSimulator.DataClients.GCSDYDSource import GCSDYDSource
+from BuildingControlsSimulator.DataClients.DataSpec import EnergyPlusWeather
+from BuildingControlsSimulator.DataClients.WeatherChannel import (
+    WeatherChannel,
+)
+from BuildingControlsSimulator.DataClients.DataStates import STATES
+
+logger = logging.getLogger(__name__)
+
+
+class TestWeatherCohort:
+    @classmethod
+    def setup_class(cls):
+        cls.test_dir = os.path.join(
+            os.environ.get("WEATHER_DIR"), "test_weather_cohort"
+        )
+        cls.archive_tmy3_dir = os.path.join(cls.test_dir, "archive_tmy3")
+        cls.ep_tmy3_cache_dir = os.path.join(cls.test_dir, "ep_tmy3_cache")
+        os.makedirs(cls.archive_tmy3_dir, exist_ok=True)
+        os.makedirs(cls.ep_tmy3_cache_dir, exist_ok=True)
+
+        # two stations: Phoenix and Chicago
+        cls.stations = {
+            "TEST_PHOENIX.epw": (33.45, -111.98, 20.0),
+            "TEST_CHICAGO.epw": (41.98, -87.92, 0.0),
+        }
+        for fname, (lat, lon, temp_air) in cls.stations.items():
+            TestWeatherCohort.write_epw(
+                os.path.join(cls.ep_tmy3_cache_dir, fname), temp_air
+            )
+        pd.DataFrame.from_dict(
+            {
+                "properties.epw": [
+                    f"<a href=https://example.com/{fname}>"
+                    for fname in cls.stations.keys()
+                ],
+                "lat": [np.radians(v[0]) for v in cls.stations.values()],
+                "lon": [np.radians(v[1]) for v in cls.stations.values()],
+            }
+        ).to_csv(
+            os.path.join(
+                cls.archive_tmy3_dir, WeatherChannel.tmy_station_cache_name
+            ),
+            index=False,
+        )
+
+    @classmethod
+    def teardown_class(cls):
+        """ teardown any state that was previously setup with a call to
+        setup_class.
+        """
+        pass
+
+    @staticmethod
+    def write_epw(fpath, temp_air):
+        _dt = pd.date_range("2019-01-01", periods=8760, freq="H")
+        epw_data = pd.DataFrame(
+            0, index=np.arange(8760), columns=EnergyPlusWeather.epw_columns
+        )
+        epw_data["year"] = _dt.year
+        epw_data["month"] = _dt.month
+        epw_data["day"] = _dt.day
+        epw_data["hour"] = _dt.hour + 1
+        epw_data["temp_air"] = temp_air
+        epw_data["relative_humidity"] = 50
+        epw_data["data_source_unct"] = "?9"
+        with open(fpath, "w") as f:
+            f.write("LOCATION,Test,XX,USA,TMY3,0,0.0,0.0,0.0,0\n")
+            f.write("DATA PERIODS,1,1,Data,Tuesday, 1/ 1,12/31\n")
+            epw_data.to_csv(f, header=False, index=False)
+
+    def get_data_client(self, identifier, lat, lon):
+        dc = DataClient(
+            source=GCSDYDSource(),
+            archive_tmy3_dir=self.archive_tmy3_dir,
+            ep_tmy3_cache_dir=self.ep_tmy3_cache_dir,
+            simulation_epw_dir=os.environ.get("SIMULATION_EPW_DIR"),
+            archive_tmy3_data_dir=os.environ.get("ARCHIVE_TMY3_DATA_DIR"),
+            weather_dir=os.environ.get("WEATHER_DIR"),
+        )
+        dc.sim_config = {
+            "identifier": identifier,
+            "latitude": lat,
+            "longitude": lon,
+        }
+        return dc
+
+    def test_resolve_weather_cohorts(self):
+        data_clients = [
+            self.get_data_client("phoenix_1", 33.48, -112.07),
+            self.get_data_client("chicago_1", 41.88, -87.63),
+            self.get_data_client("phoenix_2", 33.30, -111.84),
+        ]
+        weather_cohorts = DataClient.resolve_weather_cohorts(data_clients)
+
+        assert len(weather_cohorts) == 2
+        assert data_clients[0].weather_cohort is data_clients[2].weather_cohort
+        assert data_clients[0].weather_cohort.fill_epw_fname == (
+            "TEST_PHOENIX.epw"
+        )
+        assert data_clients[0].weather_cohort.identifiers == [
+            "phoenix_1",
+            "phoenix_2",
+        ]
+        assert data_clients[1].weather_cohort.fill_epw_fname == (
+            "TEST_CHICAGO.epw"
+        )
+
+        # cohort fill data gives same EPW as resolving per thermostat
+        dc = data_clients[0]
+        weather_data = pd.DataFrame.from_dict(
+            {
+                STATES.DATE_TIME: pd.date_range(
+                    "2019-06-01", periods=288, freq="5T", tz="utc"
+                ),
+                STATES.OUTDOOR_TEMPERATURE: np.linspace(25.0, 35.0, 288),
+                STATES.OUTDOOR_RELATIVE_HUMIDITY: np.full(288, 20.0),
+            }
+        )
+        cohort_weather = dc.get_weather_channel(data=weather_data)
+        cohort_weather.make_epw_file(
+            sim_config=dc.sim_config, weather_cohort=dc.weather_cohort
+        )
+        weather = dc.get_weather_channel(data=weather_data)
+        weather.make_epw_file(sim_config=dc.sim_config)
+        assert cohort_weather.epw_path == weather.epw_path
+
+        # unfilled TMY weather is written once per cohort
+        tmy_epw_path = cohort_weather.make_tmy_epw_file(
+            weather_cohort=dc.weather_cohort
+        )
+        assert dc.weather_cohort.tmy_epw_path == tmy_epw_path
+        assert weather.make_tmy_epw_file() == tmy_epw_path
+        assert tmy_epw_path != weather.epw_path
+
+        # shared fill data is not modified
+        assert (dc.weather_cohort.fill_epw_data["temp_air"] == 20.0).all()
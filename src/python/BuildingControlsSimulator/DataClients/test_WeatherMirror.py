@@ -0,0 +1,139 @@
+import os
+import io
+import shutil
+import logging
+import tarfile
+import zipfile
+
+import pytest
+import pandas as pd
+import numpy as np
+
+from BuildingControlsSimulator.DataClients.WeatherMirror import WeatherMirror
+from BuildingControlsSimulator.DataClients.WeatherChannel import WeatherChannel
+from BuildingControlsSimulator.DataClients.DataSpec import EnergyPlusWeather
+
+logger = logging.getLogger(__name__)
+
+
+class TestWeatherMirror:
+    @classmethod
+    def setup_class(cls):
+        cls.test_dir = os.path.join(
+            os.environ.get("WEATHER_DIR"), "test_weather_mirror"
+        )
+        if os.path.isdir(cls.test_dir):
+            shutil.rmtree(cls.test_dir)
+        cls.import_dir = os.path.join(cls.test_dir, "import")
+        cls.mirror_dir = os.path.join(cls.test_dir, "mirror")
+        cls.ep_tmy3_cache_dir = os.path.join(cls.test_dir, "ep_tmy3_cache")
+        os.makedirs(cls.import_dir)
+
+        # plain EPW file in directory
+        with open(os.path.join(cls.import_dir, "TEST_PHOENIX.epw"), "wb") as f:
+            f.write(TestWeatherMirror.make_epw("Phoenix", 33.45, -111.98))
+
+        # EPW file in zip archive as downloaded from energyplus.net
+        with zipfile.ZipFile(
+            os.path.join(cls.import_dir, "TEST_CHICAGO.zip"), "w"
+        ) as zf:
+            zf.writestr(
+                "TEST_CHICAGO/TEST_CHICAGO.epw",
+                TestWeatherMirror.make_epw("Chicago", 41.98, -87.92),
+            )
+            zf.writestr("TEST_CHICAGO/TEST_CHICAGO.stat", "not weather")
+
+        # tarball of NSRDB archive TMY3 files
+        cls.tarball_path = os.path.join(cls.test_dir, "tmy3.tar.gz")
+        with tarfile.open(cls.tarball_path, "w:gz") as tar:
+            for usaf, lat, lon in [
+                ("722780", 33.45, -111.98),
+                ("725300", 41.98, -87.92),
+            ]:
+                content = TestWeatherMirror.make_tmy3(usaf, lat, lon)
+                info = tarfile.TarInfo(f"tmy3_data/{usaf}TYA.CSV")
+                info.size = len(content)
+                tar.addfile(info, io.BytesIO(content))
+
+    @classmethod
+    def teardown_class(cls):
+        """teardown any state that was previously setup with a call to
+        setup_class.
+        """
+        pass
+
+    @staticmethod
+    def make_epw(name, lat, lon):
+        _dt = pd.date_range("2019-01-01", periods=8760, freq="H")
+        epw_data = pd.DataFrame(
+            0, index=np.arange(8760), columns=EnergyPlusWeather.epw_columns
+        )
+        epw_data["year"] = _dt.year
+        epw_data["month"] = _dt.month
+        epw_data["day"] = _dt.day
+        epw_data["hour"] = _dt.hour + 1
+        epw_data["temp_air"] = lat
+        epw_data["relative_humidity"] = 50
+        epw_data["data_source_unct"] = "?9"
+        return (
+            f"LOCATION,{name},XX,USA,TMY3,0,{lat},{lon},0.0,0\n"
+            + "DATA PERIODS,1,1,Data,Tuesday, 1/ 1,12/31\n"
+            + epw_data.to_csv(header=False, index=False)
+        ).encode("utf-8")
+
+    @staticmethod
+    def make_tmy3(usaf, lat, lon):
+        return (
+            f'{usaf},"TEST {usaf}",XX,0.0,{lat},{lon},0\n'
+            + "Date (MM/DD/YYYY),Time (HH:MM),Dry-bulb (C)\n"
+            + "01/01/1988,01:00,10.0\n"
+        ).encode("utf-8")
+
+    def test_import_and_resolve(self):
+        weather_mirror = WeatherMirror(mirror_dir=self.mirror_dir)
+        n_imported = weather_mirror.import_paths(
+            [self.import_dir, self.tarball_path]
+        )
+        assert n_imported == 4
+
+        epw_index = weather_mirror.read_index(WeatherMirror.EPW)
+        assert epw_index["fname"].to_list() == [
+            "TEST_CHICAGO.epw",
+            "TEST_PHOENIX.epw",
+        ]
+        assert epw_index["name"].to_list() == ["Chicago", "Phoenix"]
+        assert os.path.isfile(
+            weather_mirror.get_stored_path(
+                WeatherMirror.EPW, "TEST_CHICAGO.epw"
+            )
+        )
+
+        # importing same files again replaces index records
+        weather_mirror.import_paths([self.import_dir])
+        assert len(weather_mirror.read_index(WeatherMirror.EPW)) == 2
+
+        # stations are resolved from mirror without network access
+        weather = WeatherChannel(
+            data=[],
+            spec=[],
+            ep_tmy3_cache_dir=self.ep_tmy3_cache_dir,
+            simulation_epw_dir=os.environ.get("SIMULATION_EPW_DIR"),
+            weather_mirror_dir=self.mirror_dir,
+        )
+        fpaths, fnames = weather.get_tmy_epws(
+            [33.48, 41.88, 33.30], [-112.07, -87.63, -111.84]
+        )
+        assert fnames == [
+            "TEST_PHOENIX.epw",
+            "TEST_CHICAGO.epw",
+            "TEST_PHOENIX.epw",
+        ]
+        assert fpaths[0] == os.path.join(
+            self.ep_tmy3_cache_dir, "TEST_PHOENIX.epw"
+        )
+        data, meta, _ = weather.read_epw(fpaths[1])
+        assert meta["city"] == "Chicago"
+        assert (data["temp_air"] == 41.98).all()
+
+        tmy3_data = weather.get_archive_tmy3(41.88, -87.63)
+        assert tmy3_data["Dry-bulb (C)"].iloc[0] == 10.0
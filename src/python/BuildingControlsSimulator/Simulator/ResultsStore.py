@@ -0,0 +1,348 @@
+import os
+import logging
+import json
+import hashlib
+from urllib.parse import quote
+
+import attr
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pyarrow.dataset as ds
+
+from BuildingControlsSimulator.DataClients.DataStates import STATES
+
+logger = logging.getLogger(__name__)
+
+
+@attr.s(kw_only=True)
+class ResultsStore:
+    """Columnar store of simulation results.
+
+    Each simulation is written as a parquet file into a hive partitioned
+    dataset with the layout:
+
+        <output_data_dir>/<dataset>/identifier=<>/building_model=<>/controller_model=<>/<run_id>.parquet
+
+    where <dataset> is `output` for simulation output and `input` for the
+    input data used in the simulation. A manifest with one json record per
+    simulation stores the config, timing, and status of each run so that
+    sweeps of thousands of simulations can be filtered without reading
+    any of the result files.
+    """
+
+    output_data_dir = attr.ib()
+    manifest_name = attr.ib(default="manifest.jsonl")
+    compression = attr.ib(default="snappy")
+
+    partition_cols = ["identifier", "building_model", "controller_model"]
+    datasets = ["output", "input"]
+    # parquet schema metadata key of categories of categorical columns
+    categories_metadata_key = b"categories"
+
+    def __attrs_post_init__(self):
+        os.makedirs(self.output_data_dir, exist_ok=True)
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.output_data_dir, self.manifest_name)
+
+    def get_dataset_dir(self, dataset):
+        if dataset not in self.datasets:
+            raise ValueError(
+                f"Unknown dataset={dataset}, must be one of {self.datasets}"
+            )
+        return os.path.join(self.output_data_dir, dataset)
+
+    def get_partition_dir(
+        self, dataset, identifier, building_model, controller_model
+    ):
+        # partition values are uri encoded so that any model name is valid
+        return os.path.join(
+            self.get_dataset_dir(dataset),
+            *[
+                f"{k}={quote(str(v), safe='')}"
+                for k, v in zip(
+                    self.partition_cols,
+                    [identifier, building_model, controller_model],
+                )
+            ],
+        )
+
+    @staticmethod
+    def make_run_id(identifier, building_model, controller_model, config):
+        """Deterministic run id so that re-running a simulation overwrites its
+        previous result instead of duplicating it."""
+        _key = json.dumps(
+            {
+                "identifier": identifier,
+                "building_model": building_model,
+                "controller_model": controller_model,
+                "config": config,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha1(_key.encode("utf-8")).hexdigest()
+
+    def write_simulation(
+        self, sim, status="success", error=None, cached=False
+    ):
+        """Write a `Simulation` and its manifest record to the store."""
+        config = {k: str(v) for k, v in sim.config.to_dict().items()}
+        building_params = sim.building_model.get_params(
+            epw_path=sim.data_client.weather.epw_path
+        )
+        controller_params = sim.controller_model.get_params()
+        # failed simulations only have a manifest record
+        if status == "success":
+            output, input_data = sim.output, sim.full_output
+        else:
+            output, input_data = None, None
+
+        return self.write(
+            identifier=sim.config["identifier"],
+            building_model=sim.building_model_name,
+            controller_model=sim.controller_model_name,
+            output=output,
+            input_data=input_data,
+            record={
+                "config": config,
+                "building_params": building_params,
+                "controller_params": controller_params,
+                "start_utc": sim.start_utc,
+                "end_utc": sim.end_utc,
+                "wall_time": sim.wall_time,
+                "process_time": sim.process_time,
+                "status": status,
+                "error": error,
+                "cached": cached,
+                "profile": sim.profile_summary,
+            },
+        )
+
+    def write(
+        self,
+        identifier,
+        building_model,
+        controller_model,
+        output=None,
+        input_data=None,
+        record=None,
+    ):
+        """Write output and input dataframes and append manifest record.
+
+        :return: run_id of stored simulation
+        """
+        if record is None:
+            record = {}
+        run_params = {
+            "config": record.get("config", {}),
+            "controller_params": record.get("controller_params", {}),
+        }
+        # runs without building params keep their run_id
+        if record.get("building_params"):
+            run_params["building_params"] = record["building_params"]
+        run_id = self.make_run_id(
+            identifier, building_model, controller_model, run_params
+        )
+
+        n_rows = 0
+        for dataset, _df in zip(self.datasets, [output, input_data]):
+            if _df is None:
+                continue
+
+            _dir = self.get_partition_dir(
+                dataset, identifier, building_model, controller_model
+            )
+            os.makedirs(_dir, exist_ok=True)
+            _table = ResultsStore.to_storage_table(_df)
+            # write to temporary file first so readers never see partial files
+            _fpath = os.path.join(_dir, f"{run_id}.parquet")
+            pq.write_table(
+                _table, _fpath + ".tmp", compression=self.compression
+            )
+            os.replace(_fpath + ".tmp", _fpath)
+
+            if dataset == "output":
+                n_rows = len(_df)
+
+        _record = {
+            "run_id": run_id,
+            "identifier": identifier,
+            "building_model": building_model,
+            "controller_model": controller_model,
+            "n_rows": n_rows,
+            "written_utc": pd.Timestamp.utcnow(),
+            **record,
+        }
+        # a single write of a single line is atomic enough for appending
+        # records from multiple processes
+        with open(self.manifest_path, "a") as f:
+            f.write(json.dumps(_record, default=str) + "\n")
+
+        return run_id
+
+    def load_manifest(self, latest=True, **filters):
+        """Load manifest as dataframe filtered by equality on any record key.
+
+        :param latest: only keep the latest record of each run_id
+        """
+        if not os.path.isfile(self.manifest_path):
+            return pd.DataFrame([])
+
+        manifest = pd.read_json(self.manifest_path, lines=True, dtype=False)
+        if latest and not manifest.empty:
+            manifest = manifest.drop_duplicates(subset=["run_id"], keep="last")
+
+        for k, v in filters.items():
+            if v is None:
+                continue
+            if isinstance(v, (list, tuple, set)):
+                manifest = manifest[manifest[k].isin(v)]
+            else:
+                manifest = manifest[manifest[k] == v]
+
+        return manifest.reset_index(drop=True)
+
+    def load(
+        self,
+        dataset="output",
+        identifier=None,
+        building_model=None,
+        controller_model=None,
+        run_id=None,
+        columns=None,
+    ):
+        """Load results filtered by partition values. Only the partitions
+        matching the filter are read, values can be single values or lists.
+
+        :param columns: list of STATES or column names to read
+        """
+        _dir = self.get_dataset_dir(dataset)
+        if not os.path.isdir(_dir):
+            return pd.DataFrame([])
+
+        dataset = ds.dataset(_dir, format="parquet", partitioning="hive")
+
+        _filter = None
+        for k, v in zip(
+            self.partition_cols, [identifier, building_model, controller_model]
+        ):
+            if v is None:
+                continue
+            _expr = ResultsStore.make_filter_expression(k, v)
+            _filter = _expr if _filter is None else _filter & _expr
+
+        if run_id is not None:
+            # run_id is only stored in the file names
+            _paths = [
+                p
+                for p in dataset.files
+                if os.path.basename(p).replace(".parquet", "")
+                in np.atleast_1d(run_id)
+            ]
+            dataset = ds.dataset(
+                _paths,
+                format="parquet",
+                partitioning=ds.partitioning(flavor="hive"),
+                partition_base_dir=_dir,
+            )
+
+        if columns is not None:
+            columns = [
+                ResultsStore.to_storage_column_name(c) for c in columns
+            ] + [c for c in self.partition_cols if c not in columns]
+
+        _df = dataset.to_table(columns=columns, filter=_filter).to_pandas()
+        # only the footers of the files matching the filter are read
+        categories = ResultsStore.get_storage_categories(
+            [f.physical_schema for f in dataset.get_fragments(filter=_filter)]
+        )
+        return ResultsStore.from_storage_columns(_df, categories=categories)
+
+    @staticmethod
+    def make_filter_expression(key, value):
+        if isinstance(value, (list, tuple, set)):
+            return ds.field(key).isin([str(v) for v in value])
+        return ds.field(key) == str(value)
+
+    @staticmethod
+    def to_storage_column_name(column):
+        # STATES are stored by name because parquet requires str column names
+        # pandas may cast STATES column labels to plain int
+        if isinstance(column, (int, np.integer)) and not isinstance(
+            column, bool
+        ):
+            return STATES(column).name
+        return str(column)
+
+    @staticmethod
+    def to_storage_columns(_df):
+        _df = _df.rename(columns=ResultsStore.to_storage_column_name)
+        # categorical columns are stored as str so that datasets with
+        # different categories can be read together
+        for _col in _df.columns:
+            if isinstance(_df[_col].dtype, pd.CategoricalDtype):
+                _df[_col] = _df[_col].astype("string")
+        return _df
+
+    @staticmethod
+    def to_storage_table(_df):
+        """Arrow table of dataframe with the categories of its categorical
+        columns stored in the schema metadata."""
+        categories = {
+            ResultsStore.to_storage_column_name(_col): [
+                str(c) for c in _df[_col].dtype.categories
+            ]
+            for _col in _df.columns
+            if isinstance(_df[_col].dtype, pd.CategoricalDtype)
+        }
+        _table = pa.Table.from_pandas(
+            ResultsStore.to_storage_columns(_df), preserve_index=False
+        )
+        return _table.replace_schema_metadata(
+            {
+                **(_table.schema.metadata or {}),
+                ResultsStore.categories_metadata_key: json.dumps(
+                    categories
+                ).encode("utf-8"),
+            }
+        )
+
+    @staticmethod
+    def get_storage_categories(schemas):
+        """Union of categories of categorical columns of stored tables."""
+        categories = {}
+        for schema in schemas:
+            _meta = (schema.metadata or {}).get(
+                ResultsStore.categories_metadata_key
+            )
+            if _meta is None:
+                continue
+            for _col, _categories in json.loads(_meta).items():
+                categories.setdefault(_col, [])
+                categories[_col] += [
+                    c for c in _categories if c not in categories[_col]
+                ]
+        return categories
+
+    @staticmethod
+    def from_storage_columns(_df, categories=None):
+        """Restore column names and categorical dtypes of stored columns.
+
+        :param categories: dict of column name and categories, see
+        `get_storage_categories`
+        """
+        if categories:
+            for _col, _categories in categories.items():
+                if _col in _df.columns:
+                    _df[_col] = _df[_col].astype(
+                        pd.CategoricalDtype(categories=_categories)
+                    )
+        return _df.rename(
+            columns={
+                c: STATES[c] for c in _df.columns if c in STATES.__members__
+            }
+        )
@@ -1,8 +1,12 @@
 # created by Tom Stesco tom.s@ecobee.com
 
 import os
+import copy
 import logging
 import time
+import pickle
+import hashlib
+import json
 
 import pandas as pd
 import numpy as np
@@ -19,6 +23,10 @@ from BuildingControlsSimulator.ControlModels.Deadband import Deadband
 from BuildingControlsSimulator.OutputAnalysis.OutputAnalysis import (
     OutputAnalysis,
 )
+from BuildingControlsSimulator.Simulator.WarmupSnapshotCache import (
+    WarmupSnapshotCache,
+)
+from BuildingControlsSimulator.Simulator.StepProfiler import StepProfiler
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +50,16 @@ class Simulation:
     end_utc = attr.ib(default=None)
     output = attr.ib(default=None)
     full_output = attr.ib(default=None)
+    wall_time = attr.ib(default=None)
+    process_time = attr.ib(default=None)
+    # checkpointing is disabled unless both a directory and interval are set
+    checkpoint_dir = attr.ib(default=None)
+    checkpoint_interval_steps = attr.ib(default=None)
+    # set on initialize, see `get_checkpoint_path`
+    checkpoint_path = attr.ib(default=None)
+    # shared between simulations to skip warmup of same building and weather
+    warmup_snapshot_cache = attr.ib(default=None)
+    profile_summary = attr.ib(default=None)
 
     def __attrs_post_init__(self):
         """validate input/output specs
@@ -86,6 +104,18 @@ class Simulation:
                 f"Missing building model output keys: {missing_building_output_keys}\n",
             )
 
+        # checkpoints need the FMU state, fail before any model is created
+        fmu_backend = getattr(self.building_model, "fmu_backend", None)
+        if (
+            self.checkpoint_dir
+            and self.checkpoint_interval_steps
+            and not getattr(fmu_backend, "supports_fmu_state", False)
+        ):
+            raise ValueError(
+                f"{type(fmu_backend).__name__} FMUs cannot serialize state, "
+                + "checkpointing is not supported."
+            )
+
     @property
     def steps_per_hour(self):
         return int(60 / self.config.step_size_minutes)
@@ -116,14 +146,35 @@ class Simulation:
             + self.building_model.output_keys
         )
 
+    @property
+    def building_model_name(self):
+        # building models are identified by their preprocessed IDF if they
+        # have one, so that variants and builds of the same IDF with
+        # different options are distinct
+        if hasattr(self.building_model, "idf"):
+            return os.path.splitext(self.building_model.idf.idf_prep_name)[0]
+        return type(self.building_model).__name__
+
+    @property
+    def controller_model_name(self):
+        return type(self.controller_model).__name__
+
     @property
     def building_model_output_keys(self):
         return self.building_model.fmu.get_model_variables().keys()
 
     def create_models(self, preprocess_check=False):
+        epw_path = self.data_client.weather.epw_path
+        if (
+            hasattr(self.building_model, "idf")
+            and self.building_model.idf.weather_input
+        ):
+            # weather is set every step, the FMU only needs station weather
+            epw_path = self.data_client.weather.make_tmy_epw_file(
+                weather_cohort=self.data_client.weather_cohort
+            )
         return self.building_model.create_model_fmu(
-            epw_path=self.data_client.weather.epw_path,
-            preprocess_check=preprocess_check,
+            epw_path=epw_path, preprocess_check=preprocess_check,
         )
 
     def initialize(self):
@@ -145,6 +196,11 @@ class Simulation:
             categories_dict=self.data_client.hvac.get_categories_dict(),
         )
 
+        if self.data_client.forecast is not None:
+            self.controller_model.set_forecast(self.data_client.forecast)
+
+        self.checkpoint_path = self.get_checkpoint_path()
+
         self.allocate_memory()
 
     def allocate_memory(self):
@@ -156,11 +212,167 @@ class Simulation:
         self.building_model.tear_down()
         self.controller_model.tear_down()
 
-    def run(self, local=True):
-        """Main co-simulation loop"""
+    @property
+    def analysis_start_t_idx(self):
+        """Index of first step of analysis period. Steps before this are
+        warmup and are not considered in output."""
+        if not self.data_client.full_data_periods:
+            return 0
+        return int(
+            (
+                self.data_client.hvac.data[STATES.DATE_TIME]
+                < self.data_client.full_data_periods[0][0]
+            ).sum()
+        )
+
+    def restore_warmup_snapshot(self, t_idx):
+        """Restore building model state at step t_idx from the warmup
+        snapshot cache.
+
+        :return: True if snapshot was restored
+        """
+        _key = self.warmup_snapshot_cache.get_key(self, t_idx)
+        _snapshot = self.warmup_snapshot_cache.get(
+            self.config["identifier"], _key
+        )
+        if _snapshot is None:
+            return False
+
+        self.building_model.set_checkpoint(_snapshot)
+        # controller state is only restored into the same controller
+        _controller_key = WarmupSnapshotCache.get_controller_key(
+            self.controller_model
+        )
+        if _snapshot["controller_key"] == _controller_key:
+            self.controller_model.set_checkpoint(
+                copy.deepcopy(_snapshot["controller_model"])
+            )
+        elif hasattr(self.controller_model, "current_t_idx"):
+            self.controller_model.current_t_idx = t_idx
+        logger.info(f"Restored warmup snapshot at t_idx={t_idx}")
+        return True
+
+    def save_warmup_snapshot(self, t_idx):
+        """Save building model and controller state at step t_idx to the
+        warmup snapshot cache. Output memory of warmup is not needed."""
+        _checkpoint = self.building_model.get_checkpoint()
+        _controller_checkpoint = {
+            k: v
+            for k, v in self.controller_model.get_checkpoint().items()
+            if k != "output"
+        }
+        self.warmup_snapshot_cache.put(
+            self.config["identifier"],
+            self.warmup_snapshot_cache.get_key(self, t_idx),
+            {
+                "fmu_state": _checkpoint["fmu_state"],
+                "step_output": dict(_checkpoint["step_output"]),
+                "current_t_idx": _checkpoint["current_t_idx"],
+                "controller_key": WarmupSnapshotCache.get_controller_key(
+                    self.controller_model
+                ),
+                "controller_model": copy.deepcopy(_controller_checkpoint),
+            },
+        )
+
+    def get_checkpoint_path(self):
+        """Path of checkpoint file, None if checkpointing is disabled."""
+        if not (self.checkpoint_dir and self.checkpoint_interval_steps):
+            return None
+        _params_hash = hashlib.sha1(
+            json.dumps(
+                self.controller_model.get_params(), sort_keys=True, default=str
+            ).encode("utf-8")
+        ).hexdigest()
+        return os.path.join(
+            self.checkpoint_dir,
+            f"{self.config['identifier']}"
+            + f"_{self.building_model_name}"
+            + f"_{self.controller_model_name}"
+            + f"_{_params_hash[:8]}.checkpoint",
+        )
+
+    def save_checkpoint(self, t_idx):
+        """Save state of co-simulation before step t_idx."""
+        checkpoint = {
+            "t_idx": t_idx,
+            "start_utc": self.start_utc,
+            "end_utc": self.end_utc,
+            "building_model": self.building_model.get_checkpoint(),
+            "controller_model": self.controller_model.get_checkpoint(),
+        }
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        # write to temporary file so a crash cannot corrupt last checkpoint
+        with open(self.checkpoint_path + ".tmp", "wb") as f:
+            pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(self.checkpoint_path + ".tmp", self.checkpoint_path)
+        logger.info(
+            f"Saved checkpoint at t_idx={t_idx}: {self.checkpoint_path}"
+        )
+
+    def load_checkpoint(self):
+        """Restore state of co-simulation from last checkpoint. The models
+        must be initialized first.
+
+        A checkpoint can be resumed with a later end_utc to extend the run.
+
+        :return: t_idx of first step to simulate
+        """
+        if not self.checkpoint_path or not os.path.isfile(
+            self.checkpoint_path
+        ):
+            logger.info("No checkpoint found. Starting from beginning.")
+            return 0
+
+        with open(self.checkpoint_path, "rb") as f:
+            checkpoint = pickle.load(f)
+
+        if checkpoint["start_utc"] != self.start_utc:
+            raise ValueError(
+                f"Checkpoint start_utc={checkpoint['start_utc']} does not "
+                + f"match simulation start_utc={self.start_utc}"
+            )
+        if checkpoint["end_utc"] > self.end_utc:
+            raise ValueError(
+                f"Checkpoint end_utc={checkpoint['end_utc']} is after "
+                + f"simulation end_utc={self.end_utc}"
+            )
+
+        self.building_model.set_checkpoint(checkpoint["building_model"])
+        self.controller_model.set_checkpoint(checkpoint["controller_model"])
+        logger.info(
+            f"Resuming from checkpoint at t_idx={checkpoint['t_idx']}: "
+            + f"{self.checkpoint_path}"
+        )
+        return checkpoint["t_idx"]
+
+    def run(self, local=True, resume=False, profile=False):
+        """Main co-simulation loop
+
+        :param resume: resume from last checkpoint if one exists
+        :param profile: accumulate time per phase of each step, summary is
+        set in `profile_summary`
+        """
         logger.info("Initializing co-simulation models")
         self.initialize()
 
+        _start_t_idx = 0
+        if resume:
+            _start_t_idx = self.load_checkpoint()
+
+        # warmup snapshot is saved before first step of analysis period
+        _warmup_t_idx = None
+        if (
+            self.warmup_snapshot_cache is not None
+            and _start_t_idx == 0
+            and self.analysis_start_t_idx > 0
+            and self.building_model.supports_fmu_state
+        ):
+            if self.restore_warmup_snapshot(self.analysis_start_t_idx):
+                _start_t_idx = self.analysis_start_t_idx
+            else:
+                _warmup_t_idx = self.analysis_start_t_idx
+
         logger.info(
             f"Running co-simulation from {self.start_utc} to {self.end_utc}"
         )
@@ -172,26 +384,83 @@ class Simulation:
             self.step_size_seconds,
             dtype="int64",
         )
-        for i in range(0, len(_sim_time)):
-            self.controller_model.do_step(
-                t_start=_sim_time[i],
-                t_step=self.step_size_seconds,
-                step_hvac_input=self.data_client.hvac.data.iloc[i],
-                step_sensor_input=self.building_model.step_output,
-                step_weather_input=self.data_client.weather.data.iloc[i],
-            )
-            self.building_model.do_step(
-                t_start=_sim_time[i],
-                t_step=self.step_size_seconds,
-                step_control_input=self.controller_model.step_output,
-                step_sensor_input=self.data_client.sensors.data.iloc[i],
-                step_weather_input=self.data_client.weather.data.iloc[i],
-            )
 
+        # building models with outdoor weather inputs get the filled weather
+        # of the EPW file, controllers get the weather data
+        _filled_weather = None
+        if (
+            hasattr(self.building_model, "idf")
+            and self.building_model.idf.weather_input
+        ):
+            _filled_weather = self.data_client.weather.filled_data
+
+        _profiler = None
+        if profile:
+            _profiler = StepProfiler(n_steps=len(_sim_time))
+            _profiler.instrument(self)
+
+        try:
+            # a resumed simulation has a checkpoint at its first step
+            _checkpoint_t_idx = _start_t_idx if resume else None
+            for i in range(_start_t_idx, len(_sim_time)):
+                if i == _warmup_t_idx:
+                    self.save_warmup_snapshot(t_idx=i)
+
+                if _profiler:
+                    _profiler.current_t_idx = i
+                    _t_data_access = time.perf_counter()
+
+                step_hvac_input = self.data_client.hvac.data.iloc[i]
+                step_sensor_input = self.data_client.sensors.data.iloc[i]
+                step_weather_input = self.data_client.weather.data.iloc[i]
+                step_building_weather_input = step_weather_input
+                if _filled_weather is not None:
+                    step_building_weather_input = _filled_weather.iloc[i]
+
+                if _profiler:
+                    _profiler.add(
+                        "data_access", time.perf_counter() - _t_data_access
+                    )
+
+                self.controller_model.do_step(
+                    t_start=_sim_time[i],
+                    t_step=self.step_size_seconds,
+                    step_hvac_input=step_hvac_input,
+                    step_sensor_input=self.building_model.step_output,
+                    step_weather_input=step_weather_input,
+                )
+                self.building_model.do_step(
+                    t_start=_sim_time[i],
+                    t_step=self.step_size_seconds,
+                    step_control_input=self.controller_model.step_output,
+                    step_sensor_input=step_sensor_input,
+                    step_weather_input=step_building_weather_input,
+                )
+
+                if (
+                    self.checkpoint_path
+                    and (i + 1) % self.checkpoint_interval_steps == 0
+                ):
+                    self.save_checkpoint(t_idx=i + 1)
+                    _checkpoint_t_idx = i + 1
+
+            # final checkpoint allows for extending the simulation period
+            if self.checkpoint_path and _checkpoint_t_idx != len(_sim_time):
+                self.save_checkpoint(t_idx=len(_sim_time))
+        finally:
+            # methods of models are unwrapped also if a step raises
+            if _profiler:
+                _profiler.uninstrument()
+
+        if _profiler:
+            self.profile_summary = _profiler.summary(start_t_idx=_start_t_idx)
+
+        self.wall_time = time.perf_counter() - _sim_start_wall_time
+        self.process_time = time.process_time() - _sim_start_proc_time
         logger.info(
             "Finished co-simulation\n"
-            + f"Elapsed time: {time.perf_counter() - _sim_start_wall_time} seconds\n"
-            + f"Process time: {time.process_time() - _sim_start_proc_time} seconds"
+            + f"Elapsed time: {self.wall_time} seconds\n"
+            + f"Process time: {self.process_time} seconds"
         )
 
         self.tear_down()
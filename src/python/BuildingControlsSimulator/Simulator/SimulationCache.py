@@ -0,0 +1,184 @@
+import os
+import logging
+import json
+import hashlib
+
+import attr
+import pandas as pd
+import numpy as np
+import pyarrow.parquet as pq
+
+from BuildingControlsSimulator.Simulator.ResultsStore import ResultsStore
+
+logger = logging.getLogger(__name__)
+
+
+@attr.s(kw_only=True)
+class SimulationCache:
+    """Memoization of simulation results.
+
+    A simulation is fingerprinted by:
+    1. the prepared input data and forecast settings of its data client
+    2. the identity of its building model (e.g. IDF, weather, FMU options)
+    3. the controller class and parameters
+    4. the simulation step size
+    5. the version of the cache, see `cache_version`
+
+    A simulation with a matching fingerprint returns the cached output
+    without creating models or simulating.
+    """
+
+    # increment to invalidate cached simulations when simulation or model
+    # code changes their output
+    cache_version = 1
+
+    cache_dir = attr.ib()
+    # hashing the prepared input data is cached per data client because
+    # data clients are shared by all simulations of the same sim_config,
+    # the data client is kept with its fingerprint so that its id is not
+    # reused by another data client
+    _data_fingerprints = attr.ib(factory=dict)
+
+    def __attrs_post_init__(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def hash_params(params):
+        return hashlib.sha1(
+            json.dumps(params, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+
+    @staticmethod
+    def hash_dataframe(_df):
+        _hash = hashlib.sha1()
+        _hash.update(str(list(_df.columns)).encode("utf-8"))
+        _hash.update(
+            pd.util.hash_pandas_object(_df, index=False).to_numpy().tobytes()
+        )
+        return _hash.hexdigest()
+
+    def get_data_fingerprint(self, data_client):
+        _key = id(data_client)
+        if self._data_fingerprints.get(_key, (None, None))[0] is not (
+            data_client
+        ):
+            _fingerprint = SimulationCache.hash_params(
+                {
+                    "hvac": SimulationCache.hash_dataframe(
+                        data_client.hvac.data
+                    ),
+                    "sensors": SimulationCache.hash_dataframe(
+                        data_client.sensors.data
+                    ),
+                    "weather": SimulationCache.hash_dataframe(
+                        data_client.weather.data
+                    ),
+                    "full_data_periods": data_client.full_data_periods,
+                    "start_utc": data_client.start_utc,
+                    "end_utc": data_client.end_utc,
+                    "forecast": SimulationCache.get_forecast_params(
+                        data_client
+                    ),
+                }
+            )
+            self._data_fingerprints[_key] = (data_client, _fingerprint)
+        return self._data_fingerprints[_key][1]
+
+    @staticmethod
+    def get_forecast_params(data_client):
+        """Settings of the forecasts given to controllers, see
+        `ForecastChannel`."""
+        return {
+            "horizon_steps": data_client.forecast_horizon_steps,
+            "states": data_client.forecast_states,
+            "noise_models": {
+                str(state): {
+                    "type": type(noise_model).__name__,
+                    **(
+                        attr.asdict(noise_model)
+                        if attr.has(type(noise_model))
+                        else {"repr": repr(noise_model)}
+                    ),
+                }
+                for state, noise_model in (
+                    data_client.forecast_noise_models or {}
+                ).items()
+            },
+        }
+
+    def get_fingerprint(self, sim):
+        """Fingerprint of simulation. The data client of the simulation must
+        have its data prepared already."""
+        return SimulationCache.hash_params(
+            {
+                "cache_version": SimulationCache.cache_version,
+                "data": self.get_data_fingerprint(sim.data_client),
+                "building_model": {
+                    "type": type(sim.building_model).__name__,
+                    **sim.building_model.get_params(
+                        epw_path=sim.data_client.weather.epw_path
+                    ),
+                },
+                "controller_model": {
+                    "type": type(sim.controller_model).__name__,
+                    **sim.controller_model.get_params(),
+                },
+                "step_size_minutes": sim.config["step_size_minutes"],
+            }
+        )
+
+    def get_cache_paths(self, fingerprint):
+        return (
+            os.path.join(self.cache_dir, f"{fingerprint}_output.parquet"),
+            os.path.join(self.cache_dir, f"{fingerprint}_input.parquet"),
+            os.path.join(self.cache_dir, f"{fingerprint}.json"),
+        )
+
+    def get(self, sim, fingerprint):
+        """Set cached results on simulation.
+
+        :return: True if cache hit
+        """
+        output_path, input_path, meta_path = self.get_cache_paths(fingerprint)
+        # meta file is written last and marks a complete cache entry
+        if not os.path.isfile(meta_path):
+            return False
+
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+
+        sim.output = SimulationCache.read_table(output_path)
+        sim.full_output = SimulationCache.read_table(input_path)
+        sim.start_utc = pd.Timestamp(meta["start_utc"])
+        sim.end_utc = pd.Timestamp(meta["end_utc"])
+        sim.wall_time = meta["wall_time"]
+        sim.process_time = meta["process_time"]
+        logger.info(f"Using cached simulation: {fingerprint}")
+        return True
+
+    @staticmethod
+    def read_table(fpath):
+        _table = pq.read_table(fpath)
+        return ResultsStore.from_storage_columns(
+            _table.to_pandas(),
+            categories=ResultsStore.get_storage_categories([_table.schema]),
+        )
+
+    def put(self, sim, fingerprint):
+        output_path, input_path, meta_path = self.get_cache_paths(fingerprint)
+        for _df, _fpath in zip(
+            [sim.output, sim.full_output], [output_path, input_path]
+        ):
+            pq.write_table(ResultsStore.to_storage_table(_df), _fpath)
+
+        with open(meta_path, "w") as f:
+            json.dump(
+                {
+                    "start_utc": sim.start_utc,
+                    "end_utc": sim.end_utc,
+                    "wall_time": sim.wall_time,
+                    "process_time": sim.process_time,
+                },
+                f,
+                default=str,
+            )
@@ -9,6 +9,10 @@ import numpy as np
 import attr
 
 from BuildingControlsSimulator.Simulator.Simulation import Simulation
+from BuildingControlsSimulator.Simulator.ResultsStore import ResultsStore
+from BuildingControlsSimulator.Simulator.SimulationCache import (
+    SimulationCache,
+)
 from BuildingControlsSimulator.BuildingModels.BuildingModel import (
     BuildingModel,
 )
@@ -52,10 +56,25 @@ class Simulator:
     output_plot_dir = attr.ib(
         default=os.path.join(os.environ.get("OUTPUT_DIR"), "plot")
     )
+    results_store = attr.ib(default=None)
+    simulation_cache = attr.ib(default=None)
+    checkpoint_dir = attr.ib(default=None)
+    checkpoint_interval_steps = attr.ib(default=None)
+    # `WarmupSnapshotCache` to share warmup of simulations, disabled if None
+    warmup_snapshot_cache = attr.ib(default=None)
 
     def __attrs_post_init__(self):
         """Lazy init of all simulations
         """
+        if self.results_store is None:
+            self.results_store = ResultsStore(
+                output_data_dir=self.output_data_dir
+            )
+        if self.simulation_cache is None:
+            self.simulation_cache = SimulationCache(
+                cache_dir=os.path.join(self.output_data_dir, "cache")
+            )
+
         # simulation for each permutation: data, building, and controller
         for _idx, _sim_config in self.sim_config.iterrows():
 
@@ -75,16 +94,68 @@ class Simulator:
                             data_client=dc,
                             building_model=copy.deepcopy(b),
                             controller_model=copy.deepcopy(c),
+                            checkpoint_dir=self.checkpoint_dir,
+                            checkpoint_interval_steps=self.checkpoint_interval_steps,
+                            warmup_snapshot_cache=self.warmup_snapshot_cache,
                         )
                     )
 
-    def simulate(self, local=True, preprocess_check=False):
+    def simulate(
+        self,
+        local=True,
+        preprocess_check=False,
+        use_cache=False,
+        resume=False,
+        profile=False,
+    ):
         """Run all simulations locally or in cloud.
         :param local: run simulations locally
+        :param use_cache: reuse output of simulations with same fingerprint
+        :param resume: resume simulations from their last checkpoint
+        :param profile: profile phases of each simulation step, the summary
+        is stored in the results manifest
         """
         if local:
+            # find weather stations of all thermostats at once and read
+            # fill data once per station
+            DataClient.resolve_weather_cohorts(
+                list(
+                    {
+                        id(sim.data_client): sim.data_client
+                        for sim in self.simulations
+                        if sim.data_client.hvac is None
+                        and sim.data_client.weather_cohort is None
+                    }.values()
+                )
+            )
             for sim in self.simulations:
-                # weather data is required during model creation
-                sim.data_client.get_data()
-                sim.create_models(preprocess_check=preprocess_check)
-                sim.run(local=True)
+                try:
+                    # weather data is required during model creation
+                    # data clients are shared by permutations of models
+                    if sim.data_client.hvac is None:
+                        sim.data_client.get_data()
+
+                    fingerprint = None
+                    if use_cache:
+                        fingerprint = self.simulation_cache.get_fingerprint(
+                            sim
+                        )
+                        if self.simulation_cache.get(sim, fingerprint):
+                            self.results_store.write_simulation(
+                                sim, cached=True
+                            )
+                            continue
+
+                    sim.create_models(preprocess_check=preprocess_check)
+                    sim.run(local=True, resume=resume, profile=profile)
+
+                    if use_cache:
+                        self.simulation_cache.put(sim, fingerprint)
+                except Exception as e:
+                    # record failure in manifest before raising
+                    self.results_store.write_simulation(
+                        sim, status="failed", error=repr(e)
+                    )
+                    raise
+
+                self.results_store.write_simulation(sim)
@@ -0,0 +1,142 @@
+import logging
+import time
+import functools
+
+import attr
+import pandas as pd
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@attr.s(kw_only=True)
+class StepProfiler:
+    """Opt-in per step instrumentation of the co-simulation loop.
+
+    Time is accumulated per step for each phase of the loop and FMI get/set
+    calls of the building model FMU are counted. Instrumentation wraps the
+    model methods of a single simulation so that the loop is not changed
+    when profiling is disabled.
+    """
+
+    PHASES = [
+        "data_access",
+        "controller_do_step",
+        "actuate_HVAC_equipment",
+        "fmu_do_step",
+        "update_output",
+    ]
+
+    n_steps = attr.ib()
+    timings = attr.ib(factory=dict)
+    fmi_get_calls = attr.ib(default=0)
+    fmi_set_calls = attr.ib(default=0)
+    current_t_idx = attr.ib(default=0)
+    _wrapped = attr.ib(factory=list)
+
+    def __attrs_post_init__(self):
+        self.timings = {
+            phase: np.zeros(self.n_steps, dtype="float64")
+            for phase in StepProfiler.PHASES
+        }
+
+    def add(self, phase, elapsed):
+        self.timings[phase][self.current_t_idx] += elapsed
+
+    def timed(self, phase, func):
+        @functools.wraps(func)
+        def _timed(*args, **kwargs):
+            _t = time.perf_counter()
+            res = func(*args, **kwargs)
+            self.add(phase, time.perf_counter() - _t)
+            return res
+
+        return _timed
+
+    def instrument(self, sim):
+        """Wrap model methods of an initialized simulation."""
+        self._wrap(
+            sim.controller_model,
+            "do_step",
+            self.timed("controller_do_step", sim.controller_model.do_step),
+        )
+        self._wrap(
+            sim.building_model,
+            "actuate_HVAC_equipment",
+            self.timed(
+                "actuate_HVAC_equipment",
+                sim.building_model.actuate_HVAC_equipment,
+            ),
+        )
+        self._wrap(
+            sim.building_model,
+            "update_output",
+            self.timed("update_output", sim.building_model.update_output),
+        )
+        if getattr(sim.building_model, "fmu", None) is not None:
+            self._wrap(
+                sim.building_model,
+                "fmu",
+                ProfiledFMU(fmu=sim.building_model.fmu, profiler=self),
+            )
+
+    def uninstrument(self):
+        """Restore all wrapped model attributes."""
+        for obj, name, original in reversed(self._wrapped):
+            if original is None:
+                # wrapped method was defined on class
+                delattr(obj, name)
+            else:
+                setattr(obj, name, original)
+        self._wrapped = []
+
+    def _wrap(self, obj, name, wrapper):
+        self._wrapped.append((obj, name, vars(obj).get(name)))
+        setattr(obj, name, wrapper)
+
+    def summary(self, start_t_idx=0):
+        """Summary statistics per phase in seconds.
+
+        :param start_t_idx: exclude steps before, e.g. when resuming
+        """
+        _summary = {
+            "n_steps": self.n_steps - start_t_idx,
+            "fmi_get_calls": self.fmi_get_calls,
+            "fmi_set_calls": self.fmi_set_calls,
+        }
+        for phase, timings in self.timings.items():
+            _timings = timings[start_t_idx:]
+            if len(_timings) == 0:
+                continue
+            _summary[phase] = {
+                "total": float(np.sum(_timings)),
+                "mean": float(np.mean(_timings)),
+                "p50": float(np.percentile(_timings, 50)),
+                "p99": float(np.percentile(_timings, 99)),
+            }
+        return _summary
+
+
+@attr.s(kw_only=True)
+class ProfiledFMU:
+    """Proxy of FMU that counts FMI get/set calls and times do_step."""
+
+    fmu = attr.ib()
+    profiler = attr.ib()
+
+    def get(self, *args, **kwargs):
+        self.profiler.fmi_get_calls += 1
+        return self.fmu.get(*args, **kwargs)
+
+    def set(self, *args, **kwargs):
+        self.profiler.fmi_set_calls += 1
+        return self.fmu.set(*args, **kwargs)
+
+    def do_step(self, *args, **kwargs):
+        _t = time.perf_counter()
+        status = self.fmu.do_step(*args, **kwargs)
+        self.profiler.add("fmu_do_step", time.perf_counter() - _t)
+        return status
+
+    def __getattr__(self, name):
+        return getattr(self.fmu, name)
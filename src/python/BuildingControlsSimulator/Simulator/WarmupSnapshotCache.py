@@ -0,0 +1,104 @@
+import os
+import logging
+import hashlib
+import json
+from collections import OrderedDict
+
+import attr
+import pandas as pd
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@attr.s(kw_only=True)
+class WarmupSnapshotCache:
+    """Bounded in-memory cache of building model FMU states at the start of
+    the analysis period.
+
+    EnergyPlus warmup and the extra warmup days added by
+    `DataClient.get_simulation_period` are the same for all simulations of
+    the same building, weather, and start time. The first such simulation
+    saves a snapshot of the FMU state at the start of the analysis period and
+    later simulations restore it instead of re-simulating warmup.
+
+    Snapshots include the controller state and are keyed by the controller
+    parameters, so they are only shared by simulations of the same
+    controller. With `share_across_controllers` the warmup days of all
+    controllers are simulated with the controller of the first simulation,
+    only the analysis period is considered as output.
+
+    Snapshots are stored per identifier, each identifier keeps at most
+    `max_snapshots_per_identifier` snapshots and at most `max_identifiers`
+    identifiers are kept. Least recently used snapshots are evicted first.
+    """
+
+    max_identifiers = attr.ib(default=32)
+    max_snapshots_per_identifier = attr.ib(default=4)
+    share_across_controllers = attr.ib(default=False)
+    snapshots = attr.ib(factory=OrderedDict)
+
+    @staticmethod
+    def get_controller_key(controller_model):
+        """Identity of controller by type and parameters."""
+        return hashlib.sha1(
+            json.dumps(
+                {
+                    "type": type(controller_model).__name__,
+                    "params": controller_model.get_params(),
+                },
+                sort_keys=True,
+                default=str,
+            ).encode("utf-8")
+        ).hexdigest()
+
+    def get_key(self, sim, analysis_start_t_idx):
+        """Snapshot key of a simulation. The FMU is identified by path and
+        modification time, the weather is compiled into the FMU."""
+        fmu_path = sim.building_model.fmu_path
+        controller_key = None
+        if not self.share_across_controllers:
+            controller_key = WarmupSnapshotCache.get_controller_key(
+                sim.controller_model
+            )
+        return (
+            fmu_path,
+            os.path.getmtime(fmu_path) if os.path.isfile(fmu_path) else None,
+            sim.start_utc,
+            sim.step_size_seconds,
+            analysis_start_t_idx,
+            controller_key,
+        )
+
+    def get(self, identifier, key):
+        if identifier not in self.snapshots:
+            return None
+
+        _identifier_snapshots = self.snapshots[identifier]
+        if key not in _identifier_snapshots:
+            return None
+
+        # mark as most recently used
+        self.snapshots.move_to_end(identifier)
+        _identifier_snapshots.move_to_end(key)
+        return _identifier_snapshots[key]
+
+    def put(self, identifier, key, snapshot):
+        if identifier not in self.snapshots:
+            self.snapshots[identifier] = OrderedDict()
+
+        self.snapshots.move_to_end(identifier)
+        self.snapshots[identifier][key] = snapshot
+        self.snapshots[identifier].move_to_end(key)
+
+        # evict least recently used
+        while len(self.snapshots[identifier]) > (
+            self.max_snapshots_per_identifier
+        ):
+            self.snapshots[identifier].popitem(last=False)
+
+        while len(self.snapshots) > self.max_identifiers:
+            self.snapshots.popitem(last=False)
+
+    def clear(self):
+        self.snapshots.clear()
@@ -0,0 +1,114 @@
+import logging
+import os
+import shutil
+
+import pytest
+import pandas as pd
+import numpy as np
+
+from BuildingControlsSimulator.Simulator.ResultsStore import ResultsStore
+from BuildingControlsSimulator.DataClients.DataStates import STATES
+
+logger = logging.getLogger(__name__)
+
+
+class TestResultsStore:
+    @classmethod
+    def setup_class(cls):
+        cls.output_data_dir = os.path.join(
+            os.environ.get("OUTPUT_DIR"), "test_results_store"
+        )
+        if os.path.isdir(cls.output_data_dir):
+            shutil.rmtree(cls.output_data_dir)
+
+        cls.store = ResultsStore(output_data_dir=cls.output_data_dir)
+
+        cls.identifiers = ["tstat_a", "tstat_b"]
+        cls.controllers = ["Deadband", "FMIController"]
+        for identifier in cls.identifiers:
+            for controller in cls.controllers:
+                cls.store.write(
+                    identifier=identifier,
+                    building_model="AZ_Phoenix_gasfurnace",
+                    controller_model=controller,
+                    output=cls.make_output(10),
+                    input_data=cls.make_output(10),
+                    record={"config": {"step_size_minutes": "5"}},
+                )
+
+    @classmethod
+    def teardown_class(cls):
+        """teardown any state that was previously setup with a call to
+        setup_class.
+        """
+        shutil.rmtree(cls.output_data_dir)
+
+    @staticmethod
+    def make_output(n):
+        return pd.DataFrame.from_dict(
+            {
+                STATES.DATE_TIME: pd.date_range(
+                    "2018-05-16", periods=n, freq="5T", tz="utc"
+                ),
+                STATES.THERMOSTAT_TEMPERATURE: np.full(
+                    n, 21.0, dtype="float32"
+                ),
+                STATES.HVAC_MODE: pd.Categorical(["heat"] * n),
+            }
+        )
+
+    def test_load_filtered(self):
+        output = self.store.load(
+            identifier="tstat_a", controller_model="Deadband"
+        )
+        assert len(output) == 10
+        assert (output["identifier"] == "tstat_a").all()
+        assert STATES.THERMOSTAT_TEMPERATURE in output.columns
+
+    def test_load_columns(self):
+        output = self.store.load(
+            identifier=self.identifiers,
+            columns=[STATES.THERMOSTAT_TEMPERATURE],
+        )
+        assert len(output) == 40
+        assert STATES.HVAC_MODE not in output.columns
+
+    def test_manifest(self):
+        manifest = self.store.load_manifest(controller_model="Deadband")
+        assert len(manifest) == 2
+        assert set(manifest["identifier"]) == set(self.identifiers)
+
+    def test_rewrite_overwrites_run(self):
+        run_id = self.store.write(
+            identifier="tstat_a",
+            building_model="AZ_Phoenix_gasfurnace",
+            controller_model="Deadband",
+            output=self.make_output(5),
+            record={"config": {"step_size_minutes": "5"}},
+        )
+        output = self.store.load(run_id=run_id)
+        assert len(output) == 5
+        assert len(self.store.load_manifest()) == 4
+
+    def test_load_categorical(self):
+        output = self.store.load(identifier="tstat_a")
+        assert isinstance(output[STATES.HVAC_MODE].dtype, pd.CategoricalDtype)
+        assert list(output[STATES.HVAC_MODE].cat.categories) == ["heat"]
+
+    def test_run_id_building_params(self):
+        run_ids = [
+            self.store.write(
+                identifier="tstat_c",
+                building_model="AZ_Phoenix_gasfurnace",
+                controller_model="Deadband",
+                output=self.make_output(5),
+                record={
+                    "config": {"step_size_minutes": "5"},
+                    "building_params": {"variant_overrides": [v]},
+                },
+            )
+            for v in ["a", "b"]
+        ]
+        # building variants of the same model name are stored separately
+        assert run_ids[0] != run_ids[1]
+        assert len(self.store.load(identifier="tstat_c")) == 10
@@ -0,0 +1,135 @@
+import logging
+import os
+import shutil
+import copy
+from types import SimpleNamespace
+
+import pytest
+import pandas as pd
+import numpy as np
+
+from BuildingControlsSimulator.Simulator.SimulationCache import (
+    SimulationCache,
+)
+from BuildingControlsSimulator.ControlModels.Deadband import Deadband
+from BuildingControlsSimulator.DataClients.ForecastNoise import ForecastNoise
+from BuildingControlsSimulator.DataClients.DataStates import STATES
+
+logger = logging.getLogger(__name__)
+
+
+class TestSimulationCache:
+    @classmethod
+    def setup_class(cls):
+        cls.cache_dir = os.path.join(
+            os.environ.get("OUTPUT_DIR"), "test_simulation_cache"
+        )
+        if os.path.isdir(cls.cache_dir):
+            shutil.rmtree(cls.cache_dir)
+
+        cls.cache = SimulationCache(cache_dir=cls.cache_dir)
+
+        n = 12
+        _df = pd.DataFrame.from_dict(
+            {
+                STATES.DATE_TIME: pd.date_range(
+                    "2018-05-16", periods=n, freq="5T", tz="utc"
+                ),
+                STATES.TEMPERATURE_STP_HEAT: np.full(n, 21.0),
+                STATES.HVAC_MODE: pd.Categorical(
+                    ["heat"] * n, categories=["heat", "off"]
+                ),
+            }
+        )
+        channel = SimpleNamespace(data=_df, epw_path=None)
+        cls.data_client = SimpleNamespace(
+            hvac=channel,
+            sensors=channel,
+            weather=channel,
+            full_data_periods=[],
+            start_utc=_df[STATES.DATE_TIME].iloc[0],
+            end_utc=_df[STATES.DATE_TIME].iloc[-1],
+            forecast_horizon_steps=None,
+            forecast_states=None,
+            forecast_noise_models={},
+        )
+        cls.building_model = SimpleNamespace(
+            get_params=lambda epw_path: {"idf_hash": "abc"}
+        )
+
+    @classmethod
+    def teardown_class(cls):
+        """teardown any state that was previously setup with a call to
+        setup_class.
+        """
+        shutil.rmtree(cls.cache_dir)
+
+    def make_sim(self, controller_model):
+        return SimpleNamespace(
+            data_client=self.data_client,
+            building_model=self.building_model,
+            controller_model=controller_model,
+            config={"step_size_minutes": 5},
+            output=self.data_client.hvac.data,
+            full_output=self.data_client.hvac.data,
+            start_utc=self.data_client.start_utc,
+            end_utc=self.data_client.end_utc,
+            wall_time=1.0,
+            process_time=1.0,
+        )
+
+    def test_fingerprint_controller_params(self):
+        sim_a = self.make_sim(Deadband(deadband=1.0))
+        sim_b = self.make_sim(Deadband(deadband=2.0))
+        sim_c = self.make_sim(Deadband(deadband=1.0))
+        assert self.cache.get_fingerprint(sim_a) != self.cache.get_fingerprint(
+            sim_b
+        )
+        assert self.cache.get_fingerprint(sim_a) == self.cache.get_fingerprint(
+            sim_c
+        )
+
+    def test_fingerprint_cache_version(self):
+        sim = self.make_sim(Deadband(deadband=1.0))
+        fingerprint = self.cache.get_fingerprint(sim)
+        try:
+            SimulationCache.cache_version += 1
+            assert self.cache.get_fingerprint(sim) != fingerprint
+        finally:
+            SimulationCache.cache_version -= 1
+
+    def test_fingerprint_forecast(self):
+        fingerprints = set()
+        for horizon_steps, std in [(None, None), (12, None), (24, None)] + [
+            (24, 1.0),
+            (24, 2.0),
+        ]:
+            data_client = copy.copy(self.data_client)
+            data_client.forecast_horizon_steps = horizon_steps
+            if std is not None:
+                data_client.forecast_noise_models = {
+                    STATES.OUTDOOR_TEMPERATURE: ForecastNoise(std=std)
+                }
+            sim = self.make_sim(Deadband(deadband=1.0))
+            sim.data_client = data_client
+            fingerprints.add(self.cache.get_fingerprint(sim))
+        assert len(fingerprints) == 5
+
+    def test_put_get(self):
+        sim = self.make_sim(Deadband(deadband=1.0))
+        fingerprint = self.cache.get_fingerprint(sim)
+        self.cache.put(sim, fingerprint)
+
+        cached_sim = self.make_sim(Deadband(deadband=1.0))
+        cached_sim.output = None
+        assert self.cache.get(cached_sim, fingerprint)
+        assert (
+            cached_sim.output[STATES.TEMPERATURE_STP_HEAT]
+            == sim.output[STATES.TEMPERATURE_STP_HEAT]
+        ).all()
+        # categorical dtypes are restored
+        assert (
+            cached_sim.output[STATES.HVAC_MODE].dtype
+            == sim.output[STATES.HVAC_MODE].dtype
+        )
+        assert not self.cache.get(cached_sim, "missing_fingerprint")
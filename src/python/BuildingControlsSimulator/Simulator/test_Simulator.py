@@ -17,6 +17,9 @@ from BuildingControlsSimulator.BuildingModels.IDFPreprocessor import (
 from BuildingControlsSimulator.BuildingModels.EnergyPlusBuildingModel import (
     EnergyPlusBuildingModel,
 )
+from BuildingControlsSimulator.BuildingModels.FakeFMUBackend import (
+    FakeFMUBackend,
+)
 
 from BuildingControlsSimulator.ControlModels.FMIController import FMIController
 from BuildingControlsSimulator.ControlModels.Deadband import Deadband
@@ -106,3 +109,108 @@ class TestSimulator:
             pytest.approx(0.18192752, 0.1)
             == master.simulations[0].output[STATES.THERMOSTAT_HUMIDITY].mean()
         )
+
+    def get_fake_fmu_simulator(self, **kwargs):
+        return Simulator(
+            data_client=self.dc,
+            sim_config=self.sim_config,
+            building_models=[
+                EnergyPlusBuildingModel(
+                    idf=IDFPreprocessor(idf_file=self.idf_name),
+                    fmu_backend=FakeFMUBackend(),
+                )
+            ],
+            controller_models=[Deadband(deadband=1.0)],
+            **kwargs,
+        )
+
+    def test_building_model_name(self):
+        master = Simulator(
+            data_client=self.dc,
+            sim_config=self.sim_config,
+            building_models=[
+                EnergyPlusBuildingModel(
+                    idf=IDFPreprocessor(
+                        idf_file=self.idf_name,
+                        variant_overrides=[
+                            ("Material", "*", "Thickness", thickness)
+                        ],
+                    ),
+                    fmu_backend=FakeFMUBackend(),
+                )
+                for thickness in [0.1, 0.2]
+            ],
+            controller_models=[Deadband(deadband=1.0)],
+        )
+        # variants of the same IDF are stored separately
+        building_model_names = set(
+            sim.building_model_name for sim in master.simulations
+        )
+        assert len(building_model_names) == 2
+
+    def test_checkpoint_resume(self):
+        checkpoint_dir = os.path.join(
+            os.environ.get("OUTPUT_DIR"), "test_checkpoint_resume"
+        )
+        shutil.rmtree(checkpoint_dir, ignore_errors=True)
+
+        master = self.get_fake_fmu_simulator()
+        master.simulate(local=True, use_cache=False)
+
+        crashed = self.get_fake_fmu_simulator(
+            checkpoint_dir=checkpoint_dir, checkpoint_interval_steps=100
+        )
+        crashed_sim = crashed.simulations[0]
+        _do_step = crashed_sim.building_model.do_step
+
+        def _crashing_do_step(*args, **kwargs):
+            if crashed_sim.building_model.current_t_idx == 250:
+                raise RuntimeError("simulated crash")
+            return _do_step(*args, **kwargs)
+
+        crashed_sim.building_model.do_step = _crashing_do_step
+        with pytest.raises(RuntimeError):
+            crashed.simulate(local=True, use_cache=False)
+
+        resumed = self.get_fake_fmu_simulator(
+            checkpoint_dir=checkpoint_dir, checkpoint_interval_steps=100
+        )
+        resumed.simulate(local=True, use_cache=False, resume=True)
+        pd.testing.assert_frame_equal(
+            master.simulations[0].output, resumed.simulations[0].output
+        )
+
+    def test_checkpoint_unsupported(self):
+        # EnergyPlusToFMU FMUs cannot serialize their state
+        with pytest.raises(ValueError):
+            Simulator(
+                data_client=self.dc,
+                sim_config=self.sim_config,
+                building_models=[
+                    EnergyPlusBuildingModel(
+                        idf=IDFPreprocessor(idf_file=self.idf_name)
+                    )
+                ],
+                controller_models=[Deadband(deadband=1.0)],
+                checkpoint_dir=os.environ.get("OUTPUT_DIR"),
+                checkpoint_interval_steps=100,
+            )
+
+    def test_profile_uninstrument_on_error(self):
+        master = self.get_fake_fmu_simulator()
+        sim = master.simulations[0]
+        _do_step = sim.controller_model.do_step
+
+        def _crashing_do_step(*args, **kwargs):
+            if sim.controller_model.current_t_idx == 10:
+                raise RuntimeError("simulated crash")
+            return _do_step(*args, **kwargs)
+
+        sim.controller_model.do_step = _crashing_do_step
+        with pytest.raises(RuntimeError):
+            master.simulate(local=True, use_cache=False, profile=True)
+
+        # profiler wrappers are removed after the failed step
+        assert sim.controller_model.do_step is _crashing_do_step
+        assert "update_output" not in vars(sim.building_model)
+        assert type(sim.building_model.fmu).__name__ == "FakeFMU"
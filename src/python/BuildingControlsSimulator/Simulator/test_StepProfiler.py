@@ -0,0 +1,70 @@
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+from BuildingControlsSimulator.Simulator.StepProfiler import StepProfiler
+
+logger = logging.getLogger(__name__)
+
+
+class DummyFMU:
+    def get(self, name):
+        return [0.0]
+
+    def set(self, name, value):
+        pass
+
+    def do_step(self, current_t, step_size, new_step=True):
+        return 0
+
+
+class DummyModel:
+    def __init__(self):
+        self.fmu = DummyFMU()
+
+    def do_step(self):
+        self.fmu.do_step(current_t=0, step_size=300)
+
+    def actuate_HVAC_equipment(self):
+        self.fmu.set("FMU_T_control_type", 0)
+
+    def update_output(self):
+        self.fmu.get("zone_air_temperature")
+        self.fmu.get("zone_mean_air_dewpoint_temperature")
+
+
+class TestStepProfiler:
+    def test_instrument(self):
+        building_model = DummyModel()
+        original_fmu = building_model.fmu
+        sim = SimpleNamespace(
+            building_model=building_model, controller_model=DummyModel()
+        )
+        n_steps = 10
+        profiler = StepProfiler(n_steps=n_steps)
+        profiler.instrument(sim)
+
+        for i in range(n_steps):
+            profiler.current_t_idx = i
+            sim.controller_model.do_step()
+            sim.building_model.actuate_HVAC_equipment()
+            sim.building_model.fmu.do_step(current_t=i, step_size=300)
+            sim.building_model.update_output()
+
+        profiler.uninstrument()
+        summary = profiler.summary()
+
+        assert building_model.fmu is original_fmu
+        assert "do_step" not in vars(sim.controller_model)
+        assert summary["n_steps"] == n_steps
+        assert summary["fmi_get_calls"] == 2 * n_steps
+        assert summary["fmi_set_calls"] == n_steps
+        for phase in [
+            "controller_do_step",
+            "actuate_HVAC_equipment",
+            "fmu_do_step",
+            "update_output",
+        ]:
+            assert summary[phase]["total"] > 0
+            assert summary[phase]["p99"] >= summary[phase]["p50"]
@@ -0,0 +1,59 @@
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+from BuildingControlsSimulator.Simulator.WarmupSnapshotCache import (
+    WarmupSnapshotCache,
+)
+from BuildingControlsSimulator.ControlModels.Deadband import Deadband
+
+logger = logging.getLogger(__name__)
+
+
+class TestWarmupSnapshotCache:
+    def test_get_put(self):
+        cache = WarmupSnapshotCache()
+        cache.put("tstat_a", ("fmu", 0), {"fmu_state": b"a"})
+        assert cache.get("tstat_a", ("fmu", 0)) == {"fmu_state": b"a"}
+        assert cache.get("tstat_a", ("fmu", 1)) is None
+        assert cache.get("tstat_b", ("fmu", 0)) is None
+
+    def test_bounded_per_identifier(self):
+        cache = WarmupSnapshotCache(max_snapshots_per_identifier=2)
+        for i in range(3):
+            cache.put("tstat_a", i, i)
+        assert cache.get("tstat_a", 0) is None
+        assert cache.get("tstat_a", 1) == 1
+        assert cache.get("tstat_a", 2) == 2
+
+    def test_bounded_identifiers(self):
+        cache = WarmupSnapshotCache(max_identifiers=2)
+        cache.put("tstat_a", 0, 0)
+        cache.put("tstat_b", 0, 0)
+        # use tstat_a so that tstat_b is least recently used
+        cache.get("tstat_a", 0)
+        cache.put("tstat_c", 0, 0)
+        assert cache.get("tstat_a", 0) == 0
+        assert cache.get("tstat_b", 0) is None
+        assert cache.get("tstat_c", 0) == 0
+
+    def test_key_controller(self):
+        def _sim(controller_model):
+            return SimpleNamespace(
+                building_model=SimpleNamespace(fmu_path="missing.fmu"),
+                controller_model=controller_model,
+                start_utc=None,
+                step_size_seconds=300,
+            )
+
+        cache = WarmupSnapshotCache()
+        key = cache.get_key(_sim(Deadband(deadband=1.0)), 10)
+        assert key == cache.get_key(_sim(Deadband(deadband=1.0)), 10)
+        assert key != cache.get_key(_sim(Deadband(deadband=2.0)), 10)
+
+        # opt-in sharing of warmup between controllers
+        shared_cache = WarmupSnapshotCache(share_across_controllers=True)
+        assert shared_cache.get_key(
+            _sim(Deadband(deadband=1.0)), 10
+        ) == shared_cache.get_key(_sim(Deadband(deadband=2.0)), 10)